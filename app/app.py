@@ -1,9 +1,15 @@
+from functools import partial
 import panel as pn
 from pyfoodopt import *
 from config import *
 from components.food_boxes_container import *
 from components.nutrient_constraints import NutrientConstraints
+from components.objective_config import ObjectiveConfig
 from components.optimize_button import OptimizeButton
+from components.sweep_config import SweepConfig
+from pareto import ParetoFrontier
+from sweep import ParameterSweep
+from metrics import PrometheusExporter
 
 from components.results import *
 from components.instructions import instructions
@@ -14,8 +20,25 @@ pn.extension("tabulator")
 
 nb = NutrientBank()
 nb.build_nutrient_bank_from_csv("data/nutrients_no_duplicate_nbrs.csv")
-pantry = Pantry()
-pantry.build_pantry_from_json("data/food_data.json")
+
+
+def load_base_pantry():
+    # The JSON is parsed once to write a snapshot; later starts and other workers
+    # memory-map the snapshot instead. A snapshot written by another version, or
+    # before the JSON last changed, is replaced
+    if not is_pantry_snapshot_current("data/food_data.snapshot", "data/food_data.json"):
+        json_pantry = Pantry()
+        json_pantry.build_pantry_from_json("data/food_data.json")
+        json_pantry.save_snapshot("data/food_data.snapshot", replace=True)
+    base_pantry = Pantry()
+    base_pantry.build_pantry_from_snapshot("data/food_data.snapshot")
+    base_pantry.freeze()
+    return base_pantry
+
+
+# One read-only pantry per process, shared by all sessions; each session edits
+# prices and active foods through its own overlay
+pantry = PantryOverlay(base=pn.state.as_cached("base_pantry", load_base_pantry))
 
 instructions_wrapper = pn.FlexBox(
     instructions,
@@ -43,31 +66,183 @@ food_config = FoodConfig(
     food_restriction_name_mappings=FOOD_RESTRICTION_NAME_MAPPINGS, pantry=pantry
 )
 
-config_tabs = pn.Tabs(("Foods", food_config), nutrient_config_tab)
 
 results_container = ResultsContainer()
 
+# Shared by every session so the metrics cover the whole process
+metrics_exporter = pn.state.as_cached(
+    "metrics_exporter", PrometheusExporter, textfile_path=METRICS_TEXTFILE
+)
+
+# The optimize button's worker solves its own overlay of the base pantry. Prices
+# and active foods are copied to it from the session's overlay on the event loop,
+# so edits made while a solve runs never reach it
+solve_pantry = PantryOverlay(base=pantry.base)
+
+# Reused across clicks so that small edits re-solve the previous problem. Each
+# results tab holds its own solution, so the optimizer only keeps the latest
+fo = FoodOptimizer(
+    pantry=solve_pantry,
+    incremental=True,
+    max_results=1,
+    time_limit=SOLVE_TIME_LIMIT,
+    presolve=PRESOLVE_FOODS,
+    ranging=COMPUTE_RANGING,
+    portions=PORTION_MODE,
+    max_foods=MAX_FOODS,
+    min_portion_g=MIN_PORTION_G,
+    mip_gap=MIP_GAP,
+    metrics_hooks=[metrics_exporter],
+)
 
-def optimize(event):
-    nutrient_constraints = nutrient_constraints_widgets.get_constraints()
-    nutrient_constraints = Constraints(nutrient_constraints=nutrient_constraints)
-    active_fdc_ids_to_prices = food_config.get_active_fdc_ids_and_prices()
-    pantry.set_active_foods(list(active_fdc_ids_to_prices.keys()))
-    pantry.set_prices(active_fdc_ids_to_prices)
 
-    fo = FoodOptimizer(pantry=pantry, constraints=nutrient_constraints)
+def solve(active_fdc_ids, prices, nutrient_constraints, objective):
+    # Runs in the optimize button's worker thread
+    solve_pantry.set_prices(prices)
+    solve_pantry.set_active_foods(active_fdc_ids)
+    fo.constraints = nutrient_constraints
+    fo.objective = objective
 
     # Foods don't seem to have foods with ids in the combined constraints (omega-3, omega-6)
-    status = fo.optimize()
+    return fo.optimize()
+
+
+async def optimize(event):
+    nutrient_constraints = nutrient_constraints_widgets.get_constraints()
+    nutrient_constraints = Constraints(nutrient_constraints=nutrient_constraints)
+    # Prices are pushed to the pantry as they are edited in the food tabulator
+    active_fdc_ids = food_config.get_active_foods_fdc_ids()
+    prices = dict(pantry.price_overrides)
 
-    ov = fo.get_optimal_values()
+    status = await optimize_button.run(
+        solve,
+        active_fdc_ids,
+        prices,
+        nutrient_constraints,
+        objective_config.get_objective(),
+    )
+    if status is None:
+        return
 
-    results = Results(food_optimizer=fo, nutrient_bank=nb)
+    results = Results(
+        food_optimizer=fo, nutrient_bank=nb, show_diagnostics=SHOW_DIAGNOSTICS
+    )
 
     results_container.add_result(results)
 
 
-optimize_button = OptimizeButton(on_click=optimize)
+def solve_frontier(active_fdc_ids, prices, pareto_frontier):
+    # Runs in the optimize button's worker thread, the points are solved in
+    # worker processes
+    solve_pantry.set_prices(prices)
+    solve_pantry.set_active_foods(active_fdc_ids)
+    points = pareto_frontier.solve()
+    return pareto_frontier.get_frontier(points), points
+
+
+async def frontier(event):
+    if optimize_button.running:
+        return
+    pareto_frontier = ParetoFrontier(
+        pantry=solve_pantry,
+        constraints=Constraints(
+            nutrient_constraints=nutrient_constraints_widgets.get_constraints()
+        ),
+        objective=objective_config.get_objective(),
+        epsilon_objective=objective_config.get_epsilon_objective(),
+        n_points=objective_config.n_points.value,
+    )
+    active_fdc_ids = food_config.get_active_foods_fdc_ids()
+    prices = dict(pantry.price_overrides)
+
+    try:
+        frontier_points = await optimize_button.run(
+            solve_frontier, active_fdc_ids, prices, pareto_frontier
+        )
+    except ValueError as error:
+        results_container.add_result(
+            pn.pane.Alert(str(error), alert_type="danger"), name="Frontier"
+        )
+        return
+    if frontier_points is None:
+        return
+
+    frontier_df, points_df = frontier_points
+    results_container.add_result(
+        ParetoFrontierResults(
+            frontier_df=frontier_df,
+            points_df=points_df,
+            objective_name=pareto_frontier.objective.objective_name,
+            epsilon_objective_name=pareto_frontier.epsilon_objective.objective_name,
+        ),
+        name="Frontier",
+    )
+
+
+objective_config = ObjectiveConfig(nutrient_bank=nb, on_frontier=frontier)
+
+
+def solve_sweep(active_fdc_ids, prices, run_sweep):
+    # Runs in the optimize button's worker thread, the values are solved in
+    # worker processes
+    solve_pantry.set_prices(prices)
+    solve_pantry.set_active_foods(active_fdc_ids)
+    return run_sweep()
+
+
+async def sweep(event):
+    if optimize_button.running:
+        return
+    parameter_sweep = ParameterSweep(
+        pantry=solve_pantry,
+        constraints=Constraints(
+            nutrient_constraints=nutrient_constraints_widgets.get_constraints()
+        ),
+    )
+    values = sweep_config.get_values()
+    if sweep_config.is_price_sweep():
+        run_sweep = partial(
+            parameter_sweep.sweep_price, sweep_config.fdc_id.value, values
+        )
+    else:
+        run_sweep = partial(
+            parameter_sweep.sweep_constraint,
+            sweep_config.get_nutrient_constraint(),
+            values,
+        )
+    active_fdc_ids = food_config.get_active_foods_fdc_ids()
+    prices = dict(pantry.price_overrides)
+
+    try:
+        sweep_df = await optimize_button.run(
+            solve_sweep, active_fdc_ids, prices, run_sweep
+        )
+    except ValueError as error:
+        results_container.add_result(
+            pn.pane.Alert(str(error), alert_type="danger"), name="Sweep"
+        )
+        return
+    if sweep_df is None:
+        return
+
+    results_container.add_result(
+        SweepResults(
+            sweep_df=sweep_df, parameter_name=sweep_config.get_parameter_name()
+        ),
+        name="Sweep",
+    )
+
+
+sweep_config = SweepConfig(nutrient_bank=nb, on_sweep=sweep)
+
+config_tabs = pn.Tabs(
+    ("Foods", food_config),
+    nutrient_config_tab,
+    ("Objective", objective_config),
+    ("Sweep", sweep_config),
+)
+
+optimize_button = OptimizeButton(on_click=optimize, on_cancel=fo.cancel)
 
 config = pn.Column(
     instructions,
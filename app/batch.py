@@ -0,0 +1,85 @@
+import pandas as pd
+import param
+from pyfoodopt import BasePantry, get_coefficient_matrix
+from solvers import DEFAULT_SOLVER, SOLVER_BACKENDS, get_solver_backend
+from workers import get_diet_row, get_worker_pantry, map_in_workers, worker_problem
+
+BATCH_RESULT_COLUMNS = [
+    "scenario",
+    "status",
+    "solved",
+    "cost",
+    "n_foods",
+    "foods",
+]
+
+
+def _solve_scenario(scenario):
+    constraint_rows, prices = scenario
+    fdc_ids = worker_problem["fdc_ids"]
+
+    coefficient_matrix = get_coefficient_matrix(
+        worker_problem["nutrient_matrix"],
+        worker_problem["nutrient_nbr_to_row"],
+        prices,
+        [nutrient_nbrs for nutrient_nbrs, _, _ in constraint_rows],
+    )
+    backend = get_solver_backend(worker_problem["solver"], msg=False)
+    backend.build(
+        coefficient_matrix,
+        constraint_rows,
+        [str(fdc_id) for fdc_id in fdc_ids],
+        [0] * len(fdc_ids),
+    )
+    return get_diet_row(backend.solve(), fdc_ids, prices)
+
+
+class BatchFoodOptimizer(param.Parameterized):
+    """
+    Solves many (constraints, prices) scenarios against one pantry in parallel.
+    The active foods of the pantry are compiled once and shipped to each worker
+    process a single time; scenarios only carry their constraint rows and price
+    vector.
+    """
+
+    pantry = param.ClassSelector(class_=BasePantry, doc="Pantry")
+    max_workers = param.Integer(
+        default=None, bounds=(1, None), doc="Number of worker processes"
+    )
+    solver = param.Selector(
+        default=DEFAULT_SOLVER, objects=list(SOLVER_BACKENDS), doc="Solver backend"
+    )
+
+    def get_price_vector(self, cols, fdc_id_to_price: dict = None):
+        prices = self.pantry.prices[cols].copy()
+        if fdc_id_to_price:
+            col_to_position = {col: i for i, col in enumerate(cols.tolist())}
+            for fdc_id, price in fdc_id_to_price.items():
+                position = col_to_position.get(self.pantry.fdc_id_to_col.get(fdc_id))
+                if position is not None:
+                    prices[position] = price
+        return prices
+
+    def optimize(self, scenarios: list, scenario_names: list = None):
+        """
+        Solves a list of (constraints, fdc_id_to_price) scenarios and returns a
+        DataFrame with one row per scenario. fdc_id_to_price overrides pantry
+        prices and may be None. The foods column maps fdc_id to grams.
+        """
+        if scenario_names is None:
+            scenario_names = list(range(len(scenarios)))
+        cols = self.pantry.get_active_cols()
+
+        tasks = [
+            (constraints.get_constraint_rows(), self.get_price_vector(cols, prices))
+            for constraints, prices in scenarios
+        ]
+        problem = {
+            **get_worker_pantry(self.pantry, cols),
+            "solver": self.solver,
+        }
+        results = map_in_workers(_solve_scenario, tasks, problem, self.max_workers)
+
+        df = pd.DataFrame(results, columns=BATCH_RESULT_COLUMNS[1:])
+        df.insert(0, "scenario", scenario_names)
+        return df
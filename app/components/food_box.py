@@ -3,6 +3,7 @@ import panel as pn
 import random
 from panel.viewable import Viewer
 from pyfoodopt import BaseFood
+from records import FoodRecord
 
 
 class FoodBox(Viewer):
@@ -24,6 +25,9 @@ class FoodBox(Viewer):
     ]
 
     def __init__(self, **params):
+        # Pantries hand out FoodRecords, the box holds their Parameterized adapter
+        if isinstance(params.get("food"), FoodRecord):
+            params["food"] = BaseFood.from_record(params["food"])
         super().__init__(**params)
         self.toggle = pn.widgets.Button(
             name="Enabled",
@@ -46,18 +50,6 @@ class FoodBox(Viewer):
                 "border-radius": "10px",
             },
         )
-        self.restrictions = set()
-
-    def handle_checkbox_click(self, event, restriction_name):
-        if event:
-            if not self.food.food_meta.restrictions.__getattribute__(restriction_name):
-                self.disable_toggle()
-                self.restrictions.add(restriction_name)
-        else:
-            if not self.food.food_meta.restrictions.__getattribute__(restriction_name):
-                self.restrictions.remove(restriction_name)
-                if len(self.restrictions) == 0:
-                    self.enable_toggle()
 
     def enable_toggle(self):
         self.toggle.name = "Enabled"
@@ -2,14 +2,16 @@ import param
 import panel as pn
 from panel.viewable import Viewer
 from components.food_box import FoodBox
-from pyfoodopt import BaseFood, Pantry
+from pyfoodopt import BaseFood, BasePantry, get_restriction_mask
+from search import FoodSearchIndex
+import numpy as np
 import pandas as pd
 from bokeh.models.widgets.tables import (
     NumberFormatter,
     BooleanFormatter,
     HTMLTemplateFormatter,
 )
-from bokeh.models.widgets.tables import NumberEditor
+from bokeh.models.widgets.tables import CheckboxEditor, NumberEditor
 
 # from nutrition_facts import NutritionFactsView
 from config import *
@@ -50,6 +52,9 @@ class FoodBoxesList(param.Parameterized):
 
     food_boxes = param.List(item_type=FoodBox)
     visible_food_boxes = param.List(item_type=FoodBox, default=[])
+    search_index = param.ClassSelector(
+        class_=FoodSearchIndex, default=None, doc="Index over the food box names"
+    )
 
     def __init__(self, **params):
         super().__init__(**params)
@@ -61,14 +66,34 @@ class FoodBoxesList(param.Parameterized):
         if search_term == "":
             self.visible_food_boxes = self.food_boxes
         else:
+            if self.search_index is None:
+                self.search_index = FoodSearchIndex(
+                    [fb.food.food_name for fb in self.food_boxes]
+                )
             self.visible_food_boxes = [
-                fb for fb in self.food_boxes if search_term in fb.food.food_name
+                self.food_boxes[i] for i in self.search_index.search(search_term)
             ]
 
 
 class FoodsContainer(Viewer):
 
-    pantry = param.ClassSelector(class_=Pantry)
+    pantry = param.ClassSelector(class_=BasePantry)
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.restriction_mask = np.uint16(0)
+
+    def update_restriction_mask(self, event, restriction_name):
+        """
+        Sets or clears the bit of restriction_name and returns, in pantry column
+        order, which foods satisfy every checked restriction.
+        """
+        restriction_bit = get_restriction_mask([restriction_name])
+        if event:
+            self.restriction_mask |= restriction_bit
+        else:
+            self.restriction_mask &= ~restriction_bit
+        return self.pantry.get_restriction_filter(self.restriction_mask)
 
     def handle_restriction_checkbox_clicked(self, event, restriction_name):
         pass
@@ -85,84 +110,92 @@ class FoodsContainer(Viewer):
 
 class FoodTabulatorContainer(FoodsContainer):
 
-    food_link_formatter = HTMLTemplateFormatter(template="<%= value %>")
-
-    def get_food_link_url(self, row):
-        link = f'<a href="https://fdc.nal.usda.gov/food-details/{row['fdc_id']}/nutrients" target="_blank">{row['food_name']}</a>'
-        return link
+    # Links are rendered in the browser from the row's fdc_id and food_name
+    food_link_formatter = HTMLTemplateFormatter(
+        template='<a href="https://fdc.nal.usda.gov/food-details/<%= fdc_id %>/nutrients" target="_blank"><%= food_name %></a>'
+    )
 
     def __init__(self, **params):
         super().__init__(**params)
-        self.active_restrictions = {fdc_id: set() for fdc_id in self.pantry.foods}
         self.food_tabulator = self.get_food_tabulator()
+        # Selected foods by pantry column. The active column is drawn from it and
+        # patched where it changes, so only the rows of the current page reach
+        # the browser
+        self.selected = self.food_tabulator.value.active.to_numpy(copy=True)
+        self.food_tabulator.on_edit(self.handle_price_edit)
+        self.food_tabulator.on_edit(self.handle_active_edit)
+
+    def set_selected(self, selected):
+        changed = np.flatnonzero(selected != self.selected)
+        self.selected = selected
+        if len(changed):
+            self.food_tabulator.patch(
+                {"active": list(zip(changed.tolist(), selected[changed].tolist()))}
+            )
+
+    def handle_active_edit(self, event):
+        if event.column != "active":
+            return
+        self.selected[event.row] = bool(event.value)
+
+    def handle_price_edit(self, event):
+        if event.column != "price":
+            return
+        fdc_id = self.food_tabulator.value.fdc_id.iloc[event.row]
+        self.pantry.set_prices({fdc_id: event.value})
 
     def get_food_tabulator(self):
-        foods = {
-            fdc_id: {"food_name": food.food_name, "price": food.price.price_per_100_g}
-            for fdc_id, food in self.pantry.foods.items()
-        }
-        foods_df = pd.DataFrame(foods).T
-        foods_df.index.name = "fdc_id"
-        foods_df = foods_df.reset_index(drop=False)
-        foods_df["food_link"] = foods_df.apply(self.get_food_link_url, axis=1)
+        self.pantry.compile()
+        foods_df = pd.DataFrame(
+            {
+                "active": np.ones(len(self.pantry.fdc_ids), dtype=bool),
+                "fdc_id": self.pantry.fdc_ids,
+                "food_name": self.pantry.food_names,
+                "price": self.pantry.prices,
+            }
+        )
 
         tabulator = pn.widgets.Tabulator(
             foods_df,
-            selectable="checkbox",
-            hidden_columns=[
-                c for c in foods_df.columns if c not in ["food_link", "price"]
-            ],
+            selectable=False,
+            hidden_columns=["fdc_id"],
             # row_content=self.row_content,
             show_index=False,
             formatters={
                 "price": NumberFormatter(format="0.00"),
-                # "active": BooleanFormatter(),
-                "food_link": FoodTabulatorContainer.food_link_formatter,
+                "active": BooleanFormatter(),
+                "food_name": FoodTabulatorContainer.food_link_formatter,
+            },
+            editors={
+                "price": NumberEditor(),
+                "active": CheckboxEditor(),
+                "food_name": None,
             },
-            editors={"price": NumberEditor(), "food_link": None},
             titles={
-                "food_link": "Food",
+                "food_name": "Food",
                 "price": "Price ($/100g)",
-                # "active": "Active",
+                "active": "Active",
             },
             stylesheets=[TABULATOR_STYLESHEET],
-            height=300,
+            pagination="remote",
+            page_size=FOOD_TABLE_PAGE_SIZE,
         )
-        tabulator.selection = list(tabulator.value.index)
         return tabulator
 
     def get_active_foods_fdc_ids(self, *args):
-        return self.food_tabulator.value.loc[
-            self.food_tabulator.selection
-        ].fdc_id.tolist()
-
-    def handle_restriction_for_fdc_id(self, event, restriction_name, fdc_id):
-        food = self.pantry.get_food_by_fdc_id(fdc_id)
-        if event:
-            if not food.food_meta.restrictions.__getattribute__(restriction_name):
-                self.active_restrictions[fdc_id].add(restriction_name)
-        else:
-            if not food.food_meta.restrictions.__getattribute__(restriction_name):
-                self.active_restrictions[fdc_id].remove(restriction_name)
-        if len(self.active_restrictions[fdc_id]) == 0:
-            return True
-        else:
-            return False
+        return self.food_tabulator.value.fdc_id.to_numpy()[self.selected].tolist()
 
     def handle_restriction_checkbox_clicked(self, event, restriction_name):
-        is_selected = self.food_tabulator.value.fdc_id.apply(
-            lambda x: self.handle_restriction_for_fdc_id(event, restriction_name, x)
-        )
-        new_selection = self.food_tabulator.value[is_selected].index.tolist()
-        self.food_tabulator.selection = new_selection
+        # Tabulator rows are in pantry column order
+        self.set_selected(self.update_restriction_mask(event, restriction_name))
 
     def get_active_fdc_ids_and_prices(self, *args) -> dict:
-        return (
-            self.food_tabulator.value.loc[self.food_tabulator.selection][
-                ["fdc_id", "price"]
-            ]
-            .set_index("fdc_id")
-            .price.to_dict()
+        foods_df = self.food_tabulator.value
+        return dict(
+            zip(
+                foods_df.fdc_id.to_numpy()[self.selected].tolist(),
+                foods_df.price.to_numpy()[self.selected].tolist(),
+            )
         )
 
     def __panel__(self):
@@ -238,8 +271,15 @@ class FoodBoxesContainer(FoodsContainer):
         )
 
     def handle_restriction_checkbox_clicked(self, event, restriction_name):
-        for food_box in self.food_boxes_list.food_boxes:
-            food_box.handle_checkbox_click(event, restriction_name)
+        # Food boxes are in pantry column order; only boxes whose foods changed
+        # from allowed to restricted or back are toggled
+        was_allowed = self.pantry.get_restriction_filter(self.restriction_mask)
+        is_allowed = self.update_restriction_mask(event, restriction_name)
+        for col in np.flatnonzero(was_allowed != is_allowed).tolist():
+            if is_allowed[col]:
+                self.food_boxes_list.food_boxes[col].enable_toggle()
+            else:
+                self.food_boxes_list.food_boxes[col].disable_toggle()
 
     def get_active_foods_fdc_ids(self, *args):
         return [
@@ -255,7 +295,7 @@ class FoodBoxesContainer(FoodsContainer):
 class FoodConfig(Viewer):
 
     food_restriction_name_mappings = param.Dict(default={})
-    pantry = param.ClassSelector(class_=Pantry)
+    pantry = param.ClassSelector(class_=BasePantry)
     show_tabulator = param.Boolean(default=True)
 
     def __init__(self, **params):
@@ -265,11 +305,14 @@ class FoodConfig(Viewer):
             self.foods_container = FoodTabulatorContainer(pantry=self.pantry)
         else:
             self.foods_container = FoodBoxesContainer(
+                pantry=self.pantry,
                 food_boxes_list=FoodBoxesList(
                     food_boxes=[
-                        FoodBox(food=food) for food in list(self.pantry.foods.values())
-                    ]
-                )
+                        FoodBox(food=self.pantry.get_food_by_fdc_id(fdc_id))
+                        for fdc_id in self.pantry.get_all_fdc_ids()
+                    ],
+                    search_index=self.pantry.get_search_index(),
+                ),
             )
 
         self.restriction_checks = RestrictionChecks(
@@ -284,15 +327,17 @@ class FoodConfig(Viewer):
             # restrict=False,
         )
 
-        def contains_filter(df, pattern, column):
+        search_index = self.pantry.get_search_index()
+
+        def search_filter(df, pattern):
+            # Rows are indexed by pantry column, matches come back ranked
             if not pattern:
                 return df
-            return df[df[column].str.lower().str.contains(pattern.lower())]
+            cols = search_index.search(pattern)
+            return df.loc[cols[np.isin(cols, df.index)]]
 
         self.foods_container.food_tabulator.add_filter(
-            pn.bind(
-                contains_filter, pattern=self.food_config_search_box, column="food_name"
-            )
+            pn.bind(search_filter, pattern=self.food_config_search_box)
         )
 
         def clear_search_box(event):
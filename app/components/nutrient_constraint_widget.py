@@ -1,7 +1,7 @@
 import param
 from panel.viewable import Viewer
 import panel as pn
-from pyfoodopt import NutrientConstraint
+from records import NutrientConstraintRecord
 
 
 class NutrientConstraintWidget(Viewer):
@@ -41,19 +41,19 @@ class NutrientConstraintWidget(Viewer):
         nbr_to_coefficient = {nbr: 1 for nbr in self.nutrient_nbrs}
         constraints = {self.nutrient_nbrs: {}}
         if self.lower_bound is not None:
-            constraints[self.nutrient_nbrs]["lower_bound"] = NutrientConstraint(
+            constraints[self.nutrient_nbrs]["lower_bound"] = NutrientConstraintRecord(
                 constraint_type="lower_bound",
                 constraint_value=self.lower_bound,
                 nbr_to_coefficient=nbr_to_coefficient,
             )
         if self.upper_bound is not None:
-            constraints[self.nutrient_nbrs]["upper_bound"] = NutrientConstraint(
+            constraints[self.nutrient_nbrs]["upper_bound"] = NutrientConstraintRecord(
                 constraint_type="upper_bound",
                 constraint_value=self.upper_bound,
                 nbr_to_coefficient=nbr_to_coefficient,
             )
         if self.equality is not None:
-            constraints[self.nutrient_nbrs]["equality"] = NutrientConstraint(
+            constraints[self.nutrient_nbrs]["equality"] = NutrientConstraintRecord(
                 constraint_type="equality",
                 constraint_value=self.equality,
                 nbr_to_coefficient=nbr_to_coefficient,
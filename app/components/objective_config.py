@@ -0,0 +1,85 @@
+import param
+import panel as pn
+from panel.viewable import Viewer
+from pyfoodopt import CostObjective, NutrientBank, NutrientObjective
+
+
+class ObjectiveConfig(Viewer):
+    """
+    Picks what Optimize optimizes, the cost of the diet or the amount of one
+    nutrient, and the objective a Pareto frontier trades it off against.
+    Objectives are reused while their selection does not change, so the
+    optimizer can keep patching its previous problem.
+    """
+
+    nutrient_bank = param.ClassSelector(class_=NutrientBank)
+
+    def __init__(self, on_frontier, **params):
+        super().__init__(**params)
+        nutrient_table = self.nutrient_bank.get_nutrient_table()
+        options = {"Cost": None}
+        for nutrient_nbr, nutrient_name, unit_name in zip(
+            nutrient_table.index.tolist(),
+            nutrient_table.nutrient_name,
+            nutrient_table.unit_name,
+        ):
+            options[f"{nutrient_name} ({unit_name})"] = nutrient_nbr
+        self._objectives = {}
+
+        self.objective_select = pn.widgets.Select(name="Objective", options=options)
+        self.objective_type = pn.widgets.RadioButtonGroup(
+            options=["minimize", "maximize"], value="minimize"
+        )
+        self.epsilon_objective_select = pn.widgets.Select(
+            name="Trade Off Against",
+            options=options,
+            value=list(options.values())[min(1, len(options) - 1)],
+        )
+        self.epsilon_objective_type = pn.widgets.RadioButtonGroup(
+            options=["minimize", "maximize"], value="maximize"
+        )
+        self.n_points = pn.widgets.IntInput(name="Points", value=20, start=2, end=100)
+        self.frontier_button = pn.widgets.Button(
+            name="Pareto Frontier", button_type="primary", on_click=on_frontier
+        )
+
+    def _get_objective(self, nutrient_nbr, objective_type):
+        # Cost is only ever minimized
+        key = (nutrient_nbr, "minimize" if nutrient_nbr is None else objective_type)
+        if key not in self._objectives:
+            if nutrient_nbr is None:
+                objective = CostObjective()
+            else:
+                objective = NutrientObjective(
+                    objective_name=self.nutrient_bank.get_nutrient_by_id(
+                        nutrient_nbr
+                    ).nutrient_name,
+                    objective_type=objective_type,
+                    nutrient_nbrs=[nutrient_nbr],
+                )
+            self._objectives[key] = objective
+        return self._objectives[key]
+
+    def get_objective(self):
+        return self._get_objective(
+            self.objective_select.value, self.objective_type.value
+        )
+
+    def get_epsilon_objective(self):
+        return self._get_objective(
+            self.epsilon_objective_select.value, self.epsilon_objective_type.value
+        )
+
+    def _layout(self):
+        return pn.Column(
+            pn.pane.Markdown("### Optimize"),
+            self.objective_select,
+            self.objective_type,
+            pn.pane.Markdown("### Pareto Frontier"),
+            self.epsilon_objective_select,
+            self.epsilon_objective_type,
+            pn.Row(self.n_points, self.frontier_button),
+        )
+
+    def __panel__(self):
+        return self._layout()
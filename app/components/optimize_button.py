@@ -1,19 +1,80 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import panel as pn
 from panel.viewable import Viewer
 
 
 class OptimizeButton(Viewer):
+    """
+    Optimize button that runs solves off the server's event loop. While a solve
+    is running the button turns into a Cancel button; clicking it calls
+    on_cancel so the solver can stop early and drops the result. The button
+    stays disabled until the cancelled solve returns, so the next solve never
+    queues behind it.
+    """
 
-    def __init__(self, on_click, **params):
+    def __init__(self, on_click, on_cancel=None, **params):
         super().__init__(**params)
         self._on_click = on_click
-        self._layout = pn.widgets.Button(
+        self._on_cancel = on_cancel
+        # A single worker keeps solves of one session in order
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._solve = None
+        self._cancelled = False
+        self._button = pn.widgets.Button(
             name="Optimize",
             button_type="primary",
-            on_click=self._on_click,
-            margin=(15, 0, 15, 0),
+            on_click=self._handle_click,
             width=100,
         )
+        self._spinner = pn.indicators.LoadingSpinner(
+            value=True, visible=False, width=30, height=30
+        )
+        self._layout = pn.Row(
+            self._button, self._spinner, margin=(15, 0, 15, 0), align="center"
+        )
+
+    async def _handle_click(self, event):
+        if self._solve is not None:
+            self._cancelled = True
+            self._button.param.update(name="Cancelling", disabled=True)
+            if self._on_cancel is not None:
+                self._on_cancel()
+            return
+        await self._on_click(event)
+
+    @property
+    def running(self):
+        return self._solve is not None
+
+    def _set_busy(self, busy: bool):
+        self._button.param.update(
+            name="Cancel" if busy else "Optimize",
+            button_type="warning" if busy else "primary",
+            disabled=False,
+        )
+        self._spinner.visible = busy
+
+    async def run(self, solve, *args):
+        """
+        Runs solve(*args) in a worker thread and returns its result, or None if
+        the solve was cancelled.
+        """
+        self._cancelled = False
+        self._solve = asyncio.get_running_loop().run_in_executor(
+            self._executor, solve, *args
+        )
+        self._set_busy(True)
+        try:
+            result = await self._solve
+        except Exception:
+            if self._cancelled:
+                return None
+            raise
+        finally:
+            self._solve = None
+            self._set_busy(False)
+        return None if self._cancelled else result
 
     def __panel__(self):
         return self._layout
@@ -2,37 +2,83 @@ import param
 import panel as pn
 from panel.viewable import Viewer
 from pyfoodopt import FoodOptimizer, NutrientBank
+from solvers import LpSolution, get_status_name
+from metrics import OPTIMIZE_STAGES, time_first_stage
+import numpy as np
 import pandas as pd
 from bokeh.models.widgets.tables import NumberFormatter
+from bokeh.plotting import figure
 from config import *
 
 SHADOW_PRICES_DISPLAY_COLUMNS = ["nutrient_names", "constraint_type", "pi"]
-OPTIMIZATION_FAIL_MARKDOWN = pn.pane.Markdown(
-    """
+RHS_RANGING_DISPLAY_COLUMNS = [
+    "nutrient_names",
+    "constraint_type",
+    "constraint_value",
+    "pi",
+    "value_lower",
+    "value_upper",
+]
+COST_RANGING_DISPLAY_COLUMNS = [
+    "fdc_id",
+    "food_name",
+    "cost",
+    "reduced_cost",
+    "price_per_100_g",
+    "price_lower",
+    "price_upper",
+]
+OPTIMIZATION_FAIL_MARKDOWN = pn.pane.Markdown("""
     ## Optimization Unsuccessful
     ### The optimization was unsuccessful. Please try again with different constraints or foods.
-    """
-)
+    """)
 
-SLACK_VARIABLES_EXPLANATION_MARKDOWN = pn.pane.Markdown(
-    """
+SLACK_VARIABLES_EXPLANATION_MARKDOWN = pn.pane.Markdown("""
     ## Slack Variables
     - PyFoodOpt implements slack variables in the optimization process. Eack slack variable is multiplied by 10,000 so that their values will almost always be zero for solveable problems.
     - PyFoodOpt uses two slack variables for each constraint, one "up" and one "down" which add slack in opposing directions. Two slack variables were used to avoid the need for an absolute value function in the objective function.
-    """
-)
+    """)
 
 
-def translate_nutrient_nbrs(nutrient_bank, nutrient_nbrs: str, delim="_"):
-    nutrient_nbrs = nutrient_nbrs.split(delim)
+def translate_nutrient_nbrs(nutrient_bank, nutrient_nbrs: tuple):
     nutrient_names = []
     for nbr in nutrient_nbrs:
-        nutrient = nutrient_bank.get_nutrient_by_id(int(nbr))
+        nutrient = nutrient_bank.get_nutrient_by_id(nbr)
         if nutrient is not None:
             nutrient_names.append(nutrient.nutrient_name)
     return " + ".join(nutrient_names)
 
 
+class LazyAccordion(Viewer):
+    """
+    Accordion with a single section whose content is built by calling build()
+    the first time the section is expanded. With timings, the first build of
+    the stage is timed into them.
+    """
+
+    title = param.String(default=None, doc="Title of the section")
+    timings = param.Dict(default=None, doc="Stage timings of the solve shown")
+    stage = param.String(default=None, doc="Stage the build is timed as")
+
+    def __init__(self, build, **params):
+        super().__init__(**params)
+        self._build = build
+        self._content = pn.Column()
+        self._accordion = pn.Accordion((self.title, self._content))
+        self._accordion.param.watch(self._handle_active, "active")
+
+    def _handle_active(self, event):
+        if event.new and not self._content.objects:
+            if self.timings is None:
+                self._content.objects = [self._build()]
+                return
+            with time_first_stage(self.timings, self.stage):
+                self._content.objects = [self._build()]
+
+    def __panel__(self):
+        return self._accordion
+
+
 class OptimizationFailInfo(Viewer):
 
     TABULATOR_COLUMNS = [
@@ -44,21 +90,16 @@ class OptimizationFailInfo(Viewer):
 
     food_optimizer = param.ClassSelector(class_=FoodOptimizer)
     nutrient_bank = param.ClassSelector(class_=NutrientBank)
-
-    def __init__(self, **params):
-        super().__init__(**params)
-        self.slack_variables = self.food_optimizer.get_slack_variables()
+    result = param.ClassSelector(class_=LpSolution, default=None)
 
     def get_slack_vars_tabulator(self):
-        self.slack_variables["nutrient_names"] = (
-            self.slack_variables.nutrient_nbrs.apply(
-                lambda x: translate_nutrient_nbrs(self.nutrient_bank, x, delim=";")
-            )
+        slack_variables = self.food_optimizer.get_slack_variables(self.result)
+        slack_variables = slack_variables.loc[slack_variables.slack_value != 0].copy()
+        slack_variables["nutrient_names"] = slack_variables.nutrient_nbrs.apply(
+            lambda x: translate_nutrient_nbrs(self.nutrient_bank, x)
         )
         return pn.widgets.Tabulator(
-            self.slack_variables.loc[self.slack_variables.slack_value != 0][
-                OptimizationFailInfo.TABULATOR_COLUMNS
-            ],
+            slack_variables[OptimizationFailInfo.TABULATOR_COLUMNS],
             titles={
                 "nutrient_names": "Nutrients",
                 "slack_value": "Value",
@@ -74,7 +115,9 @@ class OptimizationFailInfo(Viewer):
             pn.widgets.ButtonIcon(icon="alert-hexagon", disabled=True, size="100px"),
             OPTIMIZATION_FAIL_MARKDOWN,
             SLACK_VARIABLES_EXPLANATION_MARKDOWN,
-            pn.Accordion(("Nonzero Slack Variables", self.get_slack_vars_tabulator())),
+            LazyAccordion(
+                self.get_slack_vars_tabulator, title="Nonzero Slack Variables"
+            ),
         )
 
     def __panel__(self):
@@ -115,8 +158,8 @@ class AggregateResultInfo(Viewer):
 class AggregateResultNutritionFacts(Viewer):
 
     food_optimizer = param.ClassSelector(class_=FoodOptimizer)
-    optimal_foods = param.DataFrame(default=None)
     nutrient_bank = param.ClassSelector(class_=NutrientBank)
+    result = param.ClassSelector(class_=LpSolution, default=None)
 
     tabulator_formatters = {
         "Amount": NumberFormatter(format="0.00"),
@@ -124,8 +167,6 @@ class AggregateResultNutritionFacts(Viewer):
 
     def __init__(self, **params):
         super().__init__(**params)
-        if self.optimal_foods is None:
-            self.optimal_foods = self.food_optimizer.get_optimal_foods()
         self.tabulator = self.get_aggregate_nutrition_facts_tabulator()
         self._layout = pn.Column(self.tabulator)
 
@@ -141,34 +182,16 @@ class AggregateResultNutritionFacts(Viewer):
         return tabulator
 
     def get_aggregate_nutrition_facts_df(self):
-        nutrition_dict = {}
-        for i, row in self.optimal_foods.iterrows():
-            food = self.food_optimizer.pantry.get_food_by_fdc_id(row["fdc_id"])
-            nutrition_dict[str(row["fdc_id"])] = {
-                nutrient_nbr: amount * row["amount"] / 100
-                for nutrient_nbr, amount in food.food_nutrition.items()
+        nutrition_df = self.nutrient_bank.get_nutrient_table().join(
+            self.food_optimizer.get_nutrient_totals(self.result), how="inner"
+        )
+        return pd.DataFrame(
+            {
+                "Nutrient": nutrition_df.nutrient_name.to_numpy(),
+                "Amount": nutrition_df.amount.to_numpy(),
+                "Units": nutrition_df.unit_name.to_numpy(),
             }
-        nutrition_df = pd.DataFrame(nutrition_dict)
-        nutrient_units = [
-            self.nutrient_bank.get_nutrient_by_id(nbr).unit_name
-            for nbr in nutrition_df.index
-        ]
-        nutrient_names = [
-            self.nutrient_bank.get_nutrient_by_id(nbr).nutrient_name
-            for nbr in nutrition_df.index
-        ]
-        # nutrition_df.columns = pd.MultiIndex.from_tuples(
-        #     list(zip(nutrition_df.columns.astype(str), nutrient_names)),
-        #     names=["nutrient_nbr", "nutrient_name"]
-        # )
-        nutrition_df.index = nutrient_names
-        nutrition_df = (
-            nutrition_df.T.sum()
-            .reset_index()
-            .rename(columns={"index": "Nutrient", 0: "Amount"})
-        )
-        nutrition_df["Units"] = nutrient_units
-        return nutrition_df
+        )
 
     def __panel__(self):
         return self._layout
@@ -177,13 +200,11 @@ class AggregateResultNutritionFacts(Viewer):
 class ShadowPrices(Viewer):
     food_optimizer = param.ClassSelector(class_=FoodOptimizer)
     nutrient_bank = param.ClassSelector(class_=NutrientBank)
+    result = param.ClassSelector(class_=LpSolution, default=None)
 
     def __init__(self, **params):
         super().__init__(**params)
-        self.shadow_prices = self.food_optimizer.get_shadow_prices()
-        self.shadow_prices[["nutrient_nbrs", "constraint_type"]] = (
-            self.shadow_prices.constraint_name.str.split(":", expand=True)
-        )
+        self.shadow_prices = self.food_optimizer.get_shadow_prices(self.result)
         self.shadow_prices["nutrient_names"] = self.shadow_prices[
             "nutrient_nbrs"
         ].apply(lambda x: translate_nutrient_nbrs(self.nutrient_bank, x))
@@ -199,70 +220,310 @@ class ShadowPrices(Viewer):
         return self._layout
 
 
+class SensitivityRanges(Viewer):
+    """
+    How far each constraint value and food price can move before the optimal
+    basis changes: the shadow prices hold over the constraint ranges and the
+    chosen foods stay the same over the price ranges.
+    """
+
+    food_optimizer = param.ClassSelector(class_=FoodOptimizer)
+    nutrient_bank = param.ClassSelector(class_=NutrientBank)
+    result = param.ClassSelector(class_=LpSolution, default=None)
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.rhs_ranging = self.food_optimizer.get_rhs_ranging(self.result)
+        self.rhs_ranging["nutrient_names"] = self.rhs_ranging["nutrient_nbrs"].apply(
+            lambda x: translate_nutrient_nbrs(self.nutrient_bank, x)
+        )
+        self.cost_ranging = self.food_optimizer.get_cost_ranging(
+            self.result
+        ).sort_values("reduced_cost", kind="stable")
+
+    def get_rhs_ranging_tabulator(self):
+        return pn.widgets.Tabulator(
+            self.rhs_ranging[RHS_RANGING_DISPLAY_COLUMNS],
+            titles={
+                "nutrient_names": "Nutrients",
+                "constraint_type": "Type",
+                "constraint_value": "Value",
+                "pi": "Shadow Price",
+                "value_lower": "Value From",
+                "value_upper": "Value To",
+            },
+            show_index=False,
+            stylesheets=[TABULATOR_STYLESHEET],
+            disabled=True,
+        )
+
+    def get_cost_ranging_tabulator(self):
+        return pn.widgets.Tabulator(
+            self.cost_ranging[COST_RANGING_DISPLAY_COLUMNS],
+            titles={
+                "fdc_id": "FDC ID",
+                "food_name": "Food",
+                "cost": "Cost ($)",
+                "reduced_cost": "Reduced Cost",
+                "price_per_100_g": "Price ($/100 g)",
+                "price_lower": "Price From",
+                "price_upper": "Price To",
+            },
+            formatters={
+                column: NumberFormatter(format="0.00")
+                for column in [
+                    "cost",
+                    "price_per_100_g",
+                    "price_lower",
+                    "price_upper",
+                ]
+            },
+            show_index=False,
+            pagination="remote",
+            page_size=FOOD_TABLE_PAGE_SIZE,
+            stylesheets=[TABULATOR_STYLESHEET],
+            disabled=True,
+        )
+
+    def _layout(self):
+        return pn.Column(
+            pn.pane.Markdown("### Constraint Values"),
+            self.get_rhs_ranging_tabulator(),
+            pn.pane.Markdown("### Food Prices"),
+            self.get_cost_ranging_tabulator(),
+        )
+
+    def __panel__(self):
+        return self._layout
+
+
+class Diagnostics(Viewer):
+    """
+    Where the time of one optimize went, stage by stage, and the size of the
+    model that was solved.
+    """
+
+    result = param.ClassSelector(class_=LpSolution, default=None)
+
+    def get_timings_df(self):
+        stages = [stage for stage in OPTIMIZE_STAGES if stage in self.result.timings]
+        stages += [stage for stage in self.result.timings if stage not in stages]
+        return pd.DataFrame(
+            {
+                "Stage": stages,
+                "Wall (s)": [self.result.timings[stage]["wall_s"] for stage in stages],
+                "CPU (s)": [self.result.timings[stage]["cpu_s"] for stage in stages],
+            }
+        )
+
+    def get_model_info_markdown(self):
+        result = self.result
+        model_info = f"""
+            - **Solver:** {result.solver}
+            - **Status:** {get_status_name(result)}
+            - **Iterations:** {"n/a" if result.iterations is None else result.iterations}
+            - **Variables:** {result.n_variables}
+            - **Constraints:** {result.n_constraints}
+            - **Nonzeros:** {result.n_nonzeros}
+            """
+        if result.relaxation_objective is not None:
+            mip_gap = "n/a" if result.mip_gap is None else f"{result.mip_gap:.2%}"
+            model_info += f"""
+            - **LP Relaxation Objective:** {result.relaxation_objective:.4f}
+            - **MIP Gap:** {mip_gap}
+            """
+        return pn.pane.Markdown(model_info)
+
+    def get_presolve_layout(self):
+        report = self.result.presolve_report
+        counts = report.reason.value_counts(sort=False)
+        return pn.Column(
+            pn.pane.Markdown(
+                f"**Presolve** left {len(report)} foods out of the model: "
+                + ", ".join(f"{count} {reason}" for reason, count in counts.items())
+            ),
+            pn.widgets.Tabulator(
+                report,
+                titles={
+                    "fdc_id": "FDC ID",
+                    "food_name": "Food",
+                    "reason": "Reason",
+                    "kept_fdc_id": "Replaced By",
+                },
+                show_index=False,
+                pagination="remote",
+                page_size=FOOD_TABLE_PAGE_SIZE,
+                stylesheets=[TABULATOR_STYLESHEET],
+                disabled=True,
+            ),
+        )
+
+    def _layout(self):
+        layout = pn.Column(
+            self.get_model_info_markdown(),
+            pn.widgets.Tabulator(
+                self.get_timings_df(),
+                show_index=False,
+                formatters={
+                    "Wall (s)": NumberFormatter(format="0.0000"),
+                    "CPU (s)": NumberFormatter(format="0.0000"),
+                },
+                stylesheets=[TABULATOR_STYLESHEET],
+                disabled=True,
+            ),
+        )
+        if self.result.presolve_report is not None:
+            layout.append(self.get_presolve_layout())
+        return layout
+
+    def __panel__(self):
+        return self._layout
+
+
 class Results(Viewer):
+    """
+    Keeps only the solution vectors of one solve. The sections of the layout are
+    built when their accordion is first expanded.
+    """
 
     solved = param.Boolean(default=True)
     food_optimizer = param.ClassSelector(class_=FoodOptimizer, doc="The FoodOptimizer")
     nutrient_bank = param.ClassSelector(class_=NutrientBank)
+    result = param.ClassSelector(
+        class_=LpSolution, default=None, doc="Solution, defaults to the latest solve"
+    )
+    show_diagnostics = param.Boolean(
+        default=False, doc="Add a section with the timings of each stage"
+    )
 
     def __init__(self, **params):
         super().__init__(**params)
+        # Kept so the results show this solve even if the optimizer re-solves
+        if self.result is None:
+            self.result = self.food_optimizer.results[-1]
+        self.solved = self.problem_solved()
 
-        if not self.problem_solved():
-            self.solved = False
-            return
+    def problem_solved(self):
+        return bool(self.result.slack_up.sum() + self.result.slack_down.sum() == 0)
 
-        self.optimal_foods = self.food_optimizer.get_optimal_foods()
-        self.optimal_foods["food_name"] = self.optimal_foods["food_name"].str.replace(
-            "_", " "
-        )
-        self.optimal_foods["fdc_id"] = self.optimal_foods["fdc_id"].astype(int)
-        self.optimal_foods_tabulator = pn.widgets.Tabulator(
-            self.optimal_foods[FOOD_TABLE_COLUMNS],
-            titles=FOOD_TABLE_MAPPINGS,
+    def get_optimal_foods_tabulator(self):
+        optimal_foods = self.food_optimizer.get_optimal_foods(self.result)
+        columns = FOOD_TABLE_COLUMNS
+        if "servings" in optimal_foods:
+            columns = columns + ["servings"]
+        return pn.widgets.Tabulator(
+            optimal_foods[columns],
+            titles={**FOOD_TABLE_MAPPINGS, "servings": "Servings"},
             show_index=False,
             layout="fit_data_table",
             stylesheets=[TABULATOR_STYLESHEET],
             disabled=True,
         )
-        self.aggregate_result_info = AggregateResultInfo(
-            cost=self.optimal_foods.cost.sum(), n_foods=self.optimal_foods.shape[0]
+
+    def get_aggregate_result_nutrition_facts(self):
+        return AggregateResultNutritionFacts(
+            food_optimizer=self.food_optimizer,
+            nutrient_bank=self.nutrient_bank,
+            result=self.result,
         )
 
-        self.aggregate_result_nutrition_facts = AggregateResultNutritionFacts(
+    def get_shadow_prices(self):
+        return ShadowPrices(
             food_optimizer=self.food_optimizer,
-            optimal_foods=self.optimal_foods,
             nutrient_bank=self.nutrient_bank,
+            result=self.result,
         )
 
-        self.shadow_prices = ShadowPrices(
-            food_optimizer=self.food_optimizer, nutrient_bank=self.nutrient_bank
+    def get_sensitivity_ranges(self):
+        return SensitivityRanges(
+            food_optimizer=self.food_optimizer,
+            nutrient_bank=self.nutrient_bank,
+            result=self.result,
         )
 
-    def problem_solved(self):
-        slack_variables = self.food_optimizer.get_slack_variables()
-        if slack_variables.slack_value.sum() != 0:
-            return False
-        return True
+    def get_diagnostics(self):
+        return Diagnostics(result=self.result)
+
+    def get_accordion(self, build, title: str, stage: str):
+        return LazyAccordion(
+            build, title=title, timings=self.result.timings, stage=stage
+        )
 
     def _layout(self):
-        if not self.solved:
-            return OptimizationFailInfo(
-                food_optimizer=self.food_optimizer, nutrient_bank=self.nutrient_bank
-            )
-        else:
-            return self._layout_successful()
+        # Timed after the metrics hooks ran, so it only shows in the diagnostics.
+        # Tabs released while hidden render again, only the first render is
+        # recorded; the sections are timed when they are first expanded
+        with time_first_stage(self.result.timings, "results_layout"):
+            if not self.solved:
+                layout = pn.Column(
+                    OptimizationFailInfo(
+                        food_optimizer=self.food_optimizer,
+                        nutrient_bank=self.nutrient_bank,
+                        result=self.result,
+                    )
+                )
+            else:
+                layout = self._layout_successful()
+            if self.show_diagnostics:
+                layout.extend(
+                    [
+                        pn.pane.Markdown("## Diagnostics"),
+                        LazyAccordion(self.get_diagnostics, title="Diagnostics"),
+                    ]
+                )
+        return layout
 
     def _layout_successful(self):
-        return pn.Column(
-            self.aggregate_result_info,
-            pn.pane.Markdown("## Foods"),
-            pn.Accordion(("Food Info", self.optimal_foods_tabulator)),
-            pn.pane.Markdown("## Nutrition Facts"),
-            pn.Accordion(("Nutrition Facts", self.aggregate_result_nutrition_facts)),
-            pn.pane.Markdown("## Shadow Prices"),
-            pn.Accordion(("Shadow Prices", self.shadow_prices)),
+        layout = pn.Column(
+            AggregateResultInfo(
+                cost=self.result.x.sum(), n_foods=np.count_nonzero(self.result.x)
+            ),
         )
+        if not self.result.proven_optimal:
+            message = (
+                "The solver stopped before proving this diet optimal, it is the"
+                " best one found in the time limit."
+            )
+            if self.result.mip_gap is not None:
+                message += (
+                    f" It may cost up to {self.result.mip_gap:.1%} more than the"
+                    " optimal diet."
+                )
+            layout.append(pn.pane.Alert(message, alert_type="warning"))
+        layout.extend(
+            [
+                pn.pane.Markdown("## Foods"),
+                self.get_accordion(
+                    self.get_optimal_foods_tabulator, "Food Info", "results_foods"
+                ),
+                pn.pane.Markdown("## Nutrition Facts"),
+                self.get_accordion(
+                    self.get_aggregate_result_nutrition_facts,
+                    "Nutrition Facts",
+                    "results_nutrition_facts",
+                ),
+            ]
+        )
+        # A mixed integer solve has no meaningful shadow prices
+        if self.result.servings is None:
+            layout.extend(
+                [
+                    pn.pane.Markdown("## Shadow Prices"),
+                    self.get_accordion(
+                        self.get_shadow_prices, "Shadow Prices", "results_shadow_prices"
+                    ),
+                ]
+            )
+        if self.result.rhs_lower is not None:
+            layout.extend(
+                [
+                    pn.pane.Markdown("## Sensitivity Ranges"),
+                    self.get_accordion(
+                        self.get_sensitivity_ranges, "Ranges", "results_ranges"
+                    ),
+                ]
+            )
+        return layout
 
     def get_aggregate_results_info(self):
         total_cost = self.optimal_foods.cost.sum()
@@ -273,18 +534,181 @@ class Results(Viewer):
         return self._layout
 
 
+class SweepResults(Viewer):
+    """
+    Cost and number of foods of the optimal diet over the values of a
+    ParameterSweep.
+    """
+
+    sweep_df = param.DataFrame(default=None, doc="DataFrame from a ParameterSweep")
+    parameter_name = param.String(default="Value", doc="Label of the swept values")
+
+    def get_cost_plot(self):
+        df = self.sweep_df
+        plot = figure(
+            height=300,
+            sizing_mode="stretch_width",
+            x_axis_label=self.parameter_name,
+            y_axis_label="Total Cost ($)",
+            tools="pan,wheel_zoom,box_zoom,reset,hover",
+            tooltips=[
+                (self.parameter_name, "@value"),
+                ("Cost", "@cost{$0.00}"),
+                ("# of Foods", "@n_foods"),
+            ],
+        )
+        source = {
+            "value": df.value.to_numpy(),
+            "cost": df.cost.to_numpy(),
+            "n_foods": df.n_foods.to_numpy(),
+        }
+        plot.line("value", "cost", source=source, line_width=2)
+        plot.scatter("value", "cost", source=source, size=6)
+        return pn.pane.Bokeh(plot, sizing_mode="stretch_width")
+
+    def get_sweep_tabulator(self):
+        df = self.sweep_df
+        return pn.widgets.Tabulator(
+            pd.DataFrame(
+                {
+                    self.parameter_name: df.value.to_numpy(),
+                    "Status": df.status.to_numpy(),
+                    "Total Cost ($)": df.cost.to_numpy(),
+                    "# of Foods": df.n_foods.to_numpy(),
+                    "Binding Constraints": df.binding_constraints.apply(
+                        ", ".join
+                    ).to_numpy(),
+                }
+            ),
+            show_index=False,
+            formatters={"Total Cost ($)": NumberFormatter(format="0.00")},
+            stylesheets=[TABULATOR_STYLESHEET],
+            disabled=True,
+        )
+
+    def _layout(self):
+        return pn.Column(
+            self.get_cost_plot(),
+            LazyAccordion(self.get_sweep_tabulator, title="Sweep Values"),
+        )
+
+    def __panel__(self):
+        return self._layout
+
+
+class ParetoFrontierResults(Viewer):
+    """
+    The diets of a ParetoFrontier that no other diet beats on both objectives,
+    drawn over every point solved.
+    """
+
+    frontier_df = param.DataFrame(
+        default=None, doc="Non-dominated rows from ParetoFrontier.get_frontier"
+    )
+    points_df = param.DataFrame(default=None, doc="Every row from ParetoFrontier.solve")
+    objective_name = param.String(default="Objective", doc="Label of the objective")
+    epsilon_objective_name = param.String(
+        default="Epsilon Objective", doc="Label of the epsilon objective"
+    )
+
+    def get_source(self, df):
+        return {
+            "objective_value": df.objective_value.to_numpy(),
+            "epsilon_value": df.epsilon_value.to_numpy(),
+            "cost": df.cost.to_numpy(),
+            "n_foods": df.n_foods.to_numpy(),
+        }
+
+    def get_frontier_plot(self):
+        plot = figure(
+            height=300,
+            sizing_mode="stretch_width",
+            x_axis_label=self.epsilon_objective_name,
+            y_axis_label=self.objective_name,
+            tools="pan,wheel_zoom,box_zoom,reset,hover",
+            tooltips=[
+                (self.epsilon_objective_name, "@epsilon_value"),
+                (self.objective_name, "@objective_value"),
+                ("Cost", "@cost{$0.00}"),
+                ("# of Foods", "@n_foods"),
+            ],
+        )
+        if self.points_df is not None:
+            points = self.points_df[self.points_df.solved]
+            plot.scatter(
+                "epsilon_value",
+                "objective_value",
+                source=self.get_source(points),
+                size=6,
+                color="gray",
+                alpha=0.4,
+                legend_label="Solved",
+            )
+        source = self.get_source(self.frontier_df)
+        plot.line("epsilon_value", "objective_value", source=source, line_width=2)
+        plot.scatter(
+            "epsilon_value",
+            "objective_value",
+            source=source,
+            size=6,
+            legend_label="Non-dominated",
+        )
+        plot.legend.location = "top_left"
+        return pn.pane.Bokeh(plot, sizing_mode="stretch_width")
+
+    def get_frontier_tabulator(self):
+        df = self.frontier_df
+        return pn.widgets.Tabulator(
+            pd.DataFrame(
+                {
+                    self.epsilon_objective_name: df.epsilon_value.to_numpy(),
+                    self.objective_name: df.objective_value.to_numpy(),
+                    "Total Cost ($)": df.cost.to_numpy(),
+                    "# of Foods": df.n_foods.to_numpy(),
+                }
+            ),
+            show_index=False,
+            formatters={"Total Cost ($)": NumberFormatter(format="0.00")},
+            stylesheets=[TABULATOR_STYLESHEET],
+            disabled=True,
+        )
+
+    def _layout(self):
+        return pn.Column(
+            self.get_frontier_plot(),
+            LazyAccordion(self.get_frontier_tabulator, title="Non-dominated Diets"),
+        )
+
+    def __panel__(self):
+        return self._layout
+
+
 class ResultsTabs(Viewer):
 
     # results = param.List(item_type=Results, doc="List of Results")
 
     def __init__(self, **params):
         super().__init__(**params)
-        self.results_tabs = pn.Tabs(closable=True)
+        # Only the active tab is rendered; closed tabs are cleaned up by Panel
+        self.results_tabs = pn.Tabs(closable=True, dynamic=True)
+        self.results_tabs.param.watch(self._release_tab, "active")
         self._num_results = 0
 
-    def add_result(self, result: Results):
+    def _release_tab(self, event):
+        """
+        Swaps the wrapper of the tab that was left for a new one, so Panel drops
+        the Bokeh models it rendered. The Results object is rendered again if the
+        tab is reopened.
+        """
+        if event.old is None or not 0 <= event.old < len(self.results_tabs):
+            return
+        tab = self.results_tabs[event.old]
+        self.results_tabs[event.old] = pn.Column(*tab.objects, name=tab.name)
+
+    def add_result(self, result: Results, name: str = "Result"):
         self._num_results += 1
-        self.results_tabs.append((f"Result {self._num_results}", result))
+        self.results_tabs.append(pn.Column(result, name=f"{name} {self._num_results}"))
+        self.results_tabs.active = len(self.results_tabs) - 1
 
     def __panel__(self):
         return self.results_tabs
@@ -319,10 +743,10 @@ class ResultsContainer(Viewer):
     def _layout(self):
         return self.layout
 
-    def add_result(self, results: Results):
+    def add_result(self, results: Results, name: str = "Result"):
         if self.n_results == 0:
             self.layout.pop(1)
-        self.results_tabs.add_result(results)
+        self.results_tabs.add_result(results, name)
         self.n_results += 1
 
     def __panel__(self):
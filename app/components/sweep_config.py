@@ -0,0 +1,89 @@
+import numpy as np
+import param
+import panel as pn
+from panel.viewable import Viewer
+from pyfoodopt import NutrientBank
+from records import NutrientConstraintRecord
+
+SWEEP_KINDS = ["Constraint", "Price"]
+CONSTRAINT_TYPES = {"Lower Bound": "lower_bound", "Upper Bound": "upper_bound"}
+
+
+class SweepConfig(Viewer):
+    """
+    Picks what a ParameterSweep varies, the value of one nutrient constraint or
+    the price of one food, and the grid of values it is solved over.
+    """
+
+    nutrient_bank = param.ClassSelector(class_=NutrientBank)
+
+    def __init__(self, on_sweep, **params):
+        super().__init__(**params)
+        nutrient_table = self.nutrient_bank.get_nutrient_table()
+        options = {}
+        for nutrient_nbr, nutrient_name, unit_name in zip(
+            nutrient_table.index.tolist(),
+            nutrient_table.nutrient_name,
+            nutrient_table.unit_name,
+        ):
+            options[f"{nutrient_name} ({unit_name})"] = nutrient_nbr
+        self._nutrient_labels = {nbr: label for label, nbr in options.items()}
+
+        self.kind = pn.widgets.RadioButtonGroup(options=SWEEP_KINDS, value="Constraint")
+        self.nutrient_select = pn.widgets.Select(name="Nutrient", options=options)
+        self.constraint_type = pn.widgets.Select(
+            name="Constraint", options=CONSTRAINT_TYPES
+        )
+        self.fdc_id = pn.widgets.IntInput(name="FDC ID", value=None, visible=False)
+        self.start = pn.widgets.FloatInput(name="From", value=0.0, start=0.0)
+        self.stop = pn.widgets.FloatInput(name="To", value=100.0, start=0.0)
+        self.n_points = pn.widgets.IntInput(name="Points", value=20, start=2, end=100)
+        self.sweep_button = pn.widgets.Button(
+            name="Sweep", button_type="primary", on_click=on_sweep
+        )
+        self.kind.param.watch(self._handle_kind, "value")
+
+    def _handle_kind(self, event):
+        is_price = event.new == "Price"
+        self.fdc_id.visible = is_price
+        self.nutrient_select.visible = not is_price
+        self.constraint_type.visible = not is_price
+
+    def is_price_sweep(self):
+        return self.kind.value == "Price"
+
+    def get_values(self):
+        return np.linspace(self.start.value, self.stop.value, self.n_points.value)
+
+    def get_nutrient_constraint(self):
+        """
+        Returns a record naming the swept constraint; its value is not used.
+        """
+        return NutrientConstraintRecord(
+            constraint_type=self.constraint_type.value,
+            constraint_value=0.0,
+            nbr_to_coefficient={self.nutrient_select.value: 1},
+        )
+
+    def get_parameter_name(self):
+        if self.is_price_sweep():
+            return f"Price per 100 g of {self.fdc_id.value} ($)"
+        constraint_labels = {value: label for label, value in CONSTRAINT_TYPES.items()}
+        return (
+            f"{self._nutrient_labels[self.nutrient_select.value]}"
+            f" {constraint_labels[self.constraint_type.value].lower()}"
+        )
+
+    def _layout(self):
+        return pn.Column(
+            pn.pane.Markdown("### Parameter Sweep"),
+            self.kind,
+            self.nutrient_select,
+            self.constraint_type,
+            self.fdc_id,
+            pn.Row(self.start, self.stop),
+            pn.Row(self.n_points, self.sweep_button),
+        )
+
+    def __panel__(self):
+        return self._layout()
@@ -1,7 +1,38 @@
+import os
 from pyfoodopt import FoodRestrictions
 
 CONFIG_RESULTS_WIDTH = 700
 
+# Rows per page of the pantry table; pages are sliced on the server
+FOOD_TABLE_PAGE_SIZE = 20
+
+# Seconds a single Optimize click may spend in the solver
+SOLVE_TIME_LIMIT = 60
+
+# Leave foods that cannot lower the cost of a diet out of the solver model. On
+# large pantries presolve takes longer than the cold solve it shrinks, and
+# incremental re-solves skip it, so it is off unless the pantry holds many
+# duplicate or dominated foods
+PRESOLVE_FOODS = False
+
+# Buy foods with a serving size in whole servings, with at most MAX_FOODS
+# distinct foods of at least MIN_PORTION_G grams each; solved as a mixed integer
+# problem that stops within MIP_GAP of the optimal cost
+PORTION_MODE = False
+MAX_FOODS = None
+MIN_PORTION_G = 0
+MIP_GAP = 0.01
+
+# Report how far prices and constraint values can move before the diet changes
+COMPUTE_RANGING = True
+
+# Show the stage timings and model size of each solve under its results
+SHOW_DIAGNOSTICS = True
+
+# Prometheus metrics are written here after every solve when it is set, for the
+# node_exporter textfile collector
+METRICS_TEXTFILE = os.environ.get("PYFOODOPT_METRICS_TEXTFILE")
+
 FOOD_RESTRICTIONS = [r for r in FoodRestrictions.param.objects() if r != "name"]
 
 
@@ -0,0 +1,165 @@
+from contextlib import contextmanager
+import os
+import tempfile
+import threading
+import time
+import param
+import pulp
+
+# Stages timed by FoodOptimizer and the solver backends, in the order they run.
+# The metrics hooks see every one of them; stages timed later, like the layout
+# of the results, are only shown in the diagnostics
+OPTIMIZE_STAGES = [
+    "presolve",
+    "build",
+    "relaxation",
+    "core",
+    "solver",
+    "read_solution",
+    "extract",
+]
+
+
+@contextmanager
+def time_stage(timings: dict, stage: str):
+    """
+    Adds the wall and CPU seconds spent in the block to timings[stage].
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        timing = timings.setdefault(stage, {"wall_s": 0.0, "cpu_s": 0.0})
+        timing["wall_s"] += time.perf_counter() - wall_start
+        timing["cpu_s"] += time.process_time() - cpu_start
+
+
+@contextmanager
+def time_first_stage(timings: dict, stage: str):
+    """
+    Like time_stage, but only the first run of the stage is recorded, for
+    stages like rendering that can run again for the same solve.
+    """
+    if stage in timings:
+        yield
+        return
+    with time_stage(timings, stage):
+        yield
+
+
+def emit_metrics(hooks: list, result):
+    """
+    Calls every hook with the solution. A failing hook is reported and does not
+    stop the others or the solve.
+    """
+    for hook in hooks:
+        try:
+            hook(result)
+        except Exception as error:
+            param.main.param.warning(f"Metrics hook {hook!r} failed: {error}")
+
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict):
+    if not labels:
+        return ""
+    pairs = [f'{key}="{_escape_label_value(value)}"' for key, value in labels.items()]
+    return "{" + ",".join(pairs) + "}"
+
+
+class PrometheusExporter(param.Parameterized):
+    """
+    Metrics hook that aggregates solves into counters and gauges and renders
+    them in the Prometheus text exposition format. Pass it in the metrics_hooks
+    of a FoodOptimizer; one exporter can be shared by every session of a
+    process.
+    """
+
+    namespace = param.String(default="pyfoodopt", doc="Prefix of metric names")
+    textfile_path = param.String(
+        default=None,
+        doc="File rewritten after every solve, for the node_exporter textfile collector",
+    )
+
+    METRICS = {
+        "solves_total": ("counter", "Solves by solver and status"),
+        "stage_seconds_total": ("counter", "Seconds spent in each optimize stage"),
+        "stage_runs_total": ("counter", "Times each optimize stage ran"),
+        "solver_iterations_total": ("counter", "Simplex iterations"),
+        "model_variables": ("gauge", "Variables in the last solved model"),
+        "model_constraints": ("gauge", "Constraints in the last solved model"),
+        "model_nonzeros": ("gauge", "Nonzeros in the last solved model"),
+    }
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self._lock = threading.Lock()
+        self._samples = {metric: {} for metric in self.METRICS}
+
+    def _add(self, metric: str, labels: dict, value):
+        key = tuple(sorted(labels.items()))
+        samples = self._samples[metric]
+        samples[key] = samples.get(key, 0) + value
+
+    def _set(self, metric: str, labels: dict, value):
+        self._samples[metric][tuple(sorted(labels.items()))] = value
+
+    def __call__(self, result):
+        solver = {"solver": result.solver}
+        with self._lock:
+            self._add(
+                "solves_total",
+                {**solver, "status": pulp.LpStatus.get(result.status, result.status)},
+                1,
+            )
+            for stage, timing in result.timings.items():
+                for clock in ["wall", "cpu"]:
+                    self._add(
+                        "stage_seconds_total",
+                        {**solver, "stage": stage, "clock": clock},
+                        timing[f"{clock}_s"],
+                    )
+                self._add("stage_runs_total", {**solver, "stage": stage}, 1)
+            if result.iterations is not None:
+                self._add("solver_iterations_total", solver, result.iterations)
+            for metric, value in [
+                ("model_variables", result.n_variables),
+                ("model_constraints", result.n_constraints),
+                ("model_nonzeros", result.n_nonzeros),
+            ]:
+                if value is not None:
+                    self._set(metric, solver, value)
+        if self.textfile_path:
+            self.write_textfile(self.textfile_path)
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for metric, (metric_type, help_text) in self.METRICS.items():
+                name = f"{self.namespace}_{metric}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for key, value in self._samples[metric].items():
+                    lines.append(f"{name}{_format_labels(dict(key))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """
+        Replaces path with the rendered metrics, atomically so a scrape never
+        reads a partial file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            f.write(self.render())
+        # Temporary files are private to the owner, the collector may run as
+        # another user
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
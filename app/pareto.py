@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+import param
+import pulp
+from pyfoodopt import (
+    BaseObjective,
+    BasePantry,
+    Constraints,
+    FoodOptimizer,
+    get_coefficient_matrix,
+)
+from solvers import DEFAULT_SOLVER, SOLVER_BACKENDS, get_solver_backend
+from workers import (
+    get_chunks,
+    get_diet_row,
+    get_max_workers,
+    get_worker_pantry,
+    is_solved,
+    map_in_workers,
+    worker_problem,
+)
+
+FRONTIER_RESULT_COLUMNS = [
+    "epsilon",
+    "status",
+    "solved",
+    "objective_value",
+    "epsilon_value",
+    "cost",
+    "n_foods",
+    "foods",
+]
+
+# Relative difference below which two objective values count as equal
+FRONTIER_TOLERANCE = 1e-7
+
+
+def get_non_dominated(values, signs):
+    """
+    Returns the mask of the rows of a (point x objective) array that no other
+    row beats on one objective without losing on another, each objective
+    minimized once multiplied by its sign. Of equal rows the first is kept.
+    """
+    costs = np.asarray(values, dtype=float) * np.asarray(signs)
+    tolerance = FRONTIER_TOLERANCE * np.maximum(1, np.abs(costs).max(axis=0))
+    # [i, j] compares row i to row j
+    no_worse = (costs[:, None, :] <= costs[None, :, :] + tolerance).all(axis=2)
+    better = (costs[:, None, :] < costs[None, :, :] - tolerance).any(axis=2)
+    dominated = (no_worse & better).any(axis=0)
+    equal = no_worse & no_worse.T
+    dominated |= np.triu(equal, k=1).any(axis=0)
+    return ~dominated
+
+
+def _solve_chunk(epsilons):
+    """
+    Solves one chunk of the frontier in order, moving the bound on the epsilon
+    objective of a single model so every solve after the first starts from the
+    previous solution.
+    """
+    nutrient_matrix = worker_problem["nutrient_matrix"]
+    nutrient_nbr_to_row = worker_problem["nutrient_nbr_to_row"]
+    fdc_ids = worker_problem["fdc_ids"]
+    prices = worker_problem["prices"]
+    objective = worker_problem["objective"]
+    epsilon_objective = worker_problem["epsilon_objective"]
+
+    objective_row = objective.get_coefficients(
+        nutrient_matrix, nutrient_nbr_to_row, prices
+    )
+    epsilon_row = epsilon_objective.get_coefficients(
+        nutrient_matrix, nutrient_nbr_to_row, prices
+    )
+    constraint_rows = list(worker_problem["constraint_rows"])
+    coefficient_matrix = np.vstack(
+        [
+            get_coefficient_matrix(
+                nutrient_matrix,
+                nutrient_nbr_to_row,
+                prices,
+                [nutrient_nbrs for nutrient_nbrs, _, _ in constraint_rows],
+            ),
+            epsilon_row,
+        ]
+    )
+    # The epsilon objective is held at least as good as epsilon. The row is
+    # soft like every other, a point that needs its slack is not on the frontier
+    epsilon_type = "lower_bound" if epsilon_objective.get_sign() < 0 else "upper_bound"
+    constraint_rows.append((("epsilon",), epsilon_type, epsilons[0]))
+    epsilon_position = len(constraint_rows) - 1
+
+    backend = get_solver_backend(worker_problem["solver"], msg=False)
+    backend.build(
+        coefficient_matrix,
+        constraint_rows,
+        [str(fdc_id) for fdc_id in fdc_ids],
+        [0] * len(fdc_ids),
+        objective.get_sign() * objective_row,
+    )
+    rows = []
+    for i, epsilon in enumerate(epsilons):
+        if i > 0:
+            backend.set_rhs(epsilon_position, epsilon)
+        result = backend.solve(warm_start=i > 0)
+        rows.append(
+            {
+                "epsilon": epsilon,
+                "objective_value": objective_row @ result.x,
+                "epsilon_value": epsilon_row @ result.x,
+                **get_diet_row(result, fdc_ids, prices),
+            }
+        )
+    return rows
+
+
+class ParetoFrontier(param.Parameterized):
+    """
+    Trades two objectives off with the epsilon-constraint method: objective is
+    optimized while epsilon_objective is held at least as good as each value of
+    a grid. Each worker process moves the epsilon bound of one warm started
+    model through its share of the grid.
+    """
+
+    pantry = param.ClassSelector(class_=BasePantry, doc="Pantry")
+    constraints = param.ClassSelector(class_=Constraints, doc="Constraints")
+    objective = param.ClassSelector(class_=BaseObjective, doc="Objective optimized")
+    epsilon_objective = param.ClassSelector(
+        class_=BaseObjective, doc="Objective bounded by each value of the grid"
+    )
+    n_points = param.Integer(
+        default=20, bounds=(2, None), doc="Values in the default grid"
+    )
+    max_workers = param.Integer(
+        default=None, bounds=(1, None), doc="Number of worker processes"
+    )
+    n_chunks = param.Integer(
+        default=None,
+        bounds=(1, None),
+        doc="Chunks the grid is split into, defaults to one per worker",
+    )
+    solver = param.Selector(
+        default=DEFAULT_SOLVER, objects=list(SOLVER_BACKENDS), doc="Solver backend"
+    )
+
+    def get_anchor(self, objective: BaseObjective):
+        """
+        Returns the value of the epsilon objective at the diet that optimizes
+        objective alone.
+        """
+        food_optimizer = FoodOptimizer(
+            pantry=self.pantry,
+            constraints=self.constraints,
+            objective=objective,
+            solver=self.solver,
+            msg=False,
+        )
+        status = food_optimizer.optimize()
+        result = food_optimizer.results[-1]
+        if status == pulp.LpStatusUnbounded:
+            raise ValueError(
+                f"{objective.objective_name} is unbounded under the constraints,"
+                " pass the epsilon values or add a constraint that bounds it, such"
+                " as a budget"
+            )
+        if not is_solved(result):
+            raise ValueError(
+                f"The constraints cannot be met optimizing {objective.objective_name}"
+                " alone, pass the epsilon values"
+            )
+        return food_optimizer.get_objective_value(self.epsilon_objective, result)
+
+    def get_epsilons(self):
+        """
+        Returns n_points values of the epsilon objective, evenly spaced from its
+        value when objective is optimized alone to its own optimum.
+        """
+        start = self.get_anchor(self.objective)
+        end = self.get_anchor(self.epsilon_objective)
+        # The optimum is only met within the solver tolerance, so the last
+        # bound is eased by as much
+        end -= np.sign(end - start) * FRONTIER_TOLERANCE * max(1, abs(end))
+        return np.linspace(start, end, self.n_points)
+
+    def solve(self, epsilons=None):
+        """
+        Returns one row per value of the epsilon objective bound, the default
+        grid when epsilons is not given.
+        """
+        epsilons = self.get_epsilons() if epsilons is None else np.asarray(epsilons)
+        max_workers = get_max_workers(self.max_workers)
+        problem = {
+            **get_worker_pantry(self.pantry, self.pantry.get_active_cols()),
+            "constraint_rows": self.constraints.get_constraint_rows(),
+            "objective": self.objective,
+            "epsilon_objective": self.epsilon_objective,
+            "solver": self.solver,
+        }
+        chunks = map_in_workers(
+            _solve_chunk,
+            get_chunks(epsilons, self.n_chunks or max_workers),
+            problem,
+            max_workers,
+        )
+        rows = [row for chunk in chunks for row in chunk]
+        return pd.DataFrame(rows, columns=FRONTIER_RESULT_COLUMNS)
+
+    def get_frontier(self, points):
+        """
+        Returns the solved rows of points that are not dominated, ordered by
+        the epsilon objective.
+        """
+        points = points[points.solved]
+        non_dominated = get_non_dominated(
+            points[["objective_value", "epsilon_value"]].to_numpy(),
+            [self.objective.get_sign(), self.epsilon_objective.get_sign()],
+        )
+        return points[non_dominated].sort_values("epsilon_value", ignore_index=True)
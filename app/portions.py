@@ -0,0 +1,112 @@
+import numpy as np
+
+# Units below which a food counts as not bought, about the feasibility
+# tolerance of the solvers
+PORTION_TOLERANCE = 1e-6
+
+
+def get_unit_costs(prices, serving_sizes):
+    """
+    Returns the dollars in one unit of each food, one serving for foods with a
+    serving size and one dollar for the rest, and the mask of foods bought in
+    whole servings.
+    """
+    integer = ~np.isnan(serving_sizes)
+    unit_costs = np.ones(len(prices))
+    unit_costs[integer] = prices[integer] * serving_sizes[integer] / 100
+    return unit_costs, integer
+
+
+def get_min_units(prices, serving_sizes, integer, min_portion_g: float):
+    """
+    Returns the least units of each food bought when it is bought at all, zero
+    where that takes no constraint: whole servings are at least one anyway.
+    """
+    min_units = np.zeros(len(prices))
+    if min_portion_g <= 0:
+        return min_units
+    min_units[~integer] = prices[~integer] * min_portion_g / 100
+    servings = np.ceil(min_portion_g / serving_sizes[integer] - PORTION_TOLERANCE)
+    min_units[integer] = np.where(servings > 1, servings, 0)
+    return min_units
+
+
+def get_unit_bounds(
+    coefficient_matrix, constraint_rows: list, integer, low_bounds, min_units, costs
+):
+    """
+    Returns a bound on the units of each food, the big-M of its selection
+    constraint. A food stays within the upper bound and equality constraints on
+    its own (its caps), and an optimal diet never buys more of a food with a
+    positive cost than covers on its own every lower bound it counts towards,
+    or its minimum portion.
+    """
+    values = np.array([value for _, _, value in constraint_rows], dtype=float)
+    constraint_types = np.array([row[1] for row in constraint_rows])
+    positive = coefficient_matrix > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amounts = np.where(positive, values[:, None] / coefficient_matrix, np.inf)
+
+    capping = constraint_types != "lower_bound"
+    caps = amounts[capping].min(axis=0, initial=np.inf)
+    covering = constraint_types == "lower_bound"
+    covers = np.where(positive[covering], amounts[covering], 0).max(axis=0, initial=0)
+    # Buying less of a food can break an equality, so only its cap applies
+    covers[positive[constraint_types == "equality"].any(axis=0)] = np.inf
+    covers[costs <= 0] = np.inf
+
+    caps[integer] = np.floor(caps[integer] + PORTION_TOLERANCE)
+    covers[integer] = np.ceil(covers[integer] - PORTION_TOLERANCE)
+    bounds = np.minimum(caps, np.maximum(covers, min_units))
+    return np.maximum(np.maximum(bounds, low_bounds), 0)
+
+
+def get_rounded_start(
+    units, unit_costs, integer, low_bounds, min_units, up_bounds, max_foods=None
+):
+    """
+    Rounds a solution of the LP relaxation to one that keeps the portion rules:
+    the max_foods foods with the most spend are kept, rounded up to whole
+    servings and their minimum portion, and capped at their bound.
+    """
+    bought = (units > PORTION_TOLERANCE) | (low_bounds > 0)
+    if max_foods is not None and bought.sum() > max_foods:
+        spend = np.where(low_bounds > 0, np.inf, units * unit_costs)
+        bought[:] = False
+        bought[np.argsort(-spend, kind="stable")[:max_foods]] = True
+    start = np.where(integer, np.ceil(units - PORTION_TOLERANCE), units)
+    start = np.minimum(np.maximum(np.maximum(start, min_units), low_bounds), up_bounds)
+    bought &= start >= min_units
+    return np.where(bought, start, 0)
+
+
+def get_core_foods(reduced_costs, units, low_bounds, core_size: int):
+    """
+    Returns the mask of the core_size foods with the lowest reduced costs in
+    the LP relaxation, with every food it buys or that has a starting amount.
+    """
+    core = (units > PORTION_TOLERANCE) | (low_bounds > 0)
+    core[np.argsort(reduced_costs, kind="stable")[:core_size]] = True
+    return core
+
+
+def get_fixed_foods(reduced_costs, integer, low_bounds, min_units, gap: float):
+    """
+    Returns the mask of foods no diet within gap of the LP relaxation objective
+    buys (reduced cost fixing): buying the least amount of a food costs at
+    least its reduced cost per unit more than the relaxation.
+    """
+    least_units = np.where(integer, np.maximum(min_units, 1), min_units)
+    return (reduced_costs * least_units > gap + PORTION_TOLERANCE) & (low_bounds <= 0)
+
+
+def get_slacks(coefficient_matrix, constraint_rows: list, units):
+    """
+    Returns the up and down slack each constraint row needs for the diet units.
+    """
+    values = np.array([value for _, _, value in constraint_rows], dtype=float)
+    constraint_types = np.array([row[1] for row in constraint_rows])
+    shortfall = values - coefficient_matrix @ units
+    slack_up = np.where(constraint_types != "upper_bound", shortfall, 0)
+    slack_down = np.where(constraint_types != "lower_bound", -shortfall, 0)
+    return np.maximum(slack_up, 0), np.maximum(slack_down, 0)
@@ -0,0 +1,157 @@
+import numpy as np
+import param
+
+PRESOLVE_REASONS = [
+    "empty",
+    "duplicate",
+    "dominated",
+]
+
+# Foods, and candidate dominators of those foods, compared per numpy operation
+PRESOLVE_BLOCK_SIZE = 64
+PRESOLVE_CHUNK_SIZE = 1024
+
+
+class PresolveResult(param.Parameterized):
+    """
+    Foods kept and removed by presolve_columns, as positions in the columns of
+    the coefficient matrix it was given.
+    """
+
+    kept = param.Array(default=None, doc="Positions of the kept columns")
+    reasons = param.Array(
+        default=None, doc="Reason each column was removed, None if it was kept"
+    )
+    kept_by = param.Array(
+        default=None,
+        doc="Column that duplicates or dominates each removed column, -1 if none",
+    )
+
+    def get_removed(self):
+        return np.flatnonzero(self.reasons != None)
+
+
+def get_signed_rows(coefficient_matrix, constraint_types: list):
+    """
+    Returns the rows of the lower bound constraints and the negated rows of the
+    upper bound constraints, where more is better for every row, and the rows of
+    the equality constraints.
+    """
+    constraint_types = np.asarray(constraint_types)
+    signed = np.vstack(
+        [
+            coefficient_matrix[constraint_types == "lower_bound"],
+            -coefficient_matrix[constraint_types == "upper_bound"],
+        ]
+    )
+    return signed, coefficient_matrix[constraint_types == "equality"]
+
+
+def find_dominators(signed, equal, cols, candidates, n_candidates, chunk_size):
+    """
+    Returns, for each of cols, the first column among its leading n_candidates
+    candidates that is at least as good on every signed row and equal on every
+    equality row, or -1.
+    """
+    dominators = np.full(len(cols), -1, dtype=np.int64)
+    for start in range(0, n_candidates.max(initial=0), chunk_size):
+        chunk = candidates[start : start + chunk_size]
+        positions = start + np.arange(len(chunk))
+        dominates = (positions < n_candidates[:, None]) & (chunk != cols[:, None])
+        dominates[dominators >= 0] = False
+        # Most pairs fail within a few rows, the rest of the rows are skipped
+        for values in signed:
+            if not dominates.any():
+                break
+            dominates &= values[chunk] >= values[cols, None]
+        for values in equal:
+            if not dominates.any():
+                break
+            dominates &= values[chunk] == values[cols, None]
+        found = (dominators < 0) & dominates.any(axis=1)
+        dominators[found] = chunk[dominates[found].argmax(axis=1)]
+        if (dominators >= 0).all():
+            break
+    return dominators
+
+
+def presolve_columns(coefficient_matrix, constraint_types: list, keep=None):
+    """
+    Finds the food columns of a minimum cost problem that an optimal diet never
+    needs. Every food costs one per unit, so a food is removed if it has no
+    nutrients in any lower bound or equality row (empty), if another food has
+    the same column (duplicate), or if another food is at least as good on
+    every row (dominated): spending its dollars on that food keeps every
+    constraint satisfied. Columns in keep, a boolean mask, are never removed.
+    """
+    n_cols = coefficient_matrix.shape[1]
+    keep = np.zeros(n_cols, dtype=bool) if keep is None else np.asarray(keep)
+    reasons = np.full(n_cols, None, dtype=object)
+    kept_by = np.full(n_cols, -1, dtype=np.int64)
+
+    constraint_types = np.asarray(constraint_types)
+    useful_rows = constraint_types != "upper_bound"
+    empty = ~(coefficient_matrix[useful_rows] > 0).any(axis=0) & ~keep
+    reasons[empty] = "empty"
+
+    # Duplicates point at the first column of their group, or at a kept one
+    cols = np.flatnonzero(~empty)
+    _, first, group = np.unique(
+        coefficient_matrix[:, cols], axis=1, return_index=True, return_inverse=True
+    )
+    group = group.ravel()
+    representative = cols[first]
+    kept_in_group = np.flatnonzero(keep[cols])
+    representative[group[kept_in_group]] = cols[kept_in_group]
+    duplicate = (cols != representative[group]) & ~keep[cols]
+    reasons[cols[duplicate]] = "duplicate"
+    kept_by[cols[duplicate]] = representative[group[duplicate]]
+
+    # A dominator is at least as good as the food on each row, so it is looked
+    # for among the foods ranked above it on the row where it ranks best. Foods
+    # with the same best row share their candidates and are checked in blocks
+    unique_cols = cols[~duplicate]
+    signed, equal = get_signed_rows(
+        coefficient_matrix[:, unique_cols], constraint_types
+    )
+    if signed.shape[0] > 0 and len(unique_cols) > 1:
+        order = np.argsort(-signed, axis=1, kind="stable")
+        sorted_values = np.take_along_axis(signed, order, axis=1)
+        n_at_least = np.stack(
+            [
+                np.searchsorted(-sorted_values[row], -signed[row], side="right")
+                for row in range(signed.shape[0])
+            ]
+        )
+        best_rows = n_at_least.argmin(axis=0)
+        n_candidates = n_at_least.min(axis=0)
+        todo = np.flatnonzero(~keep[unique_cols])
+        todo = todo[np.lexsort((n_candidates[todo], best_rows[todo]))]
+        for row in np.unique(best_rows[todo]).tolist():
+            row_todo = todo[best_rows[todo] == row]
+            for start in range(0, len(row_todo), PRESOLVE_BLOCK_SIZE):
+                block = row_todo[start : start + PRESOLVE_BLOCK_SIZE]
+                dominators = find_dominators(
+                    signed,
+                    equal,
+                    block,
+                    order[row],
+                    n_candidates[block],
+                    PRESOLVE_CHUNK_SIZE,
+                )
+                dominated = block[dominators >= 0]
+                reasons[unique_cols[dominated]] = "dominated"
+                kept_by[unique_cols[dominated]] = unique_cols[
+                    dominators[dominators >= 0]
+                ]
+
+    # Dominance is transitive, so chains are followed to a food that is kept
+    while True:
+        chained = (kept_by >= 0) & (kept_by[np.maximum(kept_by, 0)] >= 0)
+        if not chained.any():
+            break
+        kept_by[chained] = kept_by[kept_by[chained]]
+
+    return PresolveResult(
+        kept=np.flatnonzero(reasons == None), reasons=reasons, kept_by=kept_by
+    )
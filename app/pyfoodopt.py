@@ -1,10 +1,40 @@
+from collections.abc import Mapping
+from dataclasses import replace
 from enum import Enum
+import numpy as np
 import pandas as pd
 import param
-import pulp
 import pint
-from pulp import LpProblem, LpVariable, LpMinimize
+import pulp
+from scipy import sparse
 import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from metrics import emit_metrics, time_stage
+from portions import (
+    PORTION_TOLERANCE,
+    get_core_foods,
+    get_fixed_foods,
+    get_min_units,
+    get_rounded_start,
+    get_slacks,
+    get_unit_bounds,
+    get_unit_costs,
+)
+from presolve import PRESOLVE_REASONS, presolve_columns
+from records import (
+    FoodMetaRecord,
+    FoodRecord,
+    NutrientConstraintRecord,
+    NutrientRecord,
+    PriceRecord,
+)
+from search import FoodSearchIndex
+from solvers import DEFAULT_SOLVER, SOLVER_BACKENDS, get_solver_backend
 
 ureg = pint.UnitRegistry()
 DATA_DIR = "../data"
@@ -36,6 +66,20 @@ PANTRY_CSV_COLUMNS = [
     "price_per_100_g",
     "food_name",
     "fdc_id",
+    "serving_size_g",
+]
+
+PANTRY_SNAPSHOT_VERSION = 3
+PANTRY_SNAPSHOT_ARRAYS = [
+    "fdc_ids",
+    "food_names",
+    "prices",
+    "serving_sizes",
+    "nutrient_nbrs",
+    "nutrient_data",
+    "nutrient_indices",
+    "nutrient_indptr",
+    "restriction_bits",
 ]
 
 
@@ -71,6 +115,15 @@ class BasePrice(param.Parameterized):
             self.price_per_100_g = price_dollars / (weight_grams / 100)
             self.original_price_per_100_g = self.price_per_100_g
 
+    def to_record(self):
+        return PriceRecord(self.price_per_100_g, self.original_price_per_100_g)
+
+    @classmethod
+    def from_record(cls, record: PriceRecord):
+        price = cls(price_per_100_g=record.price_per_100_g)
+        price.original_price_per_100_g = record.original_price_per_100_g
+        return price
+
 
 class FoodName(param.Parameterized):
 
@@ -103,6 +156,33 @@ def get_non_name_params(param_class):
     ]
 
 
+FOOD_RESTRICTION_NAMES = get_non_name_params(FoodRestrictions)
+
+
+def pack_restrictions(restrictions):
+    """
+    Packs a (food x restriction) boolean matrix into one bitmask per food, with
+    bit i set if the food satisfies FOOD_RESTRICTION_NAMES[i].
+    """
+    bits = 1 << np.arange(restrictions.shape[1], dtype=np.uint16)
+    return (restrictions.astype(np.uint16) * bits).sum(axis=1, dtype=np.uint16)
+
+
+def unpack_restrictions(restriction_bits):
+    bits = 1 << np.arange(len(FOOD_RESTRICTION_NAMES), dtype=np.uint16)
+    return (np.asarray(restriction_bits)[:, None] & bits) != 0
+
+
+def get_restriction_mask(restriction_names):
+    """
+    Returns the bitmask with the bits of the given restriction names set.
+    """
+    mask = 0
+    for restriction_name in restriction_names:
+        mask |= 1 << FOOD_RESTRICTION_NAMES.index(restriction_name)
+    return np.uint16(mask)
+
+
 def get_food_restrictions_from_dict(restrictions_dict):
     return FoodRestrictions(
         **{key: restrictions_dict[key] for key in get_non_name_params(FoodRestrictions)}
@@ -119,113 +199,819 @@ class FoodMeta(param.Parameterized):
     )
 
 
+class FoodNutrition(Mapping):
+    """
+    Read-only view of the nutrient amounts per 100 g of one food, keyed by
+    nutrient_nbr, over its column of the pantry's sparse nutrient matrix.
+    """
+
+    __slots__ = ("_nutrient_nbrs", "_amounts")
+
+    def __init__(self, nutrient_nbrs, amounts):
+        # Sorted nutrient numbers of the nonzero amounts
+        self._nutrient_nbrs = nutrient_nbrs
+        self._amounts = amounts
+
+    def __getitem__(self, nutrient_nbr):
+        i = np.searchsorted(self._nutrient_nbrs, nutrient_nbr)
+        if i == len(self._nutrient_nbrs) or self._nutrient_nbrs[i] != nutrient_nbr:
+            raise KeyError(nutrient_nbr)
+        return self._amounts[i].item()
+
+    def __iter__(self):
+        return iter(self._nutrient_nbrs.tolist())
+
+    def __len__(self):
+        return len(self._nutrient_nbrs)
+
+    def __repr__(self):
+        return f"FoodNutrition({dict(self)})"
+
+
+def get_nutrient_matrix(nutrient_rows, food_cols, amounts, shape):
+    """
+    Returns the sparse (nutrient x food) matrix with the given amounts, zeros
+    left out and entries of the same nutrient and food summed.
+    """
+    nutrient_matrix = sparse.csc_array(
+        (
+            np.asarray(amounts, dtype=float),
+            (np.asarray(nutrient_rows), np.asarray(food_cols)),
+        ),
+        shape=shape,
+    )
+    nutrient_matrix.eliminate_zeros()
+    return nutrient_matrix
+
+
+def reindex_nutrient_rows(nutrient_matrix, nutrient_nbrs, all_nutrient_nbrs):
+    """
+    Returns the sparse nutrient matrix with the rows of nutrient_nbrs moved to
+    their rows in all_nutrient_nbrs, a sorted superset of them.
+    """
+    rows = np.searchsorted(all_nutrient_nbrs, nutrient_nbrs)
+    reindexed = sparse.csc_array(
+        (nutrient_matrix.data, rows[nutrient_matrix.indices], nutrient_matrix.indptr),
+        shape=(len(all_nutrient_nbrs), nutrient_matrix.shape[1]),
+    )
+    reindexed.sort_indices()
+    return reindexed
+
+
 class BaseFood(param.Parameterized):
+    """
+    Parameterized adapter of a FoodRecord for the Panel UI. Pantries store and
+    return FoodRecords.
+    """
 
     price = param.ClassSelector(class_=BasePrice, default=None, doc="Price of food")
     food_name = param.String(default=None, doc="Name of food")
     fdc_id = param.Integer(default=None, doc="FDC ID")
-    food_nutrition = param.Dict(default={}, doc="Nutrition data")
+    food_nutrition = param.ClassSelector(
+        class_=Mapping, default={}, doc="Nutrition data"
+    )
     food_meta = param.ClassSelector(class_=FoodMeta, default=None, doc="Meta data")
+    serving_size_g = param.Number(
+        default=None,
+        bounds=(0.0, None),
+        inclusive_bounds=(False, True),
+        doc="Grams in one serving or package, foods without one are bought by weight",
+    )
+
+    def to_record(self):
+        restriction_bits = 0
+        food_meta = self.food_meta
+        if food_meta is not None and food_meta.restrictions is not None:
+            restriction_bits = pack_restrictions(
+                np.array(
+                    [
+                        [
+                            bool(getattr(food_meta.restrictions, restriction_name))
+                            for restriction_name in FOOD_RESTRICTION_NAMES
+                        ]
+                    ]
+                )
+            )[0].item()
+        return FoodRecord(
+            fdc_id=self.fdc_id,
+            food_name=self.food_name,
+            price=self.price.to_record(),
+            food_nutrition=self.food_nutrition,
+            serving_size_g=self.serving_size_g,
+            restriction_bits=restriction_bits,
+            food_meta=(
+                None
+                if food_meta is None
+                else FoodMetaRecord(
+                    food_meta.description, food_meta.nutrition_url, food_meta.image_url
+                )
+            ),
+        )
+
+    @classmethod
+    def from_record(cls, record: FoodRecord):
+        food_meta = record.food_meta or FoodMetaRecord()
+        return cls(
+            price=BasePrice.from_record(record.price),
+            food_name=record.food_name,
+            fdc_id=record.fdc_id,
+            food_nutrition=record.food_nutrition,
+            serving_size_g=record.serving_size_g,
+            food_meta=FoodMeta(
+                description=food_meta.description,
+                nutrition_url=food_meta.nutrition_url,
+                image_url=food_meta.image_url,
+                restrictions=FoodRestrictions(
+                    **dict(
+                        zip(
+                            FOOD_RESTRICTION_NAMES,
+                            unpack_restrictions([record.restriction_bits])[0].tolist(),
+                        )
+                    )
+                ),
+            ),
+        )
+
+
+def get_food_record(food):
+    """
+    Returns food as a FoodRecord, converting a BaseFood.
+    """
+    if isinstance(food, BaseFood):
+        return food.to_record()
+    if not isinstance(food, FoodRecord):
+        raise TypeError("Invalid parameter type")
+    return food
+
+
+class BasePantry(param.Parameterized):
+    """
+    Read access and active food bookkeeping shared by Pantry and PantryOverlay.
+    Subclasses provide the column arrays (fdc_ids, fdc_id_to_col, food_names,
+    prices, serving_sizes, nutrient_nbrs, nutrient_nbr_to_row, nutrient_matrix,
+    restriction_bits), the active_foods set and active_mask.
+    """
+
+    def compile(self):
+        pass
+
+    def _check_writable(self):
+        pass
+
+    def _set_active_slot(self, fdc_id, active: bool):
+        col = self.fdc_id_to_col.get(fdc_id)
+        if col is not None:
+            self.active_mask[col] = active
+
+    def get_active_cols(self):
+        self.compile()
+        return np.flatnonzero(self.active_mask)
+
+    def activate_food(self, fdc_id: int):
+        self.compile()
+        self._check_writable()
+        self.active_foods.add(fdc_id)
+        self._set_active_slot(fdc_id, True)
+
+    def activate_foods(self, fdc_ids: list):
+        for fdc_id in fdc_ids:
+            self.activate_food(fdc_id)
+
+    def deactivate_food(self, fdc_id: int):
+        self.compile()
+        self._check_writable()
+        self.active_foods.remove(fdc_id)
+        self._set_active_slot(fdc_id, False)
+
+    def deactivate_foods(self, fdc_ids: list):
+        for fdc_id in fdc_ids:
+            self.deactivate_food(fdc_id)
+
+    def set_active_foods(self, fdc_ids: list):
+        self.compile()
+        self._check_writable()
+        active_foods = set(fdc_ids)
+        for fdc_id in self.active_foods - active_foods:
+            self._set_active_slot(fdc_id, False)
+        for fdc_id in active_foods - self.active_foods:
+            self._set_active_slot(fdc_id, True)
+        self.active_foods = active_foods
 
+    def get_all_fdc_ids(self):
+        self.compile()
+        return self.fdc_ids.tolist()
+
+    def get_search_index(self):
+        """
+        Returns the FoodSearchIndex over the food names in column order, built on
+        first use.
+        """
+        self.compile()
+        if self._search_index is None:
+            self._search_index = FoodSearchIndex(self.food_names)
+        return self._search_index
+
+    def get_restriction(self, fdc_id: int, restriction_name: str):
+        self.compile()
+        mask = get_restriction_mask([restriction_name])
+        return bool(self.restriction_bits[self.fdc_id_to_col[fdc_id]] & mask)
+
+    def get_restriction_filter(self, restriction_mask):
+        """
+        Returns a boolean array, in column order, of the foods that satisfy every
+        restriction in restriction_mask.
+        """
+        self.compile()
+        return (self.restriction_bits & restriction_mask) == restriction_mask
 
-class Pantry(param.Parameterized):
+    def get_active_foods(self):
+        return {fdc_id: self.get_food_by_fdc_id(fdc_id) for fdc_id in self.active_foods}
+
+    def _materialize_food(self, col):
+        nutrient_matrix = self.nutrient_matrix
+        entries = slice(nutrient_matrix.indptr[col], nutrient_matrix.indptr[col + 1])
+        return FoodRecord(
+            fdc_id=self.fdc_ids[col].item(),
+            food_name=str(self.food_names[col]),
+            price=PriceRecord(self.prices[col].item()),
+            food_nutrition=FoodNutrition(
+                self.nutrient_nbrs[nutrient_matrix.indices[entries]],
+                nutrient_matrix.data[entries],
+            ),
+            serving_size_g=(
+                None
+                if np.isnan(self.serving_sizes[col])
+                else self.serving_sizes[col].item()
+            ),
+            restriction_bits=self.restriction_bits[col].item(),
+        )
+
+    def get_food_nutrition_table(self):
+        self.compile()
+        nutrition_table = pd.DataFrame(
+            {
+                "fdc_id": self.fdc_ids,
+                "food_name": self.food_names,
+                "price_per_100_g": self.prices,
+                "serving_size_g": self.serving_sizes,
+            }
+        )
+        nutrients = pd.DataFrame(
+            self.nutrient_matrix.T.toarray(), columns=self.nutrient_nbrs
+        )
+        return pd.concat([nutrition_table, nutrients], axis=1)
 
-    foods = param.Dict(default={}, doc="Dict of foods keyed by fdc_id")
+
+class Pantry(BasePantry):
+    """
+    Foods are stored column-wise: a sparse CSC (nutrient x food) matrix of
+    nutrient amounts per 100 g, a price vector, a serving size vector (NaN for
+    foods without one), a restriction bitmask per food and an active mask,
+    addressed through fdc_id_to_col. FoodRecords are only created when a caller
+    asks for one through get_food_by_fdc_id and are cached in foods; their
+    food_nutrition is a view over their column.
+    """
+
+    foods = param.Dict(default={}, doc="Dict of FoodRecords keyed by fdc_id")
 
     def __init__(self, **params):
         super().__init__(**params)
         self.active_foods = set()
-
-    def add_food(self, food: BaseFood, set_active=True):
-        if not isinstance(food, BaseFood):
-            raise TypeError("Invalid parameter type")
+        self.fdc_ids = np.zeros(0, dtype=np.int64)
+        self.fdc_id_to_col = {}
+        self.food_names = np.zeros(0, dtype=object)
+        self.prices = np.zeros(0)
+        self.serving_sizes = np.zeros(0)
+        self.nutrient_nbrs = np.zeros(0, dtype=np.int64)
+        self.nutrient_nbr_to_row = {}
+        self.nutrient_matrix = sparse.csc_array((0, 0))
+        self.restriction_bits = np.zeros(0, dtype=np.uint16)
+        self.active_mask = np.zeros(0, dtype=bool)
+        self.frozen = False
+        self._search_index = None
+        self.foods = {
+            fdc_id: get_food_record(food) for fdc_id, food in self.foods.items()
+        }
+        self._pending_foods = list(self.foods.values())
+
+    def freeze(self):
+        """
+        Makes the pantry read-only so it can be shared between sessions. Each
+        session edits prices and active foods through a PantryOverlay.
+        """
+        self.compile()
+        for array in [
+            self.fdc_ids,
+            self.food_names,
+            self.prices,
+            self.serving_sizes,
+            self.nutrient_nbrs,
+            self.nutrient_matrix.data,
+            self.nutrient_matrix.indices,
+            self.nutrient_matrix.indptr,
+            self.restriction_bits,
+            self.active_mask,
+        ]:
+            array.flags.writeable = False
+        self.frozen = True
+
+    def _check_writable(self):
+        if self.frozen:
+            raise RuntimeError("Pantry is frozen, edit it through a PantryOverlay")
+
+    def memory_usage(self, deep=False):
+        """
+        Returns the bytes held by each column array, the nutrient matrix counted
+        as its three sparse arrays. With deep, the food name strings are counted
+        too. Memory-mapped arrays are counted at their full size.
+        """
+        self.compile()
+        nutrient_matrix = self.nutrient_matrix
+        usage = pd.Series(
+            {
+                "fdc_ids": self.fdc_ids.nbytes,
+                "food_names": self.food_names.nbytes,
+                "prices": self.prices.nbytes,
+                "serving_sizes": self.serving_sizes.nbytes,
+                "nutrient_nbrs": self.nutrient_nbrs.nbytes,
+                "nutrient_matrix": nutrient_matrix.data.nbytes
+                + nutrient_matrix.indices.nbytes
+                + nutrient_matrix.indptr.nbytes,
+                "restriction_bits": self.restriction_bits.nbytes,
+                "active_mask": self.active_mask.nbytes,
+            },
+            name="bytes",
+        )
+        if deep and self.food_names.dtype == object:
+            usage["food_names"] += sum(sys.getsizeof(name) for name in self.food_names)
+        return usage
+
+    def add_food(self, food: FoodRecord, set_active=True):
+        """
+        Adds a FoodRecord, or a BaseFood converted to one.
+        """
+        food = get_food_record(food)
+        self._check_writable()
         self.foods[food.fdc_id] = food
+        self._pending_foods.append(food)
         if set_active:
             self.active_foods.add(food.fdc_id)
 
-    def build_pantry_from_csv(self, csv_path: str, set_active=False):
-        df = pd.read_csv(csv_path, index_col=0)
-        for index, row in df.iterrows():
-            price = BasePrice(price_per_100_g=row["price_per_100_g"])
-            food_name = row["food_name"]
+    def compile(self):
+        """
+        Moves foods added through add_food into the column arrays. Callers
+        reading the arrays directly should call this first; it does nothing if
+        no foods are pending.
+        """
+        if not self._pending_foods:
+            return
+        foods = self._pending_foods
+        self._pending_foods = []
+
+        nutrient_nbrs = sorted({nbr for food in foods for nbr in food.food_nutrition})
+        nbr_to_row = {nbr: row for row, nbr in enumerate(nutrient_nbrs)}
+        nutrient_rows = []
+        nutrient_cols = []
+        amounts = []
+        for col, food in enumerate(foods):
+            for nbr, amount in food.food_nutrition.items():
+                nutrient_rows.append(nbr_to_row[nbr])
+                nutrient_cols.append(col)
+                amounts.append(amount)
+
+        self._add_columns(
+            fdc_ids=[food.fdc_id for food in foods],
+            food_names=[food.food_name for food in foods],
+            prices=[food.price.price_per_100_g for food in foods],
+            nutrient_nbrs=nutrient_nbrs,
+            nutrient_matrix=get_nutrient_matrix(
+                nutrient_rows,
+                nutrient_cols,
+                amounts,
+                (len(nutrient_nbrs), len(foods)),
+            ),
+            restriction_bits=[food.restriction_bits for food in foods],
+            serving_sizes=[
+                np.nan if food.serving_size_g is None else food.serving_size_g
+                for food in foods
+            ],
+        )
 
-            nutrition_values = row.loc[~row.index.isin(PANTRY_CSV_COLUMNS)]
-            food_nutrition = {
-                int(key): value for key, value in nutrition_values.items()
-            }
-            food = BaseFood(
-                price=price,
-                food_name=food_name,
-                fdc_id=row["fdc_id"],
-                food_nutrition=food_nutrition,
-                food_meta=FoodMeta(restrictions=FoodRestrictions()),
+    def _add_columns(
+        self,
+        fdc_ids,
+        food_names,
+        prices,
+        nutrient_nbrs,
+        nutrient_matrix,
+        restriction_bits,
+        serving_sizes=None,
+        set_active=False,
+    ):
+        self._check_writable()
+        self._search_index = None
+        fdc_ids = np.asarray(fdc_ids, dtype=np.int64)
+        nutrient_nbrs = np.asarray(nutrient_nbrs, dtype=np.int64)
+
+        all_nutrient_nbrs = np.union1d(self.nutrient_nbrs, nutrient_nbrs)
+        if len(all_nutrient_nbrs) != len(self.nutrient_nbrs):
+            self.nutrient_matrix = reindex_nutrient_rows(
+                self.nutrient_matrix, self.nutrient_nbrs, all_nutrient_nbrs
             )
-            self.add_food(food)
-            if set_active:
-                self.active_foods.add(food.fdc_id)
-
-    def deactivate_food(self, fdc_id: int):
-        self.active_foods.remove(fdc_id)
+            self.nutrient_nbrs = all_nutrient_nbrs
+            self.nutrient_nbr_to_row = {
+                nbr: row for row, nbr in enumerate(all_nutrient_nbrs.tolist())
+            }
+        columns = reindex_nutrient_rows(
+            sparse.csc_array(nutrient_matrix), nutrient_nbrs, all_nutrient_nbrs
+        )
 
-    def deactivate_foods(self, fdc_ids: list):
-        for fdc_id in fdc_ids:
-            self.active_foods.remove(fdc_id)
+        food_names = np.asarray(food_names, dtype=object)
+        prices = np.asarray(prices, dtype=float)
+        if serving_sizes is None:
+            serving_sizes = np.full(len(fdc_ids), np.nan)
+        serving_sizes = np.asarray(serving_sizes, dtype=float)
+        restriction_bits = np.asarray(restriction_bits, dtype=np.uint16)
+
+        # Foods already in the pantry are replaced in place
+        existing_cols = np.array(
+            [self.fdc_id_to_col.get(fdc_id, -1) for fdc_id in fdc_ids.tolist()],
+            dtype=np.int64,
+        )
+        is_existing = existing_cols >= 0
+        n_cols = len(self.fdc_ids)
+        # Column order of the existing columns followed by the new ones, in
+        # which replaced foods take their new column
+        order = np.concatenate(
+            [np.arange(n_cols), n_cols + np.flatnonzero(~is_existing)]
+        )
+        if is_existing.any():
+            cols = existing_cols[is_existing]
+            order[cols] = n_cols + np.flatnonzero(is_existing)
+            self.food_names = self.food_names.astype(object)
+            self.food_names[cols] = food_names[is_existing]
+            self.prices[cols] = prices[is_existing]
+            self.serving_sizes[cols] = serving_sizes[is_existing]
+            self.restriction_bits[cols] = restriction_bits[is_existing]
+            for fdc_id in fdc_ids[is_existing].tolist():
+                self.foods.pop(fdc_id, None)
+
+        is_new = ~is_existing
+        first_col = len(self.fdc_ids)
+        self.fdc_ids = np.concatenate([self.fdc_ids, fdc_ids[is_new]])
+        self.fdc_id_to_col.update(
+            {
+                fdc_id: col
+                for col, fdc_id in enumerate(fdc_ids[is_new].tolist(), first_col)
+            }
+        )
+        self.food_names = np.concatenate([self.food_names, food_names[is_new]])
+        self.prices = np.concatenate([self.prices, prices[is_new]])
+        self.serving_sizes = np.concatenate([self.serving_sizes, serving_sizes[is_new]])
+        self.nutrient_matrix = sparse.hstack(
+            [self.nutrient_matrix, columns], format="csc"
+        )
+        if len(order) != self.nutrient_matrix.shape[1]:
+            self.nutrient_matrix = self.nutrient_matrix[:, order]
+        self.restriction_bits = np.concatenate(
+            [self.restriction_bits, restriction_bits[is_new]]
+        )
+        self.active_mask = np.concatenate(
+            [
+                self.active_mask,
+                [fdc_id in self.active_foods for fdc_id in fdc_ids[is_new].tolist()],
+            ]
+        ).astype(bool)
 
-    def activate_foods(self, fdc_ids: list):
-        for fdc_id in fdc_ids:
-            self.active_foods.add(fdc_id)
+        if set_active:
+            self.active_foods.update(fdc_ids.tolist())
+            self.active_mask[[self.fdc_id_to_col[f] for f in fdc_ids.tolist()]] = True
 
-    def set_active_foods(self, fdc_ids: list):
-        self.active_foods = set(fdc_ids)
+    def build_pantry_from_csv(self, csv_path: str, set_active=False):
+        df = pd.read_csv(csv_path, index_col=0)
+        nutrient_columns = [c for c in df.columns if c not in PANTRY_CSV_COLUMNS]
+        self.compile()
+        self._add_columns(
+            fdc_ids=df["fdc_id"].to_numpy(),
+            food_names=df["food_name"].to_numpy(dtype=object),
+            prices=df["price_per_100_g"].to_numpy(dtype=float),
+            nutrient_nbrs=[int(c) for c in nutrient_columns],
+            nutrient_matrix=np.nan_to_num(df[nutrient_columns].to_numpy(dtype=float).T),
+            restriction_bits=np.zeros(len(df), dtype=np.uint16),
+            serving_sizes=(
+                df["serving_size_g"].to_numpy(dtype=float)
+                if "serving_size_g" in df.columns
+                else None
+            ),
+            set_active=True,
+        )
 
     def set_prices(self, fdc_id_to_price: dict):
+        self.compile()
+        self._check_writable()
         for fdc_id, price in fdc_id_to_price.items():
-            self.foods[fdc_id].price.price_per_100_g = price
-
-    def activate_food(self, fdc_id: int):
-        self.active_foods.add(fdc_id)
+            col = self.fdc_id_to_col[fdc_id]
+            if self.prices[col] == price:
+                continue
+            self.prices[col] = price
+            if fdc_id in self.foods:
+                food = self.foods[fdc_id]
+                self.foods[fdc_id] = replace(
+                    food, price=replace(food.price, price_per_100_g=price)
+                )
 
-    def get_all_fdc_ids(self):
-        return list(self.foods.keys())
+    def set_serving_sizes(self, fdc_id_to_serving_size: dict):
+        """
+        Sets the grams in one serving of foods, None for a food bought by weight.
+        """
+        self.compile()
+        self._check_writable()
+        for fdc_id, serving_size in fdc_id_to_serving_size.items():
+            self.serving_sizes[self.fdc_id_to_col[fdc_id]] = (
+                np.nan if serving_size is None else serving_size
+            )
+            if fdc_id in self.foods:
+                self.foods[fdc_id] = replace(
+                    self.foods[fdc_id], serving_size_g=serving_size
+                )
 
     def get_food_by_fdc_id(self, fdc_id: int):
-        if fdc_id not in self.foods:
+        if fdc_id in self.foods:
+            return self.foods[fdc_id]
+        self.compile()
+        if fdc_id not in self.fdc_id_to_col:
             raise ValueError(f"FDC ID {fdc_id} not found in pantry")
-        return self.foods[fdc_id]
-
-    def get_active_foods(self):
-        return {fdc_id: self.foods[fdc_id] for fdc_id in self.active_foods}
+        food = self._materialize_food(self.fdc_id_to_col[fdc_id])
+        self.foods[fdc_id] = food
+        return food
 
     def build_pantry_from_json(self, json_path: str):
         with open(json_path, "r") as f:
             data = json.load(f)
-        for fdc_id in data:
-            food = BaseFood(
-                price=BasePrice(price_per_100_g=data[fdc_id]["price_per_100_g"]),
-                food_name=data[fdc_id]["food_name"],
-                fdc_id=int(fdc_id),
-                food_nutrition={
-                    int(k): v for k, v in data[fdc_id]["food_nutrition"].items()
+
+        n_foods = len(data)
+        food_names = np.empty(n_foods, dtype=object)
+        prices = np.empty(n_foods)
+        serving_sizes = np.full(n_foods, np.nan)
+        restrictions = np.zeros((n_foods, len(FOOD_RESTRICTION_NAMES)), dtype=bool)
+        nutrient_keys = []
+        nutrient_values = []
+        nutrient_cols = []
+        for col, food in enumerate(data.values()):
+            food_names[col] = food["food_name"]
+            prices[col] = food["price_per_100_g"]
+            if food.get("serving_size_g") is not None:
+                serving_sizes[col] = food["serving_size_g"]
+            restrictions[col] = [
+                bool(food["restrictions"][restriction_name])
+                for restriction_name in FOOD_RESTRICTION_NAMES
+            ]
+            nutrition = food["food_nutrition"]
+            nutrient_keys.extend(nutrition.keys())
+            nutrient_values.extend(nutrition.values())
+            nutrient_cols.extend([col] * len(nutrition))
+
+        nutrient_nbrs, nutrient_rows = np.unique(
+            np.array(nutrient_keys, dtype=str).astype(np.int64), return_inverse=True
+        )
+        nutrient_matrix = get_nutrient_matrix(
+            nutrient_rows, nutrient_cols, nutrient_values, (len(nutrient_nbrs), n_foods)
+        )
+
+        self.compile()
+        self._add_columns(
+            fdc_ids=np.array(list(data.keys()), dtype=str).astype(np.int64),
+            food_names=food_names,
+            prices=prices,
+            nutrient_nbrs=nutrient_nbrs,
+            nutrient_matrix=nutrient_matrix,
+            restriction_bits=pack_restrictions(restrictions),
+            serving_sizes=serving_sizes,
+            set_active=True,
+        )
+
+    def save_snapshot(self, snapshot_path: str, replace=False):
+        """
+        Writes the compiled pantry to a snapshot directory of .npy files that
+        build_pantry_from_snapshot can memory-map. The directory is written
+        next to its final location and renamed into place, so a reader never
+        sees a partial snapshot. An existing snapshot is kept unless replace,
+        in which case it is moved aside and deleted once the new one is in
+        place; readers that already mapped it keep their pages.
+        """
+        self.compile()
+        arrays = {
+            "fdc_ids": self.fdc_ids,
+            "food_names": self.food_names.astype(str),
+            "prices": self.prices,
+            "serving_sizes": self.serving_sizes,
+            "nutrient_nbrs": self.nutrient_nbrs,
+            "nutrient_data": self.nutrient_matrix.data,
+            "nutrient_indices": self.nutrient_matrix.indices,
+            "nutrient_indptr": self.nutrient_matrix.indptr,
+            "restriction_bits": self.restriction_bits,
+        }
+        snapshot_path = os.path.abspath(snapshot_path)
+        tmp_path = tempfile.mkdtemp(dir=os.path.dirname(snapshot_path))
+        for array_name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{array_name}.npy"), array)
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump(
+                {
+                    "version": PANTRY_SNAPSHOT_VERSION,
+                    "restrictions": FOOD_RESTRICTION_NAMES,
                 },
-                food_meta=FoodMeta(
-                    restrictions=get_food_restrictions_from_dict(
-                        data[fdc_id]["restrictions"]
-                    )
-                ),
+                f,
             )
-            self.add_food(food)
+        # mkdtemp creates the directory readable by its owner only, other
+        # users and workers load the snapshot too
+        os.chmod(tmp_path, 0o755)
+        try:
+            os.rename(tmp_path, snapshot_path)
+            return
+        except OSError:
+            if not replace or not os.path.isdir(snapshot_path):
+                shutil.rmtree(tmp_path)
+                if not os.path.isdir(snapshot_path):
+                    raise
+                return
+        stale_path = tempfile.mkdtemp(dir=os.path.dirname(snapshot_path))
+        try:
+            os.rename(snapshot_path, os.path.join(stale_path, "snapshot"))
+        except FileNotFoundError:
+            # Another process moved it aside first
+            pass
+        try:
+            os.rename(tmp_path, snapshot_path)
+        except OSError:
+            # Another process put its own new snapshot in place first
+            shutil.rmtree(tmp_path)
+            if not os.path.isdir(snapshot_path):
+                raise
+        finally:
+            shutil.rmtree(stale_path)
+
+    def build_pantry_from_snapshot(self, snapshot_path: str):
+        """
+        Loads a snapshot written by save_snapshot. The arrays of the nutrient
+        matrix and the food names are memory-mapped read-only, so processes
+        loading the same snapshot share their pages; prices are copied since
+        they can be edited.
+        """
+        with open(os.path.join(snapshot_path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        if meta["version"] != PANTRY_SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported pantry snapshot version {meta['version']}")
+        if meta["restrictions"] != FOOD_RESTRICTION_NAMES:
+            raise ValueError("Pantry snapshot was written with other restrictions")
+        arrays = {
+            array_name: np.load(
+                os.path.join(snapshot_path, f"{array_name}.npy"), mmap_mode="r"
+            )
+            for array_name in PANTRY_SNAPSHOT_ARRAYS
+        }
+        nutrient_matrix = sparse.csc_array(
+            (
+                arrays["nutrient_data"],
+                arrays["nutrient_indices"],
+                arrays["nutrient_indptr"],
+            ),
+            shape=(len(arrays["nutrient_nbrs"]), len(arrays["fdc_ids"])),
+        )
 
-    def get_food_nutrition_table(self):
-        nutrition_data = []
-        for fdc_id, food in self.foods.items():
-            food_data = {
-                "fdc_id": fdc_id,
-                "food_name": food.food_name,
-                "price_per_100_g": food.price.price_per_100_g,
-            }
-            food_data.update(food.food_nutrition)
-            nutrition_data.append(food_data)
-        return pd.DataFrame(nutrition_data)
+        self.compile()
+        if len(self.fdc_ids) > 0:
+            self._add_columns(
+                fdc_ids=arrays["fdc_ids"],
+                food_names=arrays["food_names"],
+                prices=arrays["prices"],
+                nutrient_nbrs=arrays["nutrient_nbrs"],
+                nutrient_matrix=nutrient_matrix,
+                restriction_bits=arrays["restriction_bits"],
+                serving_sizes=arrays["serving_sizes"],
+                set_active=True,
+            )
+            return
+
+        self._search_index = None
+        self.fdc_ids = np.array(arrays["fdc_ids"])
+        self.fdc_id_to_col = {
+            fdc_id: col for col, fdc_id in enumerate(self.fdc_ids.tolist())
+        }
+        self.food_names = arrays["food_names"]
+        self.prices = np.array(arrays["prices"])
+        self.serving_sizes = np.array(arrays["serving_sizes"])
+        self.nutrient_nbrs = np.array(arrays["nutrient_nbrs"])
+        self.nutrient_nbr_to_row = {
+            nbr: row for row, nbr in enumerate(self.nutrient_nbrs.tolist())
+        }
+        self.nutrient_matrix = nutrient_matrix
+        self.restriction_bits = np.array(arrays["restriction_bits"])
+        self.active_foods = set(self.fdc_id_to_col)
+        self.active_mask = np.ones(len(self.fdc_ids), dtype=bool)
+
+
+def is_pantry_snapshot_current(snapshot_path: str, source_path: str = None):
+    """
+    Returns whether snapshot_path holds a snapshot this version can load, with
+    the current restrictions, written after source_path was last modified.
+    """
+    meta_path = os.path.join(snapshot_path, "meta.json")
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if meta.get("version") != PANTRY_SNAPSHOT_VERSION:
+        return False
+    if meta.get("restrictions") != FOOD_RESTRICTION_NAMES:
+        return False
+    return source_path is None or os.path.getmtime(meta_path) >= os.path.getmtime(
+        source_path
+    )
+
+
+class PantryOverlay(BasePantry):
+    """
+    A per-session view of a shared, frozen Pantry. Reads go through to the base
+    pantry's arrays; the active set and the FoodRecord cache are the overlay's
+    own and prices are copied from the base on the first price override (copy
+    on write).
+    """
+
+    base = param.ClassSelector(class_=Pantry, doc="Shared base pantry")
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.base.compile()
+        self.active_foods = set(self.base.active_foods)
+        self.active_mask = self.base.active_mask.copy()
+        self.price_overrides = {}
+        self.foods = {}
+        self._prices = None
+
+    @property
+    def fdc_ids(self):
+        return self.base.fdc_ids
+
+    @property
+    def fdc_id_to_col(self):
+        return self.base.fdc_id_to_col
+
+    @property
+    def food_names(self):
+        return self.base.food_names
+
+    @property
+    def serving_sizes(self):
+        return self.base.serving_sizes
+
+    @property
+    def nutrient_nbrs(self):
+        return self.base.nutrient_nbrs
+
+    @property
+    def nutrient_nbr_to_row(self):
+        return self.base.nutrient_nbr_to_row
+
+    @property
+    def nutrient_matrix(self):
+        return self.base.nutrient_matrix
+
+    @property
+    def restriction_bits(self):
+        return self.base.restriction_bits
+
+    def get_search_index(self):
+        return self.base.get_search_index()
+
+    @property
+    def prices(self):
+        if self._prices is None:
+            return self.base.prices
+        return self._prices
+
+    def set_prices(self, fdc_id_to_price: dict):
+        for fdc_id, price in fdc_id_to_price.items():
+            col = self.fdc_id_to_col[fdc_id]
+            if self.prices[col] == price:
+                continue
+            if self._prices is None:
+                self._prices = self.base.prices.copy()
+            self._prices[col] = price
+            self.price_overrides[fdc_id] = price
+            self.foods.pop(fdc_id, None)
+
+    def get_food_by_fdc_id(self, fdc_id: int):
+        # Foods are materialized into the overlay's own cache, the frozen base
+        # is shared between sessions and its cache is never written to
+        if fdc_id in self.foods:
+            return self.foods[fdc_id]
+        if fdc_id not in self.fdc_id_to_col:
+            raise ValueError(f"FDC ID {fdc_id} not found in pantry")
+        food = self._materialize_food(self.fdc_id_to_col[fdc_id])
+        self.foods[fdc_id] = food
+        return food
 
 
 class FoodStore(param.Parameterized):
@@ -262,12 +1048,33 @@ class BaseConstraint(param.Parameterized):
 
 
 class NutrientConstraint(BaseConstraint):
+    """
+    Parameterized adapter of a NutrientConstraintRecord for the Panel UI.
+    Constraints store NutrientConstraintRecords.
+    """
 
     nbr_to_coefficient = param.Dict(default={}, doc="Dict of nutrient to coefficient")
 
     def get_id(self):
         return tuple(sorted(self.nbr_to_coefficient.keys()))
 
+    def to_record(self):
+        return NutrientConstraintRecord(
+            constraint_type=self.constraint_type,
+            constraint_value=self.constraint_value,
+            nbr_to_coefficient=self.nbr_to_coefficient,
+            constraint_name=self.constraint_name,
+        )
+
+    @classmethod
+    def from_record(cls, record: NutrientConstraintRecord):
+        return cls(
+            constraint_type=record.constraint_type,
+            constraint_value=record.constraint_value,
+            nbr_to_coefficient=record.nbr_to_coefficient,
+            constraint_name=record.constraint_name,
+        )
+
 
 class FoodConstraint(BaseConstraint):
 
@@ -275,6 +1082,10 @@ class FoodConstraint(BaseConstraint):
 
 
 class BaseNutrient(param.Parameterized):
+    """
+    Parameterized adapter of a NutrientRecord for the Panel UI. Nutrient banks
+    store NutrientRecords.
+    """
 
     RDA_CATEGORIES = ["default"]
 
@@ -283,19 +1094,44 @@ class BaseNutrient(param.Parameterized):
     unit_name = param.String(default=None, doc="Unit of nutrient")
     nutrient_informal_name = param.String(default=None, doc="Informal name of nutrient")
 
+    def to_record(self):
+        return NutrientRecord(
+            nutrient_id=self.nutrient_id,
+            nutrient_name=self.nutrient_name,
+            unit_name=self.unit_name,
+            nutrient_informal_name=self.nutrient_informal_name,
+        )
+
+    @classmethod
+    def from_record(cls, record: NutrientRecord):
+        return cls(
+            nutrient_id=record.nutrient_id,
+            nutrient_name=record.nutrient_name,
+            unit_name=record.unit_name,
+            nutrient_informal_name=record.nutrient_informal_name,
+        )
+
 
 class NutrientBank(param.Parameterized):
 
-    nutrients = param.Dict(default={}, doc="Dict of nutrients")
+    nutrients = param.Dict(default={}, doc="Dict of NutrientRecords")
 
     def __init__(self, **params):
         super().__init__(**params)
-
-    def add_nutrient(self, nutrient: BaseNutrient):
+        self._nutrient_table = None
+
+    def add_nutrient(self, nutrient: NutrientRecord):
+        """
+        Adds a NutrientRecord, or a BaseNutrient converted to one.
+        """
+        if isinstance(nutrient, BaseNutrient):
+            nutrient = nutrient.to_record()
         self.nutrients[nutrient.nutrient_id] = nutrient
+        self._nutrient_table = None
 
     def remove_nutrient(self, nutrient_id):
         del self.nutrients[nutrient_id]
+        self._nutrient_table = None
 
     def get_default_constraints(self):
         constraints = Constraints()
@@ -306,11 +1142,33 @@ class NutrientBank(param.Parameterized):
     def get_nutrient_by_id(self, nutrient_id, default=None):
         return self.nutrients.get(nutrient_id, default)
 
+    def get_nutrient_table(self):
+        """
+        Returns the name and unit of every nutrient indexed by nutrient id. The
+        table is built once and rebuilt only after nutrients are added or
+        removed.
+        """
+        if self._nutrient_table is None:
+            self._nutrient_table = pd.DataFrame(
+                {
+                    "nutrient_name": [
+                        nutrient.nutrient_name for nutrient in self.nutrients.values()
+                    ],
+                    "unit_name": [
+                        nutrient.unit_name for nutrient in self.nutrients.values()
+                    ],
+                },
+                index=pd.Index(
+                    list(self.nutrients), dtype=np.int64, name="nutrient_nbr"
+                ),
+            )
+        return self._nutrient_table
+
     def build_nutrient_bank_from_json(self, json_path: str):
         with open(json_path, "r") as f:
             data = json.load(f)
         for nutrient_id in data:
-            nutrient = BaseNutrient(
+            nutrient = NutrientRecord(
                 nutrient_name=data[nutrient_id]["nutrient_name"],
                 nutrient_id=int(nutrient_id),
                 unit_name=data[nutrient_id]["unit_name"],
@@ -321,9 +1179,9 @@ class NutrientBank(param.Parameterized):
     def build_nutrient_bank_from_csv(self, csv_path: str):
         df = pd.read_csv(csv_path, index_col=0)
         for index, row in df.iterrows():
-            nutrient = BaseNutrient(
+            nutrient = NutrientRecord(
                 nutrient_name=row["nutrient_name"],
-                nutrient_id=row["nutrient_nbr"],
+                nutrient_id=int(row["nutrient_nbr"]),
                 unit_name=row["unit_name"],
                 nutrient_informal_name=row["nutrient_informal_name"],
             )
@@ -347,10 +1205,16 @@ class Constraints(param.Parameterized):
         if isinstance(constraints, list):
             for constraint in constraints:
                 self.add_constraint(constraint)
-        elif isinstance(constraints, BaseConstraint):
+        elif isinstance(constraints, (BaseConstraint, NutrientConstraintRecord)):
             self.add_constraint(constraints)
 
-    def add_nutrient_constraint(self, nutrient_constraint: NutrientConstraint):
+    def add_nutrient_constraint(self, nutrient_constraint: NutrientConstraintRecord):
+        """
+        Adds a NutrientConstraintRecord, or a NutrientConstraint converted to
+        one.
+        """
+        if isinstance(nutrient_constraint, NutrientConstraint):
+            nutrient_constraint = nutrient_constraint.to_record()
         nutrient_constraint_id = nutrient_constraint.get_id()
         if nutrient_constraint_id not in self.nutrient_constraints:
             self.nutrient_constraints[nutrient_constraint_id] = {}
@@ -362,21 +1226,9 @@ class Constraints(param.Parameterized):
     def add_nutrient_constraints_from_json(
         self, json_path, age_sex="male", age_range="19-30"
     ):
-        with open(json_path, "r") as f:
-            data = json.load(f)
-        for constraint_id, info in data.items():
-            nutrient_nbrs = [int(nbr) for nbr in constraint_id.split(";")]
-            nbr_to_coefficient = {nbr: 1 for nbr in nutrient_nbrs}
-            for constraint_type, constraint_value in info["constraints"][age_sex][
-                age_range
-            ].items():
-                if constraint_type not in CONSTRAINT_TYPES:
-                    continue
-                constraint = NutrientConstraint(
-                    constraint_type=constraint_type,
-                    constraint_value=constraint_value,
-                    nbr_to_coefficient=nbr_to_coefficient,
-                )
+        profile = get_nutrient_constraint_profile(json_path, age_sex, age_range)
+        for constraints in profile.values():
+            for constraint in constraints.values():
                 self.add_nutrient_constraint(constraint)
 
     """
@@ -398,7 +1250,7 @@ class Constraints(param.Parameterized):
                     + " "
                     + row.get("constraint_value")
                 )
-            constraint = NutrientConstraint(
+            constraint = NutrientConstraintRecord(
                 constraint_name=constraint_name,
                 constraint_type=row["constraint_type"],
                 constraint_value=row["constraint_value"],
@@ -409,100 +1261,741 @@ class Constraints(param.Parameterized):
     def remove_constraint(self, constraint_id):
         del self.constraints[constraint_id]
 
+    def get_constraint_rows(self):
+        """
+        Returns a list of (nutrient_nbrs, constraint_type, constraint_value), one
+        per nutrient constraint.
+        """
+        return [
+            (nutrient_nbrs, constraint_type, nutrient_constraint.constraint_value)
+            for nutrient_nbrs, constraints in self.nutrient_constraints.items()
+            for constraint_type, nutrient_constraint in constraints.items()
+        ]
+
+
+_nutrient_constraint_profiles = {}
+_nutrient_constraint_profiles_lock = threading.Lock()
+
+
+def load_nutrient_constraint_profiles(json_path):
+    """
+    Returns {(age_sex, age_range): nutrient_constraints} for every profile in a
+    nutrient constraints JSON file. The file is parsed once per process and read
+    again only when its modification time changes.
+    """
+    mtime = os.path.getmtime(json_path)
+    with _nutrient_constraint_profiles_lock:
+        cached = _nutrient_constraint_profiles.get(json_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        profiles = {}
+        for constraint_id, info in data.items():
+            nutrient_nbrs = [int(nbr) for nbr in constraint_id.split(";")]
+            nbr_to_coefficient = {nbr: 1 for nbr in nutrient_nbrs}
+            for age_sex, age_ranges in info["constraints"].items():
+                for age_range, values in age_ranges.items():
+                    for constraint_type, constraint_value in values.items():
+                        if constraint_type not in CONSTRAINT_TYPES:
+                            continue
+                        constraint = NutrientConstraintRecord(
+                            constraint_type=constraint_type,
+                            constraint_value=constraint_value,
+                            nbr_to_coefficient=nbr_to_coefficient,
+                        )
+                        profile = profiles.setdefault((age_sex, age_range), {})
+                        profile.setdefault(constraint.get_id(), {})[
+                            constraint_type
+                        ] = constraint
+        _nutrient_constraint_profiles[json_path] = (mtime, profiles)
+        return profiles
+
+
+def get_nutrient_constraint_profile(json_path, age_sex="male", age_range="19-30"):
+    """
+    Returns a copy of the cached nutrient_constraints dict of one profile. The
+    dicts are copied, the NutrientConstraintRecords are shared and should be
+    treated as read-only.
+    """
+    profile = load_nutrient_constraint_profiles(json_path)[(age_sex, age_range)]
+    return {
+        nutrient_nbrs: dict(constraints)
+        for nutrient_nbrs, constraints in profile.items()
+    }
+
 
 class BaseObjective(param.Parameterized):
+    """
+    What a diet is judged by, as the value of one dollar spent on each food.
+    Solvers minimize, so a maximized value is negated into the costs.
+    """
 
     objective_name = param.String(default=None, doc="Name of objective")
     objective_type = param.Selector(
         default=None, objects=["maximize", "minimize"], doc="Objective type"
     )
 
+    def get_coefficients(self, nutrient_matrix, nutrient_nbr_to_row: dict, prices):
+        """
+        Returns the value of one dollar of each food, given a (nutrient x food)
+        matrix of nutrient amounts per 100 g and the matching price vector.
+        """
+        raise NotImplementedError
+
+    def get_sign(self):
+        return -1 if self.objective_type == "maximize" else 1
+
+    def get_costs(self, nutrient_matrix, nutrient_nbr_to_row: dict, prices):
+        return self.get_sign() * self.get_coefficients(
+            nutrient_matrix, nutrient_nbr_to_row, prices
+        )
+
+
+class CostObjective(BaseObjective):
+    """
+    The cost of the diet, the objective of the problem when none is given.
+    """
+
+    objective_name = param.String(default="Cost", doc="Name of objective")
+    objective_type = param.Selector(
+        default="minimize", objects=["maximize", "minimize"], doc="Objective type"
+    )
+
+    def get_coefficients(self, nutrient_matrix, nutrient_nbr_to_row: dict, prices):
+        return np.ones(nutrient_matrix.shape[1])
+
+
+class NutrientObjective(BaseObjective):
+    """
+    The total amount of a group of nutrients in the diet.
+    """
+
+    objective_type = param.Selector(
+        default="maximize", objects=["maximize", "minimize"], doc="Objective type"
+    )
+    nutrient_nbrs = param.List(
+        default=[], item_type=int, doc="Nutrients summed into the objective"
+    )
+
+    def get_coefficients(self, nutrient_matrix, nutrient_nbr_to_row: dict, prices):
+        return get_coefficient_matrix(
+            nutrient_matrix, nutrient_nbr_to_row, prices, [self.nutrient_nbrs]
+        )[0]
+
+
+def get_coefficient_matrix(
+    nutrient_matrix, nutrient_nbr_to_row: dict, prices, nutrient_groups: list
+):
+    """
+    Returns a (nutrient group x food) matrix of nutrient amount per dollar, given
+    a sparse or dense (nutrient x food) matrix of nutrient amounts per 100 g and
+    the matching price vector. Nutrients missing from a food contribute zero.
+    """
+    grouping = np.zeros((nutrient_matrix.shape[0], len(nutrient_groups)))
+    for i, group in enumerate(nutrient_groups):
+        for nbr in group:
+            if nbr in nutrient_nbr_to_row:
+                grouping[nutrient_nbr_to_row[nbr], i] += 1
+    # Sums the rows of each group in one product, sparse times dense
+    return (nutrient_matrix.T @ grouping).T / prices
+
+
+def get_constraint_index(constraint_rows: list):
+    """
+    Returns a DataFrame describing each constraint row (its nutrient group, type
+    and name), so results can be labelled without parsing variable names.
+    """
+    nutrient_groups = [tuple(nutrient_nbrs) for nutrient_nbrs, _, _ in constraint_rows]
+    return pd.DataFrame(
+        {
+            "constraint_name": [
+                f"{'_'.join([str(nbr) for nbr in nutrient_nbrs])}:{constraint_type}"
+                for nutrient_nbrs, constraint_type, _ in constraint_rows
+            ],
+            "nutrient_nbrs": pd.Series(nutrient_groups, dtype=object),
+            "constraint_type": pd.Categorical(
+                [constraint_type for _, constraint_type, _ in constraint_rows],
+                categories=CONSTRAINT_TYPES,
+            ),
+        }
+    )
+
 
 class FoodOptimizer(param.Parameterized):
 
-    pantry = param.ClassSelector(class_=Pantry, doc="Pantry")
+    pantry = param.ClassSelector(class_=BasePantry, doc="Pantry")
     constraints = param.ClassSelector(class_=Constraints, doc="Constraints")
     nutrient_bank = param.ClassSelector(
         class_=NutrientBank, default=None, doc="Nutrient bank"
     )
-    # objective = param.ClassSelector(class_=BaseObjective, doc="Objective")
+    incremental = param.Boolean(
+        default=False,
+        doc="Patch and warm start the previous problem instead of rebuilding it",
+    )
+    time_limit = param.Number(
+        default=None, bounds=(0, None), doc="Time limit of each solve in seconds"
+    )
+    solver = param.Selector(
+        default=DEFAULT_SOLVER,
+        objects=list(SOLVER_BACKENDS),
+        doc="Solver backend, CBC is used when highspy is not installed",
+    )
+    msg = param.Boolean(default=True, doc="Print the solver log")
+    metrics_hooks = param.List(
+        default=[], doc="Callables called with the LpSolution of every solve"
+    )
+    max_results = param.Integer(
+        default=None,
+        bounds=(1, None),
+        doc="Most recent solutions kept in results, all of them when None",
+    )
+    presolve = param.Boolean(
+        default=False,
+        doc="Leave empty, duplicate and dominated foods out of the solver model",
+    )
+    ranging = param.Boolean(
+        default=False,
+        doc="Compute the price and constraint ranges of the optimal basis (HiGHS)",
+    )
+    portions = param.Boolean(
+        default=False,
+        doc="Buy foods with a serving size in whole servings (mixed integer)",
+    )
+    max_foods = param.Integer(
+        default=None, bounds=(1, None), doc="Most distinct foods, with portions"
+    )
+    min_portion_g = param.Number(
+        default=0.0,
+        bounds=(0.0, None),
+        doc="Least grams of a food that is bought at all, with portions",
+    )
+    mip_gap = param.Number(
+        default=0.01,
+        bounds=(0.0, None),
+        doc="Relative gap at which a solve with portions stops",
+    )
+    core_size = param.Integer(
+        default=200,
+        bounds=(1, None),
+        doc="Foods in the first, restricted solve with portions",
+    )
+    objective = param.ClassSelector(
+        class_=BaseObjective,
+        default=None,
+        doc="Objective, the cost of the diet when not given",
+    )
 
     def __init__(self, starting_foods: dict = {}, **params):
         super().__init__(**params)
         self.results = []
         self.starting_foods = starting_foods
+        self.backend = None
+        # Shared with every backend this optimizer builds, so a cancel during
+        # presolve or build reaches the solve that follows
+        self._cancel = threading.Event()
+        self._presolved = None
+        self._portions = None
+
+    def get_coefficient_matrix(self, cols, nutrient_groups: list):
+        """
+        Returns a (nutrient group x food) matrix of nutrient amount per dollar for
+        the given pantry columns. Nutrients missing from a food contribute zero.
+        """
+        self.pantry.compile()
+        return get_coefficient_matrix(
+            self.pantry.nutrient_matrix[:, cols],
+            self.pantry.nutrient_nbr_to_row,
+            self.pantry.prices[cols],
+            nutrient_groups,
+        )
 
-    def optimize(self):
-        # Define the problem
+    def get_constraint_rows(self):
+        return self.constraints.get_constraint_rows()
+
+    def has_cost_objective(self):
+        return self.objective is None or isinstance(self.objective, CostObjective)
+
+    def get_costs(self, cols):
+        """
+        Returns the objective cost of one dollar of each food in the given pantry
+        columns, or None for the default of one per dollar.
+        """
+        if self.objective is None:
+            return None
+        self.pantry.compile()
+        return self.objective.get_costs(
+            self.pantry.nutrient_matrix[:, cols],
+            self.pantry.nutrient_nbr_to_row,
+            self.pantry.prices[cols],
+        )
 
-        prob = LpProblem("Minimize_Cost", LpMinimize)
-        decision_variables = {}
-        slack_vars = []
+    def get_objective_value(self, objective: BaseObjective, result=None):
+        """
+        Returns the value of objective, which need not be the one optimized, at
+        the diet of result.
+        """
+        if result is None:
+            result = self.results[-1]
+        coefficients = objective.get_coefficients(
+            self.pantry.nutrient_matrix[:, result.cols],
+            self.pantry.nutrient_nbr_to_row,
+            result.prices,
+        )
+        return coefficients @ result.x
 
-        # Define decision variables for each food item
-        for fdc_id, food in self.pantry.get_active_foods().items():
-            lowBound = self.starting_foods.get(fdc_id, 0)
-            decision_variables[fdc_id] = LpVariable(
-                f"{fdc_id} {food.food_name}", lowBound=lowBound
+    def get_variable_names(self, cols):
+        return [
+            f"{fdc_id} {food_name}"
+            for fdc_id, food_name in zip(
+                self.pantry.fdc_ids[cols].tolist(), self.pantry.food_names[cols]
             )
+        ]
 
-        active_fdc_ids = list(self.pantry.get_active_foods().keys())
-        # Add constraints based on nutrient requirements
-        for nutrient_nbrs, constraints in self.constraints.nutrient_constraints.items():
+    def get_low_bounds(self, cols):
+        return [
+            self.starting_foods.get(fdc_id, 0)
+            for fdc_id in self.pantry.fdc_ids[cols].tolist()
+        ]
 
-            for constraint_type, nutrient_constraint in constraints.items():
-                coefficient_list = []
-                constraint_value = nutrient_constraint.constraint_value
+    def optimize(self):
+        """
+        Prepares and solves the problem and returns its status. A cancel stops
+        it between stages; if it comes before the solve, no result is appended
+        and the status is not solved.
+        """
+        self._cancel.clear()
+        timings = {}
+        warm_start = self.prepare_problem(timings)
+        if self.is_cancelled():
+            return pulp.LpStatusNotSolved
+        return self.solve_problem(warm_start, timings)
+
+    def prepare_problem(self, timings=None):
+        """
+        Builds the problem for the active foods and current constraints, or
+        patches the previous one when incremental. Returns whether the solve
+        can be warm started.
+        """
+        timings = {} if timings is None else timings
+        active_cols = self.pantry.get_active_cols()
+        constraint_rows = self.get_constraint_rows()
+
+        warm_start = self.incremental and self.can_update_problem(constraint_rows)
+        self._presolved = None
+        # Dominance does not hold between foods bought in whole servings, and
+        # it compares foods by their cost alone. A patched problem keeps every
+        # active food, presolving costs more than the warm solve saves
+        if (
+            self.presolve
+            and not warm_start
+            and not self.portions
+            and self.has_cost_objective()
+        ):
+            with time_stage(timings, "presolve"):
+                active_cols = self.presolve_foods(active_cols, constraint_rows)
+            if self.is_cancelled():
+                # The previous problem is left as it was
+                return warm_start
+
+        with time_stage(timings, "build"):
+            if warm_start:
+                self.update_problem(active_cols, constraint_rows)
+            else:
+                self.build_problem(active_cols, constraint_rows)
+        return warm_start
+
+    def presolve_foods(self, active_cols, constraint_rows):
+        """
+        Returns the active columns left after presolve. Foods with a starting
+        amount are always kept.
+        """
+        coefficient_matrix = self.get_coefficient_matrix(
+            active_cols, [nutrient_nbrs for nutrient_nbrs, _, _ in constraint_rows]
+        )
+        keep = np.array(self.get_low_bounds(active_cols), dtype=float) > 0
+        presolved = presolve_columns(
+            coefficient_matrix, [row[1] for row in constraint_rows], keep
+        )
+        removed = presolved.get_removed()
+        self._presolved = (
+            active_cols,
+            presolved,
+            coefficient_matrix[:, removed],
+        )
+        return active_cols[presolved.kept]
+
+    def add_presolved_foods(self, result):
+        """
+        Appends the foods removed by presolve to the solution vectors with zero
+        spend, so the solution covers every active food. Their reduced costs
+        are priced from the duals: one dollar minus the value of the nutrients it
+        buys.
+        """
+        active_cols, presolved, removed_matrix = self._presolved
+        removed = presolved.get_removed()
+        removed_cols = active_cols[removed]
+        # Presolve only runs when the problem is built, so none of the removed
+        # foods are in the model
+        result.x = np.concatenate([result.x, np.zeros(len(removed_cols))])
+        removed_reduced_costs = 1 - result.duals @ removed_matrix
+        result.reduced_costs = np.concatenate(
+            [result.reduced_costs, removed_reduced_costs]
+        )
+        if result.cost_lower is not None:
+            # A food left out enters once its cost drops by its reduced cost
+            result.cost_lower = np.concatenate(
+                [result.cost_lower, 1 - removed_reduced_costs]
+            )
+            result.cost_upper = np.concatenate(
+                [result.cost_upper, np.full(len(removed_cols), np.inf)]
+            )
+        result.cols = np.concatenate([result.cols, removed_cols])
+        result.fdc_ids = np.concatenate(
+            [result.fdc_ids, self.pantry.fdc_ids[removed_cols]]
+        )
+        result.prices = np.concatenate(
+            [result.prices, self.pantry.prices[removed_cols]]
+        )
+        result.active = np.concatenate(
+            [result.active, np.ones(len(removed_cols), dtype=bool)]
+        )
 
-                for nbr in nutrient_nbrs:
+        kept_by = presolved.kept_by[removed]
+        has_kept_by = kept_by >= 0
+        kept_fdc_ids = pd.array([pd.NA] * len(removed), dtype="Int64")
+        kept_fdc_ids[has_kept_by] = self.pantry.fdc_ids[
+            active_cols[kept_by[has_kept_by]]
+        ]
+        result.presolve_report = pd.DataFrame(
+            {
+                "fdc_id": self.pantry.fdc_ids[removed_cols],
+                "food_name": self.pantry.food_names[removed_cols],
+                "reason": pd.Categorical(
+                    presolved.reasons[removed], categories=PRESOLVE_REASONS
+                ),
+                "kept_fdc_id": kept_fdc_ids,
+            }
+        )
 
-                    for fdc_id in active_fdc_ids:
+    def solve_problem(self, warm_start=False, timings=None):
+        """
+        Solves the prepared problem and appends the LpSolution to results,
+        dropping the oldest beyond max_results. The timings of earlier stages
+        are merged into the solution's timings before it is passed to the
+        metrics hooks.
+        """
+        constraint_rows = self._constraint_rows
+        timings = {} if timings is None else timings
+        if self._portions is not None:
+            result = self.solve_portions(timings)
+        else:
+            result = self.backend.solve(
+                time_limit=self.time_limit,
+                warm_start=warm_start,
+                # Cost ranges are read as price ranges, which other objectives
+                # do not give
+                ranging=self.ranging and self.has_cost_objective(),
+            )
+        result.timings = {**timings, **result.timings}
+        with time_stage(result.timings, "extract"):
+            if self._portions is not None:
+                self.add_portion_units(result)
+            model_cols = np.array(self._model_cols, dtype=np.int64)
+            result.cols = model_cols
+            result.fdc_ids = self.pantry.fdc_ids[model_cols]
+            result.prices = self._model_prices[model_cols]
+            result.active = self.pantry.active_mask[model_cols]
+            result.constraint_rows = constraint_rows
+            result.constraint_index = self._constraint_index
+            n_variables, n_constraints, n_nonzeros = self.backend.get_model_size()
+            result.n_variables = n_variables
+            result.n_constraints = n_constraints
+            result.n_nonzeros = n_nonzeros
+            if self._presolved is not None:
+                self.add_presolved_foods(result)
+        self.results.append(result)
+        if self.max_results is not None:
+            del self.results[: -self.max_results]
+        emit_metrics(self.metrics_hooks, result)
+        return result.status
+
+    def get_remaining_time(self, start_time):
+        if self.time_limit is None:
+            return None
+        return max(self.time_limit - (time.perf_counter() - start_time), 0)
+
+    def solve_portions(self, timings):
+        """
+        Solves the LP relaxation and rounds its diet into a starting solution
+        that keeps the portion rules. On pantries larger than core_size a
+        restricted problem over the foods with the lowest reduced costs is
+        solved first; its diet bounds the cost, so foods that would cost more
+        than that are fixed out of the full mixed integer problem, which then
+        starts from it. A cancel stops it before the next stage, with the core
+        diet if there is one.
+        """
+        start_time = time.perf_counter()
+        portions = self._portions
+        with time_stage(timings, "relaxation"):
+            relaxation = self.backend.solve(time_limit=self.time_limit)
+            units = relaxation.x
+            if relaxation.status != pulp.LpStatusOptimal:
+                units = np.zeros(len(portions["unit_costs"]))
+        if self.is_cancelled():
+            # The relaxation does not keep the portion rules
+            relaxation.status = pulp.LpStatusNotSolved
+            return relaxation
+
+        up_bounds = get_unit_bounds(
+            portions["coefficient_matrix"],
+            self._constraint_rows,
+            portions["integer"],
+            portions["low_bounds"],
+            portions["min_units"],
+            portions["costs"],
+        )
+        self.backend.set_portions(
+            portions["integer"], up_bounds, portions["min_units"], self.max_foods
+        )
+        start = get_rounded_start(
+            units,
+            portions["unit_costs"],
+            portions["integer"],
+            portions["low_bounds"],
+            portions["min_units"],
+            up_bounds,
+            self.max_foods,
+        )
+        start = (
+            start,
+            *get_slacks(portions["coefficient_matrix"], self._constraint_rows, start),
+        )
 
-                        if nbr not in self.pantry.foods[fdc_id].food_nutrition:
-                            print(
-                                f"Nutrient {nbr} not found in food {self.pantry.foods[fdc_id].food_name}",
-                                type(nbr),
-                            )
-                            continue
+        if len(units) > self.core_size and relaxation.status == pulp.LpStatusOptimal:
+            start, core = self.solve_portion_core(
+                relaxation, up_bounds, start, start_time, timings
+            )
+            if self.is_cancelled():
+                core.relaxation_objective = relaxation.objective
+                core.proven_optimal = False
+                return core
+        # The start is set last, solvers drop it when the model changes
+        self.backend.set_start(*start)
+        result = self.backend.solve(
+            time_limit=self.get_remaining_time(start_time), warm_start=True
+        )
+        result.relaxation_objective = relaxation.objective
+        return result
+
+    def solve_portion_core(self, relaxation, up_bounds, start, start_time, timings):
+        """
+        Solves the problem restricted to the core foods from start, in half of
+        the time left, and restores the foods its diet does not fix out. Returns
+        the core diet, or start if none was found, as units and slacks, and the
+        core solution.
+        """
+        portions = self._portions
+        outside = np.flatnonzero(
+            ~get_core_foods(
+                relaxation.reduced_costs,
+                relaxation.x,
+                portions["low_bounds"],
+                self.core_size,
+            )
+        )
+        for variable in outside.tolist():
+            self.backend.set_bounds(variable, 0, 0)
+        self.backend.set_start(*start)
+        remaining_time = self.get_remaining_time(start_time)
+        with time_stage(timings, "core"):
+            core = self.backend.solve(
+                time_limit=None if remaining_time is None else remaining_time / 2,
+                warm_start=True,
+            )
 
-                        coefficient_list.append(
-                            decision_variables[fdc_id]
-                            * self.pantry.foods[fdc_id].food_nutrition.get(nbr, 0)
-                            / self.pantry.foods[fdc_id].price.price_per_100_g
-                        )
+        restored = outside
+        if core.status == pulp.LpStatusOptimal:
+            fixed = get_fixed_foods(
+                relaxation.reduced_costs,
+                portions["integer"],
+                portions["low_bounds"],
+                portions["min_units"],
+                core.objective - relaxation.objective,
+            )
+            restored = outside[~fixed[outside]]
+            start = (core.x, core.slack_up, core.slack_down)
+        for variable in restored.tolist():
+            self.backend.set_bounds(
+                variable, portions["low_bounds"][variable], up_bounds[variable]
+            )
+        return start, core
+
+    def add_portion_units(self, result):
+        """
+        Converts the units of a solve with portions, servings or dollars, to
+        dollars and records the servings.
+        """
+        unit_costs = self._portions["unit_costs"]
+        integer = self._portions["integer"]
+        units = np.where(integer, np.round(result.x), result.x)
+        units[units < PORTION_TOLERANCE] = 0
+        result.servings = np.where(integer, units, np.nan)
+        result.x = units * unit_costs
+        result.reduced_costs = result.reduced_costs / unit_costs
+
+    def cancel(self):
+        """
+        Stops the running optimize before its next stage, and interrupts its
+        solve if the solver backend supports it.
+        """
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def build_problem(self, active_cols, constraint_rows):
+        coefficient_matrix = self.get_coefficient_matrix(
+            active_cols, [nutrient_nbrs for nutrient_nbrs, _, _ in constraint_rows]
+        )
+        low_bounds = np.array(self.get_low_bounds(active_cols), dtype=float)
+        costs = self.get_costs(active_cols)
+        self._portions = None
+        if self.portions:
+            # Foods with a serving size are modeled in servings, the rest in
+            # dollars as usual
+            prices = self.pantry.prices[active_cols]
+            serving_sizes = self.pantry.serving_sizes[active_cols]
+            unit_costs, integer = get_unit_costs(prices, serving_sizes)
+            coefficient_matrix = coefficient_matrix * unit_costs
+            costs = unit_costs if costs is None else costs * unit_costs
+            low_bounds = low_bounds / unit_costs
+            low_bounds[integer] = np.ceil(low_bounds[integer])
+            self._portions = {
+                "unit_costs": unit_costs,
+                "costs": costs,
+                "integer": integer,
+                "low_bounds": low_bounds,
+                "min_units": get_min_units(
+                    prices, serving_sizes, integer, self.min_portion_g
+                ),
+                "coefficient_matrix": coefficient_matrix,
+            }
+        backend = get_solver_backend(
+            self.solver, msg=self.msg, mip_gap=self.mip_gap, cancel_event=self._cancel
+        )
+        backend.build(
+            coefficient_matrix,
+            constraint_rows,
+            self.get_variable_names(active_cols),
+            low_bounds,
+            costs,
+        )
 
-                slack_var_up = pulp.LpVariable(
-                    f"slack@{";".join([str(n) for n in nutrient_nbrs])}@{constraint_type}@up",
-                    lowBound=0,
-                )
-                slack_var_down = pulp.LpVariable(
-                    f"slack@{";".join([str(n) for n in nutrient_nbrs])}@{constraint_type}@down",
-                    lowBound=0,
-                )
-                slack_vars.append(slack_var_up)
-                slack_vars.append(slack_var_down)
+        self.backend = backend
+        self._model_cols = active_cols.tolist()
+        self._col_to_variable = {col: i for i, col in enumerate(self._model_cols)}
+        self._constraint_rows = constraint_rows
+        self._constraint_index = get_constraint_index(constraint_rows)
+        self._model_pantry = self.pantry
+        self._model_objective = self.objective
+        self._model_prices = np.full(len(self.pantry.fdc_ids), np.nan)
+        self._model_prices[active_cols] = self.pantry.prices[active_cols]
+        self._model_active = set(self._model_cols)
+
+    def can_update_problem(self, constraint_rows):
+        """
+        The previous problem can be patched if it was built by the same solver
+        for the same pantry and the same set of constraint rows. Problems with
+        portions are mixed integer once solved, so they are always rebuilt, and
+        so are problems with an objective other than cost, whose costs change
+        with the prices.
+        """
+        if self.backend is None or self.backend.solver_name != self.solver:
+            return False
+        if self.portions or self._portions is not None:
+            return False
+        if not self.has_cost_objective() or self._model_objective is not self.objective:
+            return False
+        if self._model_pantry is not self.pantry:
+            return False
+        if len(self._model_prices) != len(self.pantry.fdc_ids):
+            return False
+        return [row[:2] for row in constraint_rows] == [
+            row[:2] for row in self._constraint_rows
+        ]
+
+    def update_problem(self, active_cols, constraint_rows):
+        """
+        Patches the previous problem in place: changed right-hand sides, the
+        coefficients of foods whose price changed, and the bounds of foods that
+        were activated or deactivated. Foods that were never part of the problem
+        are added as new variables.
+        """
+        prices = self.pantry.prices
+        active = set(active_cols.tolist())
+        nutrient_groups = [nutrient_nbrs for nutrient_nbrs, _, _ in constraint_rows]
+
+        for row, ((_, _, constraint_value), (_, _, previous_value)) in enumerate(
+            zip(constraint_rows, self._constraint_rows)
+        ):
+            if constraint_value != previous_value:
+                self.backend.set_rhs(row, constraint_value)
+        self._constraint_rows = constraint_rows
+
+        for col in self._model_active - active:
+            self.backend.set_bounds(self._col_to_variable[col], 0, 0)
+
+        new_cols = np.array(
+            [col for col in active_cols.tolist() if col not in self._col_to_variable],
+            dtype=np.int64,
+        )
+        if len(new_cols) > 0:
+            self.backend.add_variables(
+                self.get_coefficient_matrix(new_cols, nutrient_groups),
+                self.get_variable_names(new_cols),
+                self.get_low_bounds(new_cols),
+            )
+            for col in new_cols.tolist():
+                self._col_to_variable[col] = len(self._model_cols)
+                self._model_cols.append(col)
+            self._model_prices[new_cols] = prices[new_cols]
+        for col in active - self._model_active - set(new_cols.tolist()):
+            fdc_id = self.pantry.fdc_ids[col].item()
+            self.backend.set_bounds(
+                self._col_to_variable[col], self.starting_foods.get(fdc_id, 0)
+            )
+        self._model_active = active
 
-                pulp_sum = pulp.lpSum(coefficient_list) + slack_var_up - slack_var_down
+        changed_cols = active_cols[
+            self._model_prices[active_cols] != prices[active_cols]
+        ]
+        if len(changed_cols) == 0:
+            return
+        self.backend.set_coefficients(
+            [self._col_to_variable[col] for col in changed_cols.tolist()],
+            self.get_coefficient_matrix(changed_cols, nutrient_groups),
+        )
+        self._model_prices[changed_cols] = prices[changed_cols]
 
-                constraint_name = (
-                    f"{'_'.join([str(nbr) for nbr in nutrient_nbrs])}:{constraint_type}"
-                )
-                if constraint_type == "equality":
-                    prob += (pulp_sum == constraint_value, constraint_name)
-                elif constraint_type == "upper_bound":
-                    prob += (pulp_sum <= constraint_value, constraint_name)
-                elif constraint_type == "lower_bound":
-                    prob += (pulp_sum >= constraint_value, constraint_name)
+    def get_slack_variables(self, result=None):
+        if result is None:
+            result = self.results[-1]
 
-        # Objective function: minimize the sum of decision variables (or add specific costs if needed)
-        prob += sum(list(decision_variables.values())) + sum(
-            [sv * 10000 for sv in slack_vars]
+        # Slack variables come in (up, down) pairs per constraint row
+        index = result.constraint_index
+        return pd.DataFrame(
+            {
+                "nutrient_nbrs": np.repeat(index.nutrient_nbrs.to_numpy(), 2),
+                "constraint_type": np.repeat(index.constraint_type.to_numpy(), 2),
+                "constraint_direction": np.tile(["up", "down"], len(index)),
+                "slack_value": np.column_stack(
+                    [result.slack_up, result.slack_down]
+                ).ravel(),
+            }
         )
 
-        status = prob.solve()
-        self.results.append(prob)
-        return status
-
     def parse_slack_variable_name(self, name):
         parts = name.split("@")
         nutrient_nbrs = parts[1].split(";")
@@ -510,70 +2003,115 @@ class FoodOptimizer(param.Parameterized):
         constraint_direction = parts[3]
         return nutrient_nbrs, constraint_type, constraint_direction
 
-    def get_slack_variables(self, prob=None):
-        if prob is None:
-            prob = self.results[-1]
-
-        slack_vars = []
-        for v in prob.variables():
-            if v.name[:5] == "slack":
-                nutrient_nbrs, constraint_type, constraint_direction = (
-                    self.parse_slack_variable_name(v.name)
-                )
-                slack_vars.append(
-                    [
-                        ";".join(nutrient_nbrs),
-                        constraint_type,
-                        constraint_direction,
-                        v.varValue,
-                    ]
-                )
+    def get_optimal_values(self, result=None):
+        """
+        Returns the value of every food and slack variable of result, named
+        like the variables of the PuLP model.
+        """
+        if result is None:
+            result = self.results[-1]
+
+        slack_names = []
+        for nutrient_nbrs, constraint_type, _ in result.constraint_rows:
+            nbrs_str = ";".join([str(n) for n in nutrient_nbrs])
+            slack_names += [
+                f"slack@{nbrs_str}@{constraint_type}@{direction}"
+                for direction in ["up", "down"]
+            ]
+        slack_values = np.column_stack([result.slack_up, result.slack_down]).ravel()
         return pd.DataFrame(
-            slack_vars,
-            columns=[
-                "nutrient_nbrs",
-                "constraint_type",
-                "constraint_direction",
-                "slack_value",
-            ],
+            {
+                "variable_name": self.get_variable_names(result.cols) + slack_names,
+                "variable_value": np.concatenate([result.x, slack_values]),
+            }
         )
 
-    def get_optimal_foods(self, prob=None):
-        if prob is None:
-            prob = self.results[-1]
-
-        optimal_amounts = []
-        for v in prob.variables():
-            if v.varValue != 0 and v.name[:5] != "slack":
-                optimal_amounts.append([v.name, v.varValue])
-        df = pd.DataFrame(optimal_amounts, columns=["food", "cost"])
-        df[["fdc_id", "food_name"]] = df.food.str.split("_", n=1, expand=True)
-        df = df.drop(columns="food")
-        df["price_per_100_g"] = df.fdc_id.apply(
-            lambda x: self.pantry.foods[int(x)].price.price_per_100_g
+    def get_optimal_foods(self, result=None):
+        if result is None:
+            result = self.results[-1]
+
+        chosen = np.flatnonzero(result.x)
+        df = pd.DataFrame(
+            {
+                "cost": result.x[chosen],
+                "fdc_id": result.fdc_ids[chosen],
+                "food_name": self.pantry.food_names[result.cols[chosen]],
+                "price_per_100_g": result.prices[chosen],
+            }
         )
         df["amount"] = df.cost / df.price_per_100_g * 100
+        if result.servings is not None:
+            df["servings"] = result.servings[chosen]
         return df
 
-    def get_shadow_prices(self, prob=None):
-        if prob is None:
-            prob = self.results[-1]
-
-        pis = []
+    def get_nutrient_totals(self, result=None):
+        """
+        Returns the amount of each nutrient in the diet indexed by nutrient_nbr,
+        computed as one product of the nutrient matrix and the amounts (in
+        100 g) of the chosen foods. Nutrients none of them contain are dropped.
+        """
+        if result is None:
+            result = self.results[-1]
+
+        chosen = np.flatnonzero(result.x)
+        nutrient_matrix = self.pantry.nutrient_matrix[:, result.cols[chosen]]
+        totals = nutrient_matrix @ (result.x[chosen] / result.prices[chosen])
+        present = np.bincount(nutrient_matrix.indices, minlength=len(totals)) > 0
+        return pd.Series(
+            totals[present],
+            index=pd.Index(self.pantry.nutrient_nbrs[present], name="nutrient_nbr"),
+            name="amount",
+        )
 
-        for name, constraint in prob.constraints.items():
-            pis.append([name, constraint.pi])
+    def get_shadow_prices(self, result=None):
+        if result is None:
+            result = self.results[-1]
 
-        constraint_shadow_prices = pd.DataFrame(pis, columns=["constraint_name", "pi"])
+        constraint_shadow_prices = result.constraint_index.copy()
+        constraint_shadow_prices["pi"] = result.duals
         return constraint_shadow_prices
 
-    def get_optimal_values(self, prob=None):
-        if prob is None:
-            prob = self.results[-1]
-
-        optimal_amounts = []
-        for v in prob.variables():
-            optimal_amounts.append([v.name, v.varValue])
-
-        ov = pd.DataFrame(optimal_amounts, columns=["variable_name", "variable_value"])
-        return ov
+    def get_rhs_ranging(self, result=None):
+        """
+        Returns the range of values of each constraint over which its shadow
+        price, and every other shadow price, stays the same.
+        """
+        if result is None:
+            result = self.results[-1]
+        if result.rhs_lower is None:
+            raise ValueError("Ranging was not computed for this solution")
+
+        constraint_ranging = result.constraint_index.copy()
+        constraint_ranging["constraint_value"] = [
+            constraint_value for _, _, constraint_value in result.constraint_rows
+        ]
+        constraint_ranging["pi"] = result.duals
+        constraint_ranging["value_lower"] = result.rhs_lower
+        constraint_ranging["value_upper"] = result.rhs_upper
+        return constraint_ranging
+
+    def get_cost_ranging(self, result=None):
+        """
+        Returns the range of prices per 100 g of each active food over which
+        the optimal diet keeps the same foods. The cost of a variable is one per
+        dollar at the current price, so its cost range scales the price.
+        """
+        if result is None:
+            result = self.results[-1]
+        if result.cost_lower is None:
+            raise ValueError("Ranging was not computed for this solution")
+
+        # Deactivated foods fixed at zero in a patched model have no range
+        active = np.flatnonzero(result.active)
+        prices = result.prices[active]
+        return pd.DataFrame(
+            {
+                "fdc_id": result.fdc_ids[active],
+                "food_name": self.pantry.food_names[result.cols[active]],
+                "cost": result.x[active],
+                "reduced_cost": result.reduced_costs[active],
+                "price_per_100_g": prices,
+                "price_lower": prices * np.maximum(result.cost_lower[active], 0),
+                "price_upper": prices * result.cost_upper[active],
+            }
+        )
@@ -0,0 +1,60 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+# Plain slotted records of the data the pantry, nutrient bank and constraints
+# hold. They carry no watchers or validation; the Parameterized classes in
+# pyfoodopt convert to and from them where the Panel UI needs parameters.
+# Records are frozen so one instance can be shared between sessions, changes
+# replace the record.
+
+
+@dataclass(slots=True, frozen=True)
+class PriceRecord:
+    price_per_100_g: float
+    original_price_per_100_g: float = None
+
+    def __post_init__(self):
+        if self.original_price_per_100_g is None:
+            object.__setattr__(self, "original_price_per_100_g", self.price_per_100_g)
+
+
+@dataclass(slots=True, frozen=True)
+class FoodMetaRecord:
+    description: str = None
+    nutrition_url: str = None
+    image_url: str = None
+
+
+@dataclass(slots=True, frozen=True)
+class FoodRecord:
+    """
+    A food as the pantry stores it. restriction_bits has bit i set if the food
+    satisfies FOOD_RESTRICTION_NAMES[i].
+    """
+
+    fdc_id: int
+    food_name: str
+    price: PriceRecord
+    food_nutrition: Mapping = field(default_factory=dict)
+    serving_size_g: float = None
+    restriction_bits: int = 0
+    food_meta: FoodMetaRecord = None
+
+
+@dataclass(slots=True, frozen=True)
+class NutrientRecord:
+    nutrient_id: int
+    nutrient_name: str = None
+    unit_name: str = None
+    nutrient_informal_name: str = None
+
+
+@dataclass(slots=True, frozen=True)
+class NutrientConstraintRecord:
+    constraint_type: str
+    constraint_value: float
+    nbr_to_coefficient: dict = field(default_factory=dict)
+    constraint_name: str = None
+
+    def get_id(self):
+        return tuple(sorted(self.nbr_to_coefficient.keys()))
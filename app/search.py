@@ -0,0 +1,79 @@
+from functools import reduce
+import numpy as np
+import param
+
+# Queries shorter than a trigram are answered by scanning the names
+TRIGRAM_LENGTH = 3
+
+
+def get_trigrams(text: str):
+    return {text[i : i + TRIGRAM_LENGTH] for i in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+class FoodSearchIndex(param.Parameterized):
+    """
+    Case-insensitive search over food names, built once per pantry. Substring
+    queries intersect the postings of a trigram inverted index and verify the
+    few remaining candidates; shorter queries scan the names. Results are
+    pantry columns, best match first.
+    """
+
+    def __init__(self, food_names, **params):
+        super().__init__(**params)
+        self.names = [str(food_name).lower() for food_name in food_names]
+        self.name_lengths = np.array([len(name) for name in self.names])
+
+        postings = {}
+        for col, name in enumerate(self.names):
+            for trigram in get_trigrams(name):
+                postings.setdefault(trigram, []).append(col)
+        self.trigram_postings = {
+            trigram: np.array(cols, dtype=np.int64)
+            for trigram, cols in postings.items()
+        }
+
+    def search(self, query: str):
+        """
+        Returns the columns of foods whose name contains query, ranked.
+        """
+        query = query.strip().lower()
+        if not query:
+            return np.arange(len(self.names))
+        if len(query) < TRIGRAM_LENGTH:
+            # Too short for the trigram index, and too common for an index
+            # to narrow down much
+            cols = np.flatnonzero([query in name for name in self.names])
+            return self.rank(cols, query)
+
+        trigrams = get_trigrams(query)
+        if any(trigram not in self.trigram_postings for trigram in trigrams):
+            return np.zeros(0, dtype=np.int64)
+        postings = sorted(
+            (self.trigram_postings[trigram] for trigram in trigrams), key=len
+        )
+        cols = reduce(np.intersect1d, postings)
+        if len(query) > TRIGRAM_LENGTH:
+            # Matching every trigram does not imply they are contiguous
+            cols = cols[[query in self.names[col] for col in cols.tolist()]]
+        return self.rank(cols, query)
+
+    def rank(self, cols, query: str):
+        """
+        Orders matches: exact names first, then names starting with query, then
+        names with a word starting with query, then shorter names.
+        """
+        if len(cols) == 0:
+            return cols
+        names = [self.names[col] for col in cols.tolist()]
+        positions = np.array([name.find(query) for name in names])
+        is_word_start = np.array(
+            [
+                position == 0 or not name[position - 1].isalnum()
+                for name, position in zip(names, positions.tolist())
+            ]
+        )
+        is_exact = np.array([name == query for name in names])
+        order = np.lexsort(
+            (self.name_lengths[cols], ~is_word_start, positions != 0, ~is_exact)
+        )
+        return cols[order]
@@ -0,0 +1,696 @@
+import threading
+import numpy as np
+import param
+import pulp
+from metrics import time_stage
+from pulp import LpProblem, LpVariable, LpMinimize
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+
+CONSTRAINT_SENSES = {
+    "equality": pulp.LpConstraintEQ,
+    "upper_bound": pulp.LpConstraintLE,
+    "lower_bound": pulp.LpConstraintGE,
+}
+
+# Objective cost of one unit of slack on a nutrient constraint
+SLACK_PENALTY = 10000
+
+
+class LpSolution(param.Parameterized):
+    """
+    Result of one solve. Variable vectors follow the order the food variables
+    were added to the backend, constraint vectors follow the constraint rows.
+    """
+
+    solver = param.String(default=None, doc="Name of the solver backend")
+    status = param.Integer(default=pulp.LpStatusNotSolved, doc="PuLP status code")
+    objective = param.Number(default=None, doc="Objective value including slack")
+    x = param.Array(default=None, doc="Dollars spent on each food variable")
+    reduced_costs = param.Array(default=None, doc="Reduced cost of each food variable")
+    slack_up = param.Array(default=None, doc="Up slack of each constraint row")
+    slack_down = param.Array(default=None, doc="Down slack of each constraint row")
+    duals = param.Array(default=None, doc="Shadow price of each constraint row")
+    cols = param.Array(default=None, doc="Pantry column of each food variable")
+    fdc_ids = param.Array(default=None, doc="fdc_id of each food variable")
+    prices = param.Array(default=None, doc="Price per 100 g of each food variable")
+    active = param.Array(
+        default=None,
+        doc="Whether each food variable was active, a patched model keeps "
+        "deactivated foods fixed at zero",
+    )
+    constraint_rows = param.List(
+        default=[], doc="(nutrient_nbrs, constraint_type, constraint_value) per row"
+    )
+    constraint_index = param.DataFrame(
+        default=None, doc="Nutrient group, type and name of each constraint row"
+    )
+    timings = param.Dict(
+        default={}, doc="Wall and CPU seconds of each stage, by stage name"
+    )
+    iterations = param.Integer(
+        default=None, doc="Simplex iterations, None if the solver does not report it"
+    )
+    n_variables = param.Integer(default=None, doc="Variables in the model")
+    n_constraints = param.Integer(default=None, doc="Constraints in the model")
+    n_nonzeros = param.Integer(default=None, doc="Nonzero constraint coefficients")
+    presolve_report = param.DataFrame(
+        default=None, doc="Foods removed by presolve, None if it did not run"
+    )
+    cost_lower = param.Array(
+        default=None,
+        doc="Lowest cost per dollar of each food variable that keeps the basis",
+    )
+    cost_upper = param.Array(
+        default=None,
+        doc="Highest cost per dollar of each food variable that keeps the basis",
+    )
+    rhs_lower = param.Array(
+        default=None, doc="Lowest value of each constraint row that keeps the basis"
+    )
+    rhs_upper = param.Array(
+        default=None, doc="Highest value of each constraint row that keeps the basis"
+    )
+    servings = param.Array(
+        default=None,
+        doc="Servings of each food variable, NaN if bought by weight, None for LPs",
+    )
+    mip_gap = param.Number(
+        default=None, doc="Relative gap of a mixed integer solve, if reported"
+    )
+    relaxation_objective = param.Number(
+        default=None, doc="Objective of the LP relaxation of a mixed integer solve"
+    )
+    proven_optimal = param.Boolean(
+        default=True,
+        doc="False if a mixed integer solve stopped before proving its diet optimal",
+    )
+
+
+class SolverBackend(param.Parameterized):
+    """
+    Holds one minimum cost problem inside a solver so it can be patched and
+    solved again. Food variables are addressed by the position they were added
+    in, constraints by their row.
+    """
+
+    solver_name = None
+
+    msg = param.Boolean(default=True, doc="Print solver output")
+    mip_gap = param.Number(
+        default=None,
+        bounds=(0, None),
+        doc="Relative gap a mixed integer solve stops at",
+    )
+
+    def __init__(self, cancel_event: threading.Event = None, **params):
+        super().__init__(**params)
+        # A cancel_event shared with the caller lets it cancel before the
+        # backend exists
+        self._cancel = threading.Event() if cancel_event is None else cancel_event
+
+    def build(
+        self,
+        coefficient_matrix,
+        constraint_rows,
+        variable_names,
+        low_bounds,
+        costs=None,
+    ):
+        """
+        Builds the model. Food variables cost one per unit unless costs are
+        given.
+        """
+        raise NotImplementedError
+
+    def add_variables(self, coefficient_matrix, variable_names, low_bounds):
+        raise NotImplementedError
+
+    def set_coefficients(self, variables, coefficient_matrix):
+        raise NotImplementedError
+
+    def set_bounds(self, variable, low_bound, up_bound=None):
+        raise NotImplementedError
+
+    def set_rhs(self, row, constraint_value):
+        raise NotImplementedError
+
+    def set_portions(self, integer, up_bounds, min_units, max_foods=None):
+        """
+        Makes the model mixed integer: food variables in the integer mask take
+        whole values and every food variable is capped at up_bounds. Foods with
+        a positive min_units, or every food if max_foods is set, get a binary
+        selection variable linked by x <= up_bound * y and x >= min_units * y.
+        """
+        raise NotImplementedError
+
+    def set_start(self, x, slack_up, slack_down):
+        """
+        Sets a feasible solution of the food and slack variables for the next
+        mixed integer solve to start from.
+        """
+        raise NotImplementedError
+
+    def solve(self, time_limit=None, warm_start=False, ranging=False) -> LpSolution:
+        """
+        Solves the model. With ranging, the cost and constraint value ranges of
+        an optimal basis are added to the solution if the solver reports them.
+        """
+        raise NotImplementedError
+
+    def get_model_size(self):
+        """
+        Returns the number of variables, constraints and nonzero constraint
+        coefficients of the model, slack variables included.
+        """
+        raise NotImplementedError
+
+    def cancel(self):
+        """
+        Asks a running solve to stop, and the solves that follow it not to
+        start until the cancel event is cleared. Backends that cannot be
+        interrupted finish the running solve.
+        """
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+
+def get_status_name(result: LpSolution):
+    """
+    Returns the PuLP name of the status of result, or "Feasible" for a mixed
+    integer diet that was not proven optimal.
+    """
+    if result.status == pulp.LpStatusOptimal and not result.proven_optimal:
+        return "Feasible"
+    return pulp.LpStatus.get(result.status, result.status)
+
+
+def get_selected(min_units, max_foods=None):
+    """
+    Returns the food variables that need a selection variable.
+    """
+    if max_foods is not None:
+        return np.arange(len(min_units))
+    return np.flatnonzero(np.asarray(min_units) > 0)
+
+
+def build_lp_problem(
+    coefficient_matrix,
+    constraint_rows: list,
+    variable_names: list,
+    low_bounds: list,
+    costs=None,
+):
+    """
+    Builds the minimum cost LpProblem from a coefficient matrix, emitting one
+    constraint (with an up and a down slack variable) per matrix row.
+    Returns the problem, the food decision variables, the constraints and the
+    (up, down) slack variables of each constraint.
+    """
+    prob = LpProblem("Minimize_Cost", LpMinimize)
+    slack_vars = []
+
+    # Define decision variables for each food item
+    variables = [
+        LpVariable(name, lowBound=low_bound)
+        for name, low_bound in zip(variable_names, low_bounds)
+    ]
+
+    # Add constraints based on nutrient requirements, one matrix row at a time
+    constraints = []
+    for row, (nutrient_nbrs, constraint_type, constraint_value) in zip(
+        coefficient_matrix, constraint_rows
+    ):
+        nbrs_str = ";".join([str(n) for n in nutrient_nbrs])
+        slack_var_up = LpVariable(f"slack@{nbrs_str}@{constraint_type}@up", lowBound=0)
+        slack_var_down = LpVariable(
+            f"slack@{nbrs_str}@{constraint_type}@down", lowBound=0
+        )
+        slack_vars.append((slack_var_up, slack_var_down))
+
+        pulp_sum = pulp.LpAffineExpression(
+            [(variables[col], row[col]) for col in np.flatnonzero(row)]
+            + [(slack_var_up, 1), (slack_var_down, -1)]
+        )
+
+        constraint_name = (
+            f"{'_'.join([str(nbr) for nbr in nutrient_nbrs])}:{constraint_type}"
+        )
+        constraint = pulp.LpConstraint(
+            pulp_sum,
+            sense=CONSTRAINT_SENSES[constraint_type],
+            rhs=constraint_value,
+            name=constraint_name,
+        )
+        prob += constraint
+        constraints.append(constraint)
+
+    # Objective function: minimize the total cost plus heavily penalized slack
+    if costs is None:
+        costs = np.ones(len(variables))
+    prob += pulp.LpAffineExpression(
+        list(zip(variables, np.asarray(costs, dtype=float).tolist()))
+        + [(sv, SLACK_PENALTY) for pair in slack_vars for sv in pair]
+    )
+    return prob, variables, constraints, slack_vars
+
+
+def _get_values(items, attribute):
+    return np.array([getattr(item, attribute) or 0 for item in items], dtype=float)
+
+
+class CbcBackend(SolverBackend):
+    """
+    Builds the problem with PuLP and solves it with the bundled CBC binary,
+    writing the model to disk on every solve.
+    """
+
+    solver_name = "cbc"
+
+    def build(
+        self,
+        coefficient_matrix,
+        constraint_rows,
+        variable_names,
+        low_bounds,
+        costs=None,
+    ):
+        self.prob, self.variables, self.constraints, self.slack_vars = build_lp_problem(
+            coefficient_matrix, constraint_rows, variable_names, low_bounds, costs
+        )
+        self.selection_vars = {}
+
+    def add_variables(self, coefficient_matrix, variable_names, low_bounds):
+        for column, name, low_bound in zip(
+            coefficient_matrix.T, variable_names, low_bounds
+        ):
+            variable = LpVariable(name, lowBound=low_bound)
+            self.prob.objective[variable] = 1
+            for constraint, coefficient in zip(self.constraints, column):
+                if coefficient != 0:
+                    constraint.expr[variable] = coefficient
+            self.variables.append(variable)
+
+    def set_coefficients(self, variables, coefficient_matrix):
+        changed_variables = [self.variables[variable] for variable in variables]
+        for constraint, row in zip(self.constraints, coefficient_matrix):
+            for variable, coefficient in zip(changed_variables, row):
+                if coefficient != 0:
+                    constraint.expr[variable] = coefficient
+                else:
+                    constraint.expr.pop(variable, None)
+
+    def set_bounds(self, variable, low_bound, up_bound=None):
+        self.variables[variable].bounds(low_bound, up_bound)
+
+    def set_rhs(self, row, constraint_value):
+        self.constraints[row].changeRHS(constraint_value)
+
+    def set_portions(self, integer, up_bounds, min_units, max_foods=None):
+        for variable, is_integer, up_bound in zip(
+            self.variables, integer.tolist(), up_bounds.tolist()
+        ):
+            variable.upBound = up_bound
+            if is_integer:
+                variable.cat = pulp.LpInteger
+        for variable in get_selected(min_units, max_foods).tolist():
+            x = self.variables[variable]
+            y = LpVariable(f"select@{variable}", cat=pulp.LpBinary)
+            self.prob += x - up_bounds[variable] * y <= 0, f"select_up@{variable}"
+            if min_units[variable] > 0:
+                self.prob += (
+                    x - min_units[variable] * y >= 0,
+                    f"select_down@{variable}",
+                )
+            self.selection_vars[variable] = y
+        if max_foods is not None:
+            self.prob += (
+                pulp.lpSum(self.selection_vars.values()) <= max_foods,
+                "max_foods",
+            )
+
+    def set_start(self, x, slack_up, slack_down):
+        for variable, value in zip(self.variables, x.tolist()):
+            variable.setInitialValue(value)
+        for (up, down), up_value, down_value in zip(
+            self.slack_vars, slack_up.tolist(), slack_down.tolist()
+        ):
+            up.setInitialValue(up_value)
+            down.setInitialValue(down_value)
+        for variable, y in self.selection_vars.items():
+            y.setInitialValue(int(x[variable] > 0))
+
+    def solve(self, time_limit=None, warm_start=False, ranging=False):
+        # CBC does not report sensitivity ranges, ranging is ignored
+        timings = {}
+        solver = pulp.PULP_CBC_CMD(
+            msg=self.msg,
+            warmStart=warm_start,
+            timeLimit=time_limit,
+            gapRel=self.mip_gap,
+        )
+        # Includes writing the model and reading the solution files back
+        with time_stage(timings, "solver"):
+            status = self.prob.solve(solver)
+        with time_stage(timings, "read_solution"):
+            result = LpSolution(
+                solver=self.solver_name,
+                status=status,
+                objective=pulp.value(self.prob.objective),
+                x=_get_values(self.variables, "varValue"),
+                reduced_costs=_get_values(self.variables, "dj"),
+                slack_up=_get_values([up for up, _ in self.slack_vars], "varValue"),
+                slack_down=_get_values(
+                    [down for _, down in self.slack_vars], "varValue"
+                ),
+                duals=_get_values(self.constraints, "pi"),
+                # CBC stopped at its time limit returns its best diet as optimal
+                proven_optimal=self.prob.sol_status != pulp.LpSolutionIntegerFeasible,
+            )
+        result.timings = timings
+        return result
+
+    def get_model_size(self):
+        constraints = self.prob.constraints.values()
+        return (
+            len(self.prob.variables()),
+            len(constraints),
+            sum(len(constraint) for constraint in constraints),
+        )
+
+
+def _get_row_bounds(constraint_type, constraint_value):
+    if constraint_type == "upper_bound":
+        return -highspy.kHighsInf, constraint_value
+    if constraint_type == "lower_bound":
+        return constraint_value, highspy.kHighsInf
+    return constraint_value, constraint_value
+
+
+class HighsBackend(SolverBackend):
+    """
+    Keeps the problem in an in-process HiGHS model. Patches are applied to the
+    model directly, so the next solve starts from the previous basis, and a
+    running solve can be interrupted from another thread.
+    """
+
+    solver_name = "highs"
+
+    def __init__(self, **params):
+        if highspy is None:
+            raise ImportError("The highs solver backend requires highspy")
+        super().__init__(**params)
+        self.highs = None
+
+    def _interrupt(self, event):
+        # HiGHS keeps the flag between runs, so it is written on every call
+        event.interrupt(self._cancel.is_set())
+
+    def build(
+        self,
+        coefficient_matrix,
+        constraint_rows,
+        variable_names,
+        low_bounds,
+        costs=None,
+    ):
+        n_rows, n_variables = coefficient_matrix.shape
+        # Columns are the food variables followed by the up and the down slack
+        # of every row. Entries are read column by column from the transpose,
+        # without building the slack identities
+        entry_cols, entry_rows = np.nonzero(coefficient_matrix.T)
+        n_cols = n_variables + 2 * n_rows
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = n_cols
+        lp.num_row_ = n_rows
+        if costs is None:
+            costs = np.ones(n_variables)
+        lp.col_cost_ = np.concatenate(
+            [
+                np.asarray(costs, dtype=float),
+                np.full(2 * n_rows, float(SLACK_PENALTY)),
+            ]
+        )
+        lp.col_lower_ = np.concatenate(
+            [np.asarray(low_bounds, dtype=float), np.zeros(2 * n_rows)]
+        )
+        lp.col_upper_ = np.full(n_cols, highspy.kHighsInf)
+        row_bounds = [
+            _get_row_bounds(constraint_type, constraint_value)
+            for _, constraint_type, constraint_value in constraint_rows
+        ]
+        lp.row_lower_ = np.array([lower for lower, _ in row_bounds], dtype=float)
+        lp.row_upper_ = np.array([upper for _, upper in row_bounds], dtype=float)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = np.concatenate(
+            [
+                np.searchsorted(entry_cols, np.arange(n_variables)),
+                len(entry_cols) + np.arange(2 * n_rows + 1),
+            ]
+        ).astype(np.int32)
+        lp.a_matrix_.index_ = np.concatenate(
+            [entry_rows, np.tile(np.arange(n_rows), 2)]
+        ).astype(np.int32)
+        lp.a_matrix_.value_ = np.concatenate(
+            [
+                coefficient_matrix[entry_rows, entry_cols],
+                np.repeat([1.0, -1.0], n_rows),
+            ]
+        )
+
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", self.msg)
+        highs.cbSimplexInterrupt += self._interrupt
+        highs.cbIpmInterrupt += self._interrupt
+        highs.cbMipInterrupt += self._interrupt
+        highs.passModel(lp)
+
+        self.highs = highs
+        self.constraint_types = [row[1] for row in constraint_rows]
+        self.columns = list(range(n_variables))
+        self.slack_columns = n_variables + np.arange(2 * n_rows)
+        self.selected = np.zeros(0, dtype=np.int64)
+        self.selection_columns = np.zeros(0, dtype=np.int64)
+        self.mixed_integer = False
+
+    def add_variables(self, coefficient_matrix, variable_names, low_bounds):
+        for column, low_bound in zip(coefficient_matrix.T, low_bounds):
+            rows = np.flatnonzero(column).astype(np.int32)
+            self.columns.append(self.highs.getNumCol())
+            self.highs.addCol(
+                1.0, low_bound, highspy.kHighsInf, len(rows), rows, column[rows]
+            )
+
+    def set_coefficients(self, variables, coefficient_matrix):
+        for variable, column in zip(variables, coefficient_matrix.T):
+            for row, coefficient in enumerate(column.tolist()):
+                self.highs.changeCoeff(row, self.columns[variable], coefficient)
+
+    def set_bounds(self, variable, low_bound, up_bound=None):
+        if up_bound is None:
+            up_bound = highspy.kHighsInf
+        self.highs.changeColBounds(self.columns[variable], low_bound, up_bound)
+
+    def set_rhs(self, row, constraint_value):
+        self.highs.changeRowBounds(
+            row, *_get_row_bounds(self.constraint_types[row], constraint_value)
+        )
+
+    def set_portions(self, integer, up_bounds, min_units, max_foods=None):
+        highs = self.highs
+        self.mixed_integer = True
+        columns = np.array(self.columns, dtype=np.int32)
+        col_lower = np.array(highs.getLp().col_lower_)[columns]
+        highs.changeColsBounds(len(columns), columns, col_lower, up_bounds)
+        integer_columns = columns[integer]
+        highs.changeColsIntegrality(
+            len(integer_columns),
+            integer_columns,
+            np.full(len(integer_columns), highspy.HighsVarType.kInteger),
+        )
+
+        selected = get_selected(min_units, max_foods)
+        n_selected = len(selected)
+        first_column = highs.getNumCol()
+        self.selected = selected
+        self.selection_columns = first_column + np.arange(n_selected)
+        highs.addCols(
+            n_selected,
+            np.zeros(n_selected),
+            np.zeros(n_selected),
+            np.ones(n_selected),
+            0,
+            np.zeros(n_selected, dtype=np.int32),
+            np.zeros(0, dtype=np.int32),
+            np.zeros(0),
+        )
+        highs.changeColsIntegrality(
+            n_selected,
+            self.selection_columns.astype(np.int32),
+            np.full(n_selected, highspy.HighsVarType.kInteger),
+        )
+
+        # x - up_bound * y <= 0 for every selected food, x - min_units * y >= 0
+        # for those with a minimum portion, then the sum of y <= max_foods
+        with_min = selected[min_units[selected] > 0]
+        link_columns = np.concatenate([selected, with_min])
+        link_values = np.concatenate([up_bounds[selected], min_units[with_min]])
+        link_selection = np.concatenate(
+            [self.selection_columns, self.selection_columns[min_units[selected] > 0]]
+        )
+        n_links = len(link_columns)
+        highs.addRows(
+            n_links,
+            np.concatenate(
+                [np.full(n_selected, -highspy.kHighsInf), np.zeros(len(with_min))]
+            ),
+            np.concatenate(
+                [np.zeros(n_selected), np.full(len(with_min), highspy.kHighsInf)]
+            ),
+            2 * n_links,
+            (2 * np.arange(n_links)).astype(np.int32),
+            np.column_stack([columns[link_columns], link_selection])
+            .ravel()
+            .astype(np.int32),
+            np.column_stack([np.ones(n_links), -link_values]).ravel(),
+        )
+        if max_foods is not None:
+            highs.addRow(
+                -highspy.kHighsInf,
+                max_foods,
+                n_selected,
+                self.selection_columns.astype(np.int32),
+                np.ones(n_selected),
+            )
+
+    def set_start(self, x, slack_up, slack_down):
+        col_value = np.zeros(self.highs.getNumCol())
+        col_value[self.columns] = x
+        col_value[self.slack_columns] = np.concatenate([slack_up, slack_down])
+        col_value[self.selection_columns] = x[self.selected] > 0
+        solution = highspy.HighsSolution()
+        solution.col_value = col_value
+        solution.value_valid = True
+        self.highs.setSolution(solution)
+
+    def get_status(self):
+        model_status = self.highs.getModelStatus()
+        if model_status == highspy.HighsModelStatus.kOptimal:
+            return pulp.LpStatusOptimal
+        # Like CBC, a mixed integer solve stopped early returns its best diet,
+        # solve marks it as not proven optimal
+        if self.mixed_integer and (
+            self.highs.getInfo().primal_solution_status
+            == highspy.SolutionStatus.kSolutionStatusFeasible
+        ):
+            return pulp.LpStatusOptimal
+        if model_status == highspy.HighsModelStatus.kInfeasible:
+            return pulp.LpStatusInfeasible
+        if model_status == highspy.HighsModelStatus.kUnbounded:
+            return pulp.LpStatusUnbounded
+        return pulp.LpStatusNotSolved
+
+    def solve(self, time_limit=None, warm_start=False, ranging=False):
+        """
+        The model keeps its basis between solves, so warm_start has no effect.
+        """
+        self.highs.setOptionValue(
+            "time_limit", highspy.kHighsInf if time_limit is None else time_limit
+        )
+        if self.mip_gap is not None:
+            self.highs.setOptionValue("mip_rel_gap", self.mip_gap)
+        timings = {}
+        with time_stage(timings, "solver"):
+            self.highs.run()
+
+        with time_stage(timings, "read_solution"):
+            solution = self.highs.getSolution()
+            info = self.highs.getInfo()
+            col_value = np.array(solution.col_value)
+            col_dual = np.array(solution.col_dual)
+            n_rows = len(self.constraint_types)
+            slack = col_value[self.slack_columns]
+            result = LpSolution(
+                solver=self.solver_name,
+                status=self.get_status(),
+                objective=info.objective_function_value,
+                x=col_value[self.columns],
+                reduced_costs=col_dual[self.columns],
+                slack_up=slack[:n_rows],
+                slack_down=slack[n_rows:],
+                duals=np.array(solution.row_dual)[:n_rows],
+                iterations=info.simplex_iteration_count,
+            )
+            if self.mixed_integer:
+                result.mip_gap = info.mip_gap
+                result.proven_optimal = (
+                    self.highs.getModelStatus() == highspy.HighsModelStatus.kOptimal
+                )
+            if ranging and result.status == pulp.LpStatusOptimal:
+                self.add_ranging(result, np.array(solution.row_value))
+        result.timings = timings
+        return result
+
+    def add_ranging(self, result, row_value):
+        """
+        Adds the ranges of the final basis to result. HiGHS ranges the rows
+        that bind; a row that does not bind keeps its zero dual from its
+        activity out to infinity.
+        """
+        status, ranging = self.highs.getRanging()
+        if status != highspy.HighsStatus.kOk or not ranging.valid:
+            return
+
+        def get_values(bound_ranging):
+            values = np.array(bound_ranging.value_, dtype=float)
+            infinite = np.abs(values) >= highspy.kHighsInf
+            values[infinite] = np.copysign(np.inf, values[infinite])
+            return values
+
+        result.cost_lower = get_values(ranging.col_cost_dn)[self.columns]
+        result.cost_upper = get_values(ranging.col_cost_up)[self.columns]
+        rhs_lower = get_values(ranging.row_bound_dn)
+        rhs_upper = get_values(ranging.row_bound_up)
+        basic = np.array(
+            [
+                row_status == highspy.HighsBasisStatus.kBasic
+                for row_status in self.highs.getBasis().row_status
+            ]
+        )
+        constraint_types = np.array(self.constraint_types)
+        for constraint_type, lower, upper in [
+            ("lower_bound", -np.inf, row_value),
+            ("upper_bound", row_value, np.inf),
+        ]:
+            rows = basic & (constraint_types == constraint_type)
+            rhs_lower[rows] = np.broadcast_to(lower, row_value.shape)[rows]
+            rhs_upper[rows] = np.broadcast_to(upper, row_value.shape)[rows]
+        result.rhs_lower = rhs_lower
+        result.rhs_upper = rhs_upper
+
+    def get_model_size(self):
+        return self.highs.getNumCol(), self.highs.getNumRow(), self.highs.getNumNz()
+
+
+SOLVER_BACKENDS = {
+    CbcBackend.solver_name: CbcBackend,
+    HighsBackend.solver_name: HighsBackend,
+}
+
+# HiGHS runs in process and supports warm starts and cancellation, CBC is the
+# fallback when highspy is not installed
+DEFAULT_SOLVER = (
+    HighsBackend.solver_name if highspy is not None else CbcBackend.solver_name
+)
+
+
+def get_solver_backend(name: str = None, **params) -> SolverBackend:
+    if name is None or (name == HighsBackend.solver_name and highspy is None):
+        name = DEFAULT_SOLVER
+    return SOLVER_BACKENDS[name](**params)
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import param
+from pyfoodopt import (
+    BasePantry,
+    Constraints,
+    get_coefficient_matrix,
+    get_constraint_index,
+)
+from records import NutrientConstraintRecord
+from solvers import DEFAULT_SOLVER, SOLVER_BACKENDS, get_solver_backend
+from workers import (
+    get_chunks,
+    get_diet_row,
+    get_max_workers,
+    get_worker_pantry,
+    map_in_workers,
+    worker_problem,
+)
+
+SWEEP_RESULT_COLUMNS = [
+    "value",
+    "status",
+    "solved",
+    "cost",
+    "n_foods",
+    "foods",
+    "binding_constraints",
+]
+
+# Relative distance from its bound within which a constraint counts as binding
+BINDING_TOLERANCE = 1e-7
+
+
+def get_binding_constraints(coefficient_matrix, constraint_rows, result):
+    """
+    Returns the names of the constraint rows whose left-hand side, slack
+    included, sits at the constraint value.
+    """
+    activity = coefficient_matrix @ result.x + result.slack_up - result.slack_down
+    values = np.array([value for _, _, value in constraint_rows], dtype=float)
+    binding = np.abs(activity - values) <= BINDING_TOLERANCE * np.maximum(
+        1, np.abs(values)
+    )
+    names = get_constraint_index(constraint_rows).constraint_name.to_numpy()
+    return names[binding].tolist()
+
+
+def _solve_chunk(task):
+    """
+    Solves one chunk of a sweep in order, patching a single model between
+    values so every solve after the first starts from the previous solution.
+    """
+    kind, position, values = task
+    fdc_ids = worker_problem["fdc_ids"]
+    prices = worker_problem["prices"].copy()
+    constraint_rows = list(worker_problem["constraint_rows"])
+    nutrient_groups = [nutrient_nbrs for nutrient_nbrs, _, _ in constraint_rows]
+
+    def get_coefficients(cols):
+        return get_coefficient_matrix(
+            worker_problem["nutrient_matrix"][:, cols],
+            worker_problem["nutrient_nbr_to_row"],
+            prices[cols],
+            nutrient_groups,
+        )
+
+    backend = get_solver_backend(worker_problem["solver"], msg=False)
+    rows = []
+    for i, value in enumerate(values):
+        if kind == "price":
+            prices[position] = value
+        else:
+            nutrient_nbrs, constraint_type, _ = constraint_rows[position]
+            constraint_rows[position] = (nutrient_nbrs, constraint_type, value)
+
+        if i == 0:
+            coefficient_matrix = get_coefficients(slice(None))
+            backend.build(
+                coefficient_matrix,
+                constraint_rows,
+                [str(fdc_id) for fdc_id in fdc_ids],
+                [0] * len(fdc_ids),
+            )
+        elif kind == "price":
+            column = get_coefficients([position])
+            coefficient_matrix[:, position] = column[:, 0]
+            backend.set_coefficients([position], column)
+        else:
+            backend.set_rhs(position, value)
+        result = backend.solve(warm_start=i > 0)
+        rows.append(
+            {
+                "value": value,
+                **get_diet_row(result, fdc_ids, prices),
+                "binding_constraints": get_binding_constraints(
+                    coefficient_matrix, constraint_rows, result
+                ),
+            }
+        )
+    return rows
+
+
+class ParameterSweep(param.Parameterized):
+    """
+    Solves the minimum cost diet over a grid of values of one parameter: the
+    price of a food or the value of a nutrient constraint. The grid is split
+    into contiguous chunks solved in parallel; within a chunk one model is
+    patched from value to value and warm started.
+    """
+
+    pantry = param.ClassSelector(class_=BasePantry, doc="Pantry")
+    constraints = param.ClassSelector(class_=Constraints, doc="Constraints")
+    max_workers = param.Integer(
+        default=None, bounds=(1, None), doc="Number of worker processes"
+    )
+    n_chunks = param.Integer(
+        default=None,
+        bounds=(1, None),
+        doc="Chunks the grid is split into, defaults to one per worker",
+    )
+    solver = param.Selector(
+        default=DEFAULT_SOLVER, objects=list(SOLVER_BACKENDS), doc="Solver backend"
+    )
+
+    def sweep_price(self, fdc_id: int, values):
+        """
+        Returns one row per value of the price per 100 g of the active food
+        fdc_id.
+        """
+        cols = self.pantry.get_active_cols()
+        positions = np.flatnonzero(self.pantry.fdc_ids[cols] == fdc_id)
+        if len(positions) == 0:
+            raise ValueError(f"FDC ID {fdc_id} is not an active food")
+        values = np.asarray(values, dtype=float)
+        if (values <= 0).any():
+            raise ValueError("Swept prices must be positive")
+        return self.sweep("price", positions[0].item(), values)
+
+    def sweep_constraint(self, nutrient_constraint: NutrientConstraintRecord, values):
+        """
+        Returns one row per value of the constraint with the nutrients and type
+        of nutrient_constraint. The constraint objects are left unchanged.
+        """
+        key = (nutrient_constraint.get_id(), nutrient_constraint.constraint_type)
+        rows = [row[:2] for row in self.constraints.get_constraint_rows()]
+        if key not in rows:
+            raise ValueError(f"No {key[1]} constraint on nutrients {key[0]}")
+        return self.sweep("constraint", rows.index(key), np.asarray(values))
+
+    def sweep(self, kind: str, position: int, values):
+        max_workers = get_max_workers(self.max_workers)
+        problem = {
+            **get_worker_pantry(self.pantry, self.pantry.get_active_cols()),
+            "constraint_rows": self.constraints.get_constraint_rows(),
+            "solver": self.solver,
+        }
+        tasks = [
+            (kind, position, chunk)
+            for chunk in get_chunks(values, self.n_chunks or max_workers)
+        ]
+        chunks = map_in_workers(_solve_chunk, tasks, problem, max_workers)
+        rows = [row for chunk in chunks for row in chunk]
+        return pd.DataFrame(rows, columns=SWEEP_RESULT_COLUMNS)
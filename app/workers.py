@@ -0,0 +1,83 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pulp
+
+# Compiled pantry and problem of a pool, set once in each worker process and
+# read by the task functions run in it
+worker_problem = {}
+
+
+def _init_worker(problem: dict):
+    worker_problem.clear()
+    worker_problem.update(problem)
+
+
+def get_worker_pantry(pantry, cols):
+    """
+    Returns the arrays of the pantry columns cols that the solves in worker
+    processes build their coefficient matrices from.
+    """
+    return {
+        "nutrient_matrix": pantry.nutrient_matrix[:, cols],
+        "nutrient_nbr_to_row": pantry.nutrient_nbr_to_row,
+        "fdc_ids": pantry.fdc_ids[cols],
+        "prices": pantry.prices[cols],
+    }
+
+
+def get_max_workers(max_workers=None):
+    return max_workers or os.cpu_count() or 1
+
+
+def get_chunks(values, n_chunks: int):
+    """
+    Splits values into at most n_chunks contiguous lists, in order and none
+    empty, so a worker can patch one model from value to value.
+    """
+    n_chunks = max(min(n_chunks, len(values)), 1)
+    return [chunk.tolist() for chunk in np.array_split(values, n_chunks) if len(chunk)]
+
+
+def map_in_workers(function, tasks: list, problem: dict, max_workers=None):
+    """
+    Returns the results of function over tasks, in order, computed in a pool of
+    worker processes that each receive problem once instead of with every
+    task.
+    """
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(problem,)
+    ) as executor:
+        return list(executor.map(function, tasks))
+
+
+def is_solved(result):
+    """
+    Returns whether result is an optimal diet that meets every constraint
+    without slack.
+    """
+    return (
+        result.status == pulp.LpStatusOptimal
+        and result.slack_up.sum() + result.slack_down.sum() <= 0
+    )
+
+
+def get_diet_row(result, fdc_ids, prices):
+    """
+    Returns the status, whether it was solved, cost, number of foods and the
+    grams of each food, by fdc_id, of the diet of result.
+    """
+    costs = result.x
+    chosen = np.flatnonzero(costs)
+    return {
+        "status": pulp.LpStatus[result.status],
+        "solved": is_solved(result),
+        "cost": costs.sum(),
+        "n_foods": len(chosen),
+        "foods": dict(
+            zip(
+                fdc_ids[chosen].tolist(),
+                (costs[chosen] / prices[chosen] * 100).tolist(),
+            )
+        ),
+    }
@@ -0,0 +1,247 @@
+"""
+Times the stages of loading a pantry and optimizing a diet on synthetic
+pantries of increasing size and writes the timings as JSON.
+
+    python benchmarks/bench_optimizer.py --sizes 100 1000 10000 50000
+    python benchmarks/compare.py baseline.json benchmark-<commit>.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# synthetic puts app/ on sys.path
+from synthetic import (
+    generate_constraints,
+    generate_foods,
+    write_pantry_csv,
+    write_pantry_json,
+)
+from pyfoodopt import FoodOptimizer, Pantry
+from solvers import DEFAULT_SOLVER, SOLVER_BACKENDS
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+BENCHMARK_VERSION = 1
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_stage(timings: dict, stage: str, func, *args):
+    """
+    Calls func and appends its wall and CPU time to timings[stage].
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    value = func(*args)
+    timings.setdefault(stage, {"wall_s": [], "cpu_s": []})
+    timings[stage]["wall_s"].append(time.perf_counter() - wall_start)
+    timings[stage]["cpu_s"].append(time.process_time() - cpu_start)
+    return value
+
+
+def trace_stage(peaks: dict, stage: str, func, *args):
+    """
+    Calls func and records the peak of memory allocated while it ran, as seen
+    by tracemalloc. Memory allocated inside the solver libraries is not seen.
+    """
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    value = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    peaks[stage] = peak - start
+    return value
+
+
+def run_stages(measure, json_path, csv_path, constraints, solver, presolve, portions):
+    """
+    Runs every benchmarked stage once, calling measure(stage, func, *args) for
+    each of them.
+    """
+    measure("load_csv", Pantry().build_pantry_from_csv, csv_path)
+    pantry = Pantry()
+    measure("load_json", pantry.build_pantry_from_json, json_path)
+
+    fo = FoodOptimizer(
+        pantry=pantry,
+        constraints=constraints,
+        solver=solver,
+        msg=False,
+        presolve=presolve,
+        **portions,
+    )
+    warm_start = measure("build", fo.prepare_problem)
+    status = measure("solve", fo.solve_problem, warm_start)
+    measure("get_optimal_foods", fo.get_optimal_foods)
+    measure("get_slack_variables", fo.get_slack_variables)
+    measure("get_shadow_prices", fo.get_shadow_prices)
+
+    result = fo.results[-1]
+    return {
+        "status": status,
+        "objective": result.objective,
+        "n_variables": len(result.x),
+        "n_constraints": len(result.duals),
+        "n_chosen_foods": int(np.count_nonzero(result.x)),
+        "mip_gap": result.mip_gap,
+        "pantry_bytes": int(pantry.memory_usage(deep=True).sum()),
+    }
+
+
+def benchmark_size(
+    n_foods: int,
+    solver: str,
+    presolve: bool,
+    portions: dict,
+    repeat: int,
+    memory: bool,
+    seed: int,
+):
+    foods = generate_foods(n_foods, seed=seed)
+    constraints = generate_constraints(foods, seed=seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, "pantry.json")
+        csv_path = os.path.join(tmp_dir, "pantry.csv")
+        write_pantry_json(foods, json_path)
+        write_pantry_csv(foods, csv_path)
+        del foods
+
+        timings = {}
+        for _ in range(repeat):
+            problem = run_stages(
+                lambda stage, func, *args: time_stage(timings, stage, func, *args),
+                json_path,
+                csv_path,
+                constraints,
+                solver,
+                presolve,
+                portions,
+            )
+
+        # A separate pass, tracing slows down every allocation
+        peaks = {}
+        if memory:
+            tracemalloc.start()
+            run_stages(
+                lambda stage, func, *args: trace_stage(peaks, stage, func, *args),
+                json_path,
+                csv_path,
+                constraints,
+                solver,
+                presolve,
+                portions,
+            )
+            tracemalloc.stop()
+
+    stages = {
+        stage: {
+            "wall_s": min(times["wall_s"]),
+            "wall_s_median": float(np.median(times["wall_s"])),
+            "cpu_s": min(times["cpu_s"]),
+            "peak_bytes": peaks.get(stage),
+        }
+        for stage, times in timings.items()
+    }
+    return {
+        "n_foods": n_foods,
+        **problem,
+        "stages": stages,
+        # ru_maxrss is in kilobytes on Linux and only ever grows
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--solver", choices=list(SOLVER_BACKENDS), default=None)
+    parser.add_argument(
+        "--presolve", action="store_true", help="Presolve foods before the build"
+    )
+    parser.add_argument(
+        "--portions", action="store_true", help="Buy foods in whole servings (MIP)"
+    )
+    parser.add_argument("--max-foods", type=int, default=None)
+    parser.add_argument("--min-portion-g", type=float, default=0.0)
+    parser.add_argument(
+        "--time-limit", type=float, default=None, help="Seconds per solve"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracemalloc pass"
+    )
+    parser.add_argument(
+        "--output", default=None, help="Defaults to benchmark-<commit>.json"
+    )
+    args = parser.parse_args(argv)
+
+    solver = args.solver or DEFAULT_SOLVER
+    portions = {
+        "portions": args.portions,
+        "max_foods": args.max_foods,
+        "min_portion_g": args.min_portion_g,
+        "time_limit": args.time_limit,
+    }
+    commit = get_commit()
+    report = {
+        "version": BENCHMARK_VERSION,
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "solver": solver,
+        "presolve": args.presolve,
+        **portions,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": [],
+    }
+    for n_foods in args.sizes:
+        result = benchmark_size(
+            n_foods,
+            solver,
+            args.presolve,
+            portions,
+            args.repeat,
+            not args.no_memory,
+            args.seed,
+        )
+        report["results"].append(result)
+        print(
+            f"{n_foods:>6} foods: "
+            + ", ".join(
+                f"{stage} {timing['wall_s']:.4f}s"
+                for stage, timing in result["stages"].items()
+            ),
+            file=sys.stderr,
+        )
+
+    output = args.output or f"benchmark-{commit or 'unknown'}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Compares the construction time and memory of the slotted records the pantry,
+nutrient bank and constraints store with their Parameterized UI adapters.
+
+    python benchmarks/bench_records.py --n 10000
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+# synthetic puts app/ on sys.path
+from synthetic import generate_foods
+from pyfoodopt import (
+    BaseFood,
+    BaseNutrient,
+    BasePrice,
+    FoodMeta,
+    FoodRestrictions,
+    NutrientConstraint,
+)
+from records import (
+    FoodRecord,
+    NutrientConstraintRecord,
+    NutrientRecord,
+    PriceRecord,
+)
+
+
+def get_factories(foods: list):
+    """
+    Returns {kind: (record factory, adapter factory)}, each called with the
+    index of the object to build.
+    """
+    return {
+        "price": (
+            lambda i: PriceRecord(foods[i]["price_per_100_g"]),
+            lambda i: BasePrice(price_per_100_g=foods[i]["price_per_100_g"]),
+        ),
+        "food": (
+            lambda i: FoodRecord(
+                fdc_id=i,
+                food_name=foods[i]["food_name"],
+                price=PriceRecord(foods[i]["price_per_100_g"]),
+                food_nutrition=foods[i]["food_nutrition"],
+                serving_size_g=foods[i].get("serving_size_g"),
+            ),
+            lambda i: BaseFood(
+                fdc_id=i,
+                food_name=foods[i]["food_name"],
+                price=BasePrice(price_per_100_g=foods[i]["price_per_100_g"]),
+                food_nutrition=foods[i]["food_nutrition"],
+                serving_size_g=foods[i].get("serving_size_g"),
+                food_meta=FoodMeta(
+                    restrictions=FoodRestrictions(**foods[i]["restrictions"])
+                ),
+            ),
+        ),
+        "nutrient": (
+            lambda i: NutrientRecord(
+                nutrient_id=i, nutrient_name=f"Nutrient {i}", unit_name="mg"
+            ),
+            lambda i: BaseNutrient(
+                nutrient_id=i, nutrient_name=f"Nutrient {i}", unit_name="mg"
+            ),
+        ),
+        "nutrient_constraint": (
+            lambda i: NutrientConstraintRecord(
+                constraint_type="lower_bound",
+                constraint_value=float(i),
+                nbr_to_coefficient={i: 1},
+            ),
+            lambda i: NutrientConstraint(
+                constraint_type="lower_bound",
+                constraint_value=float(i),
+                nbr_to_coefficient={i: 1},
+            ),
+        ),
+    }
+
+
+def measure(factory, n: int, repeat: int):
+    """
+    Returns the best wall time of building n objects and the memory they hold,
+    as seen by tracemalloc.
+    """
+    wall_s = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        objects = [factory(i) for i in range(n)]
+        wall_s.append(time.perf_counter() - start)
+        del objects
+    tracemalloc.start()
+    objects = [factory(i) for i in range(n)]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return min(wall_s), held
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=10000, help="Objects of each kind")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write JSON here")
+    args = parser.parse_args(argv)
+
+    foods = list(generate_foods(args.n, seed=args.seed).values())
+    results = []
+    for kind, (record, adapter) in get_factories(foods).items():
+        record_s, record_bytes = measure(record, args.n, args.repeat)
+        adapter_s, adapter_bytes = measure(adapter, args.n, args.repeat)
+        results.append(
+            {
+                "kind": kind,
+                "n": args.n,
+                "record_s": record_s,
+                "adapter_s": adapter_s,
+                "record_bytes": record_bytes,
+                "adapter_bytes": adapter_bytes,
+            }
+        )
+
+    print(
+        f"{'kind':<20} {'record s':>9} {'param s':>9} {'speedup':>8} "
+        f"{'record B/obj':>13} {'param B/obj':>12}"
+    )
+    for result in results:
+        print(
+            f"{result['kind']:<20} {result['record_s']:>9.4f} "
+            f"{result['adapter_s']:>9.4f} "
+            f"{result['adapter_s'] / result['record_s']:>7.1f}x "
+            f"{result['record_bytes'] / args.n:>13.0f} "
+            f"{result['adapter_bytes'] / args.n:>12.0f}"
+        )
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(args.output, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
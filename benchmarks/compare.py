@@ -0,0 +1,67 @@
+"""
+Compares the stage timings of two bench_optimizer.py reports.
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 1.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_report(report_path: str):
+    with open(report_path, "r") as f:
+        return json.load(f)
+
+
+def get_stages(report: dict):
+    return {
+        (result["n_foods"], stage): timing
+        for result in report["results"]
+        for stage, timing in result["stages"].items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="Ratio of candidate to baseline wall time reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    baseline_report = load_report(args.baseline)
+    candidate_report = load_report(args.candidate)
+    print(
+        f"baseline {baseline_report['commit']}, candidate {candidate_report['commit']}"
+    )
+    if baseline_report["solver"] != candidate_report["solver"]:
+        print(
+            f"warning: solved with {baseline_report['solver']} and "
+            f"{candidate_report['solver']}",
+            file=sys.stderr,
+        )
+    baseline = get_stages(baseline_report)
+    candidate = get_stages(candidate_report)
+    regressions = 0
+    print(f"{'foods':>6}  {'stage':<22}{'baseline':>10}{'candidate':>11}{'ratio':>8}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        n_foods, stage = key
+        before, after = baseline[key]["wall_s"], candidate[key]["wall_s"]
+        ratio = after / before if before > 0 else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  regression"
+            regressions += 1
+        print(
+            f"{n_foods:>6}  {stage:<22}{before:>10.4f}{after:>11.4f}{ratio:>8.2f}{flag}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+)
+
+from pyfoodopt import (
+    FOOD_RESTRICTION_NAMES,
+    Constraints,
+)
+from records import NutrientConstraintRecord
+
+# FoodData Central reports about 150 nutrients, most foods list a third of them
+N_NUTRIENTS = 150
+FIRST_NUTRIENT_NBR = 200
+N_CONSTRAINED_NUTRIENTS = 40
+N_COMBINED_CONSTRAINTS = 2
+
+# Share of foods sold in servings or packages, and their sizes in grams
+SERVING_SHARE = 0.6
+SERVING_SIZES_G = [30, 50, 100, 150, 250, 500]
+
+FOOD_NAME_WORDS = [
+    "apple", "bean", "beef", "bread", "broccoli", "butter", "carrot", "cheese",
+    "chicken", "corn", "egg", "fish", "lentil", "milk", "nut", "oat", "onion",
+    "pasta", "pea", "pork", "potato", "rice", "salmon", "soy", "spinach",
+    "tofu", "tomato", "turkey", "wheat", "yogurt",
+]  # fmt: skip
+FOOD_NAME_QUALIFIERS = [
+    "raw", "cooked", "boiled", "canned", "frozen", "dried", "roasted", "whole",
+    "low fat", "with salt", "without salt", "enriched",
+]  # fmt: skip
+
+
+def get_nutrient_nbrs():
+    return np.arange(FIRST_NUTRIENT_NBR, FIRST_NUTRIENT_NBR + N_NUTRIENTS)
+
+
+def generate_foods(n_foods: int, seed: int = 0):
+    """
+    Returns a dict of synthetic foods in the layout of the pantry JSON file.
+    Each nutrient is reported by a share of foods drawn from a Beta(0.6, 1)
+    distribution, so a few nutrients appear in most foods and many in few,
+    giving about 35% density overall. Amounts are log-normal. A share of the
+    foods has a serving size.
+    """
+    rng = np.random.default_rng(seed)
+    nutrient_nbrs = get_nutrient_nbrs()
+    prevalence = rng.beta(0.6, 1.0, size=N_NUTRIENTS)
+    reported = rng.random((n_foods, N_NUTRIENTS)) < prevalence
+    amounts = np.round(rng.lognormal(0.0, 1.5, size=(n_foods, N_NUTRIENTS)), 3)
+    prices = np.round(rng.uniform(0.1, 3.0, size=n_foods), 3)
+    restrictions = rng.random((n_foods, len(FOOD_RESTRICTION_NAMES))) < 0.7
+    words = rng.choice(FOOD_NAME_WORDS, size=(n_foods, 2))
+    qualifiers = rng.choice(FOOD_NAME_QUALIFIERS, size=n_foods)
+    has_serving = rng.random(n_foods) < SERVING_SHARE
+    serving_sizes = rng.choice(SERVING_SIZES_G, size=n_foods)
+
+    foods = {}
+    for col in range(n_foods):
+        nutrient_rows = np.flatnonzero(reported[col])
+        foods[str(100000 + col)] = {
+            "food_name": f"{words[col, 0]} and {words[col, 1]}, {qualifiers[col]}",
+            "price_per_100_g": prices[col].item(),
+            "food_nutrition": dict(
+                zip(
+                    nutrient_nbrs[nutrient_rows].astype(str).tolist(),
+                    amounts[col, nutrient_rows].tolist(),
+                )
+            ),
+            "restrictions": dict(
+                zip(FOOD_RESTRICTION_NAMES, restrictions[col].tolist())
+            ),
+        }
+        if has_serving[col]:
+            foods[str(100000 + col)]["serving_size_g"] = float(serving_sizes[col])
+    return foods
+
+
+def write_pantry_json(foods: dict, json_path: str):
+    with open(json_path, "w") as f:
+        json.dump(foods, f)
+
+
+def write_pantry_csv(foods: dict, csv_path: str):
+    nutrient_columns = get_nutrient_nbrs().astype(str).tolist()
+    df = pd.DataFrame(
+        {
+            "fdc_id": [int(fdc_id) for fdc_id in foods],
+            "food_name": [food["food_name"] for food in foods.values()],
+            "price_per_100_g": [food["price_per_100_g"] for food in foods.values()],
+            "serving_size_g": [food.get("serving_size_g") for food in foods.values()],
+        }
+    )
+    nutrition = pd.DataFrame(
+        [food["food_nutrition"] for food in foods.values()], columns=nutrient_columns
+    )
+    pd.concat([df, nutrition], axis=1).to_csv(csv_path)
+
+
+def generate_constraints(foods: dict, seed: int = 0):
+    """
+    Returns Constraints with lower bounds on the most reported nutrients, upper
+    bounds on some of them and a few combined constraints. Bounds are scaled
+    from the median amount per 100 g so the problem is feasible.
+    """
+    rng = np.random.default_rng(seed)
+    nutrient_nbrs = get_nutrient_nbrs()
+    amounts = pd.DataFrame(
+        [food["food_nutrition"] for food in foods.values()],
+        columns=nutrient_nbrs.astype(str),
+    )
+    order = np.argsort(-amounts.notna().sum().to_numpy(), kind="stable")
+    medians = amounts.median().fillna(0).to_numpy()
+
+    constraints = Constraints()
+    constrained = order[:N_CONSTRAINED_NUTRIENTS]
+    for row in constrained.tolist():
+        nbr = nutrient_nbrs[row].item()
+        lower_bound = medians[row] * rng.uniform(5, 15)
+        constraints.add_nutrient_constraint(
+            NutrientConstraintRecord(
+                constraint_name=f"Nutrient {nbr}",
+                constraint_type="lower_bound",
+                constraint_value=lower_bound,
+                nbr_to_coefficient={nbr: 1},
+            )
+        )
+        if rng.random() < 0.3:
+            constraints.add_nutrient_constraint(
+                NutrientConstraintRecord(
+                    constraint_name=f"Nutrient {nbr}",
+                    constraint_type="upper_bound",
+                    constraint_value=lower_bound * rng.uniform(3, 8),
+                    nbr_to_coefficient={nbr: 1},
+                )
+            )
+    for rows in np.array_split(
+        order[N_CONSTRAINED_NUTRIENTS : N_CONSTRAINED_NUTRIENTS + 6],
+        N_COMBINED_CONSTRAINTS,
+    ):
+        nbrs = nutrient_nbrs[rows].tolist()
+        constraints.add_nutrient_constraint(
+            NutrientConstraintRecord(
+                constraint_name=" + ".join(f"Nutrient {nbr}" for nbr in nbrs),
+                constraint_type="lower_bound",
+                constraint_value=medians[rows].sum() * rng.uniform(5, 15),
+                nbr_to_coefficient={nbr: 1 for nbr in nbrs},
+            )
+        )
+    return constraints
@@ -0,0 +1,31 @@
+import os
+import sys
+
+# The app modules import each other by module name, and the synthetic pantries
+# come from the benchmarks
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "app"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pytest
+from pyfoodopt import Pantry
+from synthetic import generate_constraints, generate_foods, write_pantry_json
+
+
+@pytest.fixture(scope="session")
+def foods():
+    return generate_foods(120, seed=3)
+
+
+@pytest.fixture(scope="session")
+def constraints(foods):
+    return generate_constraints(foods, seed=3)
+
+
+@pytest.fixture
+def pantry(foods, tmp_path):
+    json_path = str(tmp_path / "food_data.json")
+    write_pantry_json(foods, json_path)
+    pantry = Pantry()
+    pantry.build_pantry_from_json(json_path)
+    return pantry
@@ -0,0 +1,41 @@
+import pytest
+from batch import BatchFoodOptimizer
+from pyfoodopt import FoodOptimizer
+from test_optimizer import scale_constraints
+
+
+def test_batch_matches_single_solves(pantry, constraints):
+    fdc_id = pantry.get_all_fdc_ids()[0]
+    scenarios = [
+        (constraints, None),
+        (scale_constraints(constraints, 1.5), None),
+        (constraints, {fdc_id: 0.01, -1: 1.0}),
+    ]
+    batch = BatchFoodOptimizer(pantry=pantry, max_workers=2).optimize(
+        scenarios, scenario_names=["base", "more", "cheap"]
+    )
+    assert batch.scenario.tolist() == ["base", "more", "cheap"]
+    assert batch.solved.all()
+
+    for (scenario_constraints, prices), (_, row) in zip(scenarios, batch.iterrows()):
+        if prices:
+            pantry.set_prices({fdc_id: prices[fdc_id]})
+        food_optimizer = FoodOptimizer(
+            pantry=pantry, constraints=scenario_constraints, msg=False
+        )
+        food_optimizer.optimize()
+        foods = food_optimizer.get_optimal_foods()
+        assert row.cost == pytest.approx(food_optimizer.results[-1].objective)
+        assert row.n_foods == len(foods)
+        assert row.foods == pytest.approx(dict(zip(foods.fdc_id, foods.amount)))
+    # The cheap food is bought once its price is overridden
+    assert fdc_id in batch.foods[2]
+
+
+def test_batch_leaves_pantry_prices(pantry, constraints):
+    prices = pantry.prices.copy()
+    fdc_id = pantry.get_all_fdc_ids()[0]
+    BatchFoodOptimizer(pantry=pantry, max_workers=1).optimize(
+        [(constraints, {fdc_id: 0.01})]
+    )
+    assert (pantry.prices == prices).all()
@@ -0,0 +1,120 @@
+from dataclasses import replace
+import pulp
+import pytest
+from pyfoodopt import Constraints, FoodOptimizer
+from solvers import SOLVER_BACKENDS
+
+# Foods active in the first solve of an incremental optimizer
+N_ACTIVE_FOODS = 100
+
+
+def scale_constraints(constraints, factor):
+    """
+    Returns a copy of constraints with every constraint value scaled by
+    factor.
+    """
+    scaled = Constraints()
+    for nutrient_constraints in constraints.nutrient_constraints.values():
+        for nutrient_constraint in nutrient_constraints.values():
+            scaled.add_nutrient_constraint(
+                replace(
+                    nutrient_constraint,
+                    constraint_value=nutrient_constraint.constraint_value * factor,
+                )
+            )
+    return scaled
+
+
+def edit_prices(pantry):
+    fdc_ids = pantry.get_all_fdc_ids()[:10]
+    pantry.set_prices(
+        {fdc_id: pantry.prices[pantry.fdc_id_to_col[fdc_id]] / 3 for fdc_id in fdc_ids}
+    )
+
+
+def deactivate_foods(pantry):
+    pantry.deactivate_foods(pantry.get_all_fdc_ids()[10:30])
+
+
+def activate_foods(pantry):
+    # Foods inactive when the model was built are added to it as new columns
+    pantry.activate_foods(pantry.get_all_fdc_ids()[N_ACTIVE_FOODS:])
+
+
+@pytest.mark.parametrize("solver", list(SOLVER_BACKENDS))
+@pytest.mark.parametrize("edit", [edit_prices, deactivate_foods, activate_foods])
+def test_incremental_resolve_matches_rebuild(pantry, constraints, solver, edit):
+    food_optimizer = FoodOptimizer(
+        pantry=pantry,
+        constraints=constraints,
+        incremental=True,
+        solver=solver,
+        msg=False,
+    )
+    pantry.set_active_foods(pantry.get_all_fdc_ids()[:N_ACTIVE_FOODS])
+    food_optimizer.optimize()
+    backend = food_optimizer.backend
+
+    edit(pantry)
+    food_optimizer.constraints = scale_constraints(constraints, 1.1)
+    food_optimizer.optimize()
+    # The previous model was patched, not rebuilt
+    assert food_optimizer.backend is backend
+
+    reference = FoodOptimizer(
+        pantry=pantry,
+        constraints=food_optimizer.constraints,
+        solver=solver,
+        msg=False,
+    )
+    reference.optimize()
+    assert food_optimizer.results[-1].objective == pytest.approx(
+        reference.results[-1].objective, rel=1e-6
+    )
+    assert set(food_optimizer.get_optimal_foods().fdc_id) <= set(
+        pantry.fdc_ids[pantry.get_active_cols()].tolist()
+    )
+
+
+def test_max_results(pantry, constraints):
+    food_optimizer = FoodOptimizer(
+        pantry=pantry,
+        constraints=constraints,
+        incremental=True,
+        max_results=2,
+        msg=False,
+    )
+    for _ in range(3):
+        food_optimizer.optimize()
+        first = food_optimizer.results[0]
+    assert len(food_optimizer.results) == 2
+    assert food_optimizer.results[-1] is not first
+
+
+def cancel_during(food_optimizer, monkeypatch, stage_name):
+    """
+    Makes the stage method stage_name of food_optimizer cancel the optimize it
+    runs in, as a Cancel click during the stage would.
+    """
+    stage = getattr(food_optimizer, stage_name)
+
+    def cancelled_stage(*args):
+        food_optimizer.cancel()
+        return stage(*args)
+
+    monkeypatch.setattr(food_optimizer, stage_name, cancelled_stage)
+
+
+@pytest.mark.parametrize("stage_name", ["presolve_foods", "build_problem"])
+def test_cancel_before_solve(pantry, constraints, monkeypatch, stage_name):
+    food_optimizer = FoodOptimizer(
+        pantry=pantry, constraints=constraints, presolve=True, msg=False
+    )
+    cancel_during(food_optimizer, monkeypatch, stage_name)
+
+    assert food_optimizer.optimize() == pulp.LpStatusNotSolved
+    assert food_optimizer.results == []
+
+    monkeypatch.undo()
+    assert food_optimizer.optimize() == pulp.LpStatusOptimal
+    assert len(food_optimizer.results) == 1
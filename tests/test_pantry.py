@@ -0,0 +1,149 @@
+import os
+import stat
+import time
+import numpy as np
+from scipy import sparse
+from pyfoodopt import FOOD_RESTRICTION_NAMES, Pantry, is_pantry_snapshot_current
+from records import FoodRecord, PriceRecord
+
+# Nutrient nbr no synthetic food has
+NEW_NUTRIENT_NBR = 99999
+
+
+def get_nutrition(pantry, fdc_id):
+    col = pantry.nutrient_matrix[:, [pantry.fdc_id_to_col[fdc_id]]].toarray()[:, 0]
+    return {
+        nbr: amount
+        for nbr, amount in zip(pantry.nutrient_nbrs.tolist(), col.tolist())
+        if amount != 0
+    }
+
+
+def test_add_columns_replaces_existing_foods(pantry):
+    pantry.compile()
+    n_cols = len(pantry.fdc_ids)
+    replaced_fdc_id, kept_fdc_id = pantry.fdc_ids[[3, 4]].tolist()
+    kept_nutrition = get_nutrition(pantry, kept_fdc_id)
+    nutrient_nbrs = [int(pantry.nutrient_nbrs[0]), NEW_NUTRIENT_NBR]
+
+    pantry._add_columns(
+        fdc_ids=[replaced_fdc_id, 1],
+        food_names=["Replaced", "New"],
+        prices=[2.0, 3.0],
+        nutrient_nbrs=nutrient_nbrs,
+        nutrient_matrix=sparse.csc_array(np.array([[5.0, 0.0], [7.0, 11.0]])),
+        restriction_bits=[1, 0],
+        serving_sizes=[30.0, np.nan],
+    )
+
+    assert pantry.nutrient_matrix.format == "csc"
+    assert len(pantry.fdc_ids) == pantry.nutrient_matrix.shape[1] == n_cols + 1
+    assert pantry.fdc_id_to_col[replaced_fdc_id] == 3
+    assert pantry.fdc_id_to_col[1] == n_cols
+    assert pantry.nutrient_matrix.shape[0] == len(pantry.nutrient_nbrs)
+    assert NEW_NUTRIENT_NBR in pantry.nutrient_nbr_to_row
+    assert get_nutrition(pantry, replaced_fdc_id) == {
+        nutrient_nbrs[0]: 5.0,
+        NEW_NUTRIENT_NBR: 7.0,
+    }
+    assert get_nutrition(pantry, 1) == {NEW_NUTRIENT_NBR: 11.0}
+    assert get_nutrition(pantry, kept_fdc_id) == kept_nutrition
+    assert pantry.food_names[3] == "Replaced"
+    assert pantry.prices[3] == 2.0
+    assert pantry.serving_sizes[3] == 30.0
+    assert pantry.restriction_bits[3] == 1
+
+
+def test_add_food_replaces_existing_food(pantry):
+    pantry.compile()
+    n_cols = len(pantry.fdc_ids)
+    fdc_id = int(pantry.fdc_ids[0])
+    pantry.add_food(
+        FoodRecord(
+            fdc_id=fdc_id,
+            food_name="Replaced",
+            price=PriceRecord(4.0),
+            food_nutrition={NEW_NUTRIENT_NBR: 2.0},
+        )
+    )
+    pantry.compile()
+
+    assert len(pantry.fdc_ids) == n_cols
+    assert get_nutrition(pantry, fdc_id) == {NEW_NUTRIENT_NBR: 2.0}
+    food = pantry.get_food_by_fdc_id(fdc_id)
+    assert food.food_name == "Replaced"
+    assert food.price.price_per_100_g == 4.0
+
+
+def test_json_load_matches_foods(pantry, foods):
+    assert pantry.get_all_fdc_ids() == [int(fdc_id) for fdc_id in foods]
+    assert pantry.active_foods == set(pantry.fdc_id_to_col)
+    # Foods are only materialized when asked for
+    assert pantry.foods == {}
+
+    for fdc_id, food in list(foods.items())[:20]:
+        record = pantry.get_food_by_fdc_id(int(fdc_id))
+        assert record.food_name == food["food_name"]
+        assert record.price.price_per_100_g == food["price_per_100_g"]
+        assert record.serving_size_g == food.get("serving_size_g")
+        assert dict(record.food_nutrition) == {
+            int(nbr): amount for nbr, amount in food["food_nutrition"].items()
+        }
+        for restriction_name in FOOD_RESTRICTION_NAMES:
+            assert pantry.get_restriction(int(fdc_id), restriction_name) == bool(
+                food["restrictions"][restriction_name]
+            )
+    assert len(pantry.foods) == 20
+
+
+def test_snapshot_round_trip(pantry, tmp_path):
+    pantry.compile()
+    snapshot_path = str(tmp_path / "snapshot")
+    pantry.save_snapshot(snapshot_path)
+    loaded = Pantry()
+    loaded.build_pantry_from_snapshot(snapshot_path)
+
+    for array_name in ["fdc_ids", "prices", "nutrient_nbrs", "restriction_bits"]:
+        assert np.array_equal(getattr(loaded, array_name), getattr(pantry, array_name))
+    assert np.array_equal(loaded.serving_sizes, pantry.serving_sizes, equal_nan=True)
+    assert loaded.food_names.tolist() == pantry.food_names.tolist()
+    assert (loaded.nutrient_matrix != pantry.nutrient_matrix).nnz == 0
+    assert loaded.fdc_id_to_col == pantry.fdc_id_to_col
+    assert loaded.nutrient_nbr_to_row == pantry.nutrient_nbr_to_row
+    assert loaded.active_foods == set(pantry.fdc_id_to_col)
+
+
+def test_snapshot_readable_by_others(pantry, tmp_path):
+    snapshot_path = str(tmp_path / "snapshot")
+    pantry.save_snapshot(snapshot_path)
+    assert os.stat(snapshot_path).st_mode & (stat.S_IROTH | stat.S_IXOTH)
+
+
+def test_snapshot_replace(pantry, tmp_path):
+    pantry.compile()
+    snapshot_path = str(tmp_path / "snapshot")
+    Pantry().save_snapshot(snapshot_path)
+    pantry.save_snapshot(snapshot_path)
+    loaded = Pantry()
+    loaded.build_pantry_from_snapshot(snapshot_path)
+    assert len(loaded.fdc_ids) == 0
+
+    pantry.save_snapshot(snapshot_path, replace=True)
+    loaded = Pantry()
+    loaded.build_pantry_from_snapshot(snapshot_path)
+    assert np.array_equal(loaded.fdc_ids, pantry.fdc_ids)
+    assert sorted(os.listdir(tmp_path)) == ["food_data.json", "snapshot"]
+
+
+def test_snapshot_current(pantry, tmp_path):
+    source_path = str(tmp_path / "food_data.json")
+    snapshot_path = str(tmp_path / "snapshot")
+    assert not is_pantry_snapshot_current(snapshot_path, source_path)
+
+    pantry.save_snapshot(snapshot_path)
+    assert is_pantry_snapshot_current(snapshot_path, source_path)
+
+    modified = time.time() + 10
+    os.utime(source_path, (modified, modified))
+    assert not is_pantry_snapshot_current(snapshot_path, source_path)
+    assert is_pantry_snapshot_current(snapshot_path)
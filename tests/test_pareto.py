@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from pareto import FRONTIER_TOLERANCE, ParetoFrontier, get_non_dominated
+from pyfoodopt import CostObjective, FoodOptimizer, NutrientObjective
+
+
+@pytest.mark.parametrize(
+    "signs, expected",
+    [
+        ([1, 1], [True, False, True, True, False]),
+        ([-1, -1], [False, False, False, False, True]),
+        ([1, -1], [False, False, False, True, False]),
+    ],
+)
+def test_non_dominated(signs, expected):
+    values = [[1, 1], [1, 1], [2, 0.5], [0.5, 2], [2, 2]]
+    assert get_non_dominated(values, signs).tolist() == expected
+
+
+def test_non_dominated_keeps_first_of_equal_rows():
+    values = np.array([[3.0, 1.0], [1.0, 3.0], [3.0, 1.0]])
+    values[2] += FRONTIER_TOLERANCE / 2
+    assert get_non_dominated(values, [1, 1]).tolist() == [True, True, False]
+
+
+def test_non_dominated_single_row():
+    assert get_non_dominated([[1.0, 2.0]], [1, -1]).tolist() == [True]
+
+
+def test_frontier_trades_cost_for_nutrient(pantry, constraints):
+    epsilon_objective = NutrientObjective(
+        objective_name="Nutrient 200", objective_type="maximize", nutrient_nbrs=[200]
+    )
+    pareto_frontier = ParetoFrontier(
+        pantry=pantry,
+        constraints=constraints,
+        objective=CostObjective(),
+        epsilon_objective=epsilon_objective,
+        n_points=5,
+        max_workers=2,
+    )
+    points = pareto_frontier.solve()
+    assert points.solved.all()
+    # More of the nutrient never costs less, and every bound is met
+    assert np.all(np.diff(points.objective_value) >= -1e-7)
+    assert np.all(points.epsilon_value >= points.epsilon - 1e-6)
+
+    food_optimizer = FoodOptimizer(pantry=pantry, constraints=constraints, msg=False)
+    food_optimizer.optimize()
+    assert points.cost[0] == pytest.approx(food_optimizer.results[-1].objective)
+    assert points.epsilon_value.iloc[-1] == pytest.approx(
+        pareto_frontier.get_anchor(epsilon_objective), rel=1e-6
+    )
+
+    frontier = pareto_frontier.get_frontier(points)
+    assert get_non_dominated(
+        frontier[["objective_value", "epsilon_value"]].to_numpy(), [1, -1]
+    ).all()
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from pyfoodopt import FoodOptimizer
+from solvers import get_solver_backend
+
+# Big-M no diet of the test pantry comes near, in servings or dollars
+LOOSE_UNIT_BOUND = 1e4
+
+# Proving a diet of few foods optimal takes minutes on the full test pantry
+N_ACTIVE_FOODS = 30
+NO_CORE_SIZE = 1000
+
+PORTION_RULES = [{}, {"min_portion_g": 50}, {"max_foods": 8}]
+
+
+@pytest.fixture
+def small_pantry(pantry):
+    pantry.compile()
+    pantry.set_active_foods(pantry.fdc_ids[:N_ACTIVE_FOODS].tolist())
+    return pantry
+
+
+def get_food_optimizer(pantry, constraints, **params):
+    return FoodOptimizer(
+        pantry=pantry,
+        constraints=constraints,
+        portions=True,
+        mip_gap=0,
+        msg=False,
+        **params,
+    )
+
+
+def solve_reference(food_optimizer):
+    """
+    Solves the mixed integer problem of food_optimizer in one go, with a loose
+    big-M instead of get_unit_bounds and without reduced cost fixing.
+    """
+    food_optimizer.prepare_problem()
+    portions = food_optimizer._portions
+    n_foods = len(portions["costs"])
+    backend = get_solver_backend("highs", msg=False, mip_gap=0)
+    backend.build(
+        portions["coefficient_matrix"],
+        food_optimizer._constraint_rows,
+        [str(i) for i in range(n_foods)],
+        portions["low_bounds"],
+        portions["costs"],
+    )
+    backend.set_portions(
+        portions["integer"],
+        np.full(n_foods, LOOSE_UNIT_BOUND),
+        portions["min_units"],
+        food_optimizer.max_foods,
+    )
+    return backend.solve()
+
+
+@pytest.mark.parametrize("params", PORTION_RULES)
+def test_unit_bounds_keep_optimum(small_pantry, constraints, params):
+    # A core larger than the pantry skips the restricted solve and its fixing
+    food_optimizer = get_food_optimizer(
+        small_pantry, constraints, core_size=NO_CORE_SIZE, **params
+    )
+    food_optimizer.optimize()
+    result = food_optimizer.results[-1]
+    reference = solve_reference(get_food_optimizer(small_pantry, constraints, **params))
+
+    assert result.proven_optimal and reference.proven_optimal
+    assert "core" not in result.timings
+    assert result.objective == pytest.approx(reference.objective, rel=1e-6)
+
+
+@pytest.mark.parametrize("params", PORTION_RULES)
+def test_fixed_foods_keep_optimum(small_pantry, constraints, params):
+    objectives = {}
+    for core_size in [10, NO_CORE_SIZE]:
+        food_optimizer = get_food_optimizer(
+            small_pantry, constraints, core_size=core_size, **params
+        )
+        food_optimizer.optimize()
+        result = food_optimizer.results[-1]
+        assert result.proven_optimal
+        assert ("core" in result.timings) == (core_size < N_ACTIVE_FOODS)
+        objectives[core_size] = result.objective
+
+    assert objectives[10] == pytest.approx(objectives[NO_CORE_SIZE], rel=1e-6)
+
+
+def test_portions_are_kept(small_pantry, constraints):
+    food_optimizer = get_food_optimizer(
+        small_pantry, constraints, min_portion_g=50, max_foods=8
+    )
+    food_optimizer.optimize()
+    foods = food_optimizer.get_optimal_foods()
+
+    assert len(foods) <= 8
+    assert np.all(foods.amount >= 50 - 1e-6)
+    servings = foods.servings.dropna()
+    assert np.allclose(servings, np.round(servings))
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from pyfoodopt import FoodOptimizer
+from presolve import presolve_columns
+from records import FoodRecord, PriceRecord
+from solvers import SOLVER_BACKENDS
+
+
+def add_removable_foods(pantry):
+    """
+    Adds a copy of a food and a food without nutrients, which presolve removes
+    as duplicate and empty.
+    """
+    food = pantry.get_food_by_fdc_id(pantry.get_all_fdc_ids()[0])
+    for fdc_id, price, food_nutrition in [
+        (1, food.price.price_per_100_g, dict(food.food_nutrition)),
+        (2, 1.0, {}),
+    ]:
+        pantry.add_food(
+            FoodRecord(
+                fdc_id=fdc_id,
+                food_name=f"Food {fdc_id}",
+                price=PriceRecord(price),
+                food_nutrition=food_nutrition,
+            )
+        )
+
+
+@pytest.mark.parametrize("solver", list(SOLVER_BACKENDS))
+def test_presolve_keeps_objective(pantry, constraints, solver):
+    add_removable_foods(pantry)
+    objectives = {}
+    for presolve in [False, True]:
+        food_optimizer = FoodOptimizer(
+            pantry=pantry,
+            constraints=constraints,
+            presolve=presolve,
+            solver=solver,
+            msg=False,
+        )
+        food_optimizer.optimize()
+        objectives[presolve] = food_optimizer.results[-1].objective
+
+    assert objectives[True] == pytest.approx(objectives[False], rel=1e-6)
+
+
+def test_presolve_report_covers_removed_foods(pantry, constraints):
+    add_removable_foods(pantry)
+    food_optimizer = FoodOptimizer(
+        pantry=pantry, constraints=constraints, presolve=True, msg=False
+    )
+    food_optimizer.optimize()
+    result = food_optimizer.results[-1]
+
+    report = result.presolve_report.set_index("fdc_id")
+    assert report.reason[1] == "duplicate"
+    assert report.kept_fdc_id[1] == food_optimizer.pantry.get_all_fdc_ids()[0]
+    assert report.reason[2] == "empty"
+    # Removed foods are added back with zero spend
+    removed = np.isin(result.fdc_ids, report.index.to_numpy())
+    assert np.all(result.x[removed] == 0)
+    assert len(result.fdc_ids) == len(pantry.get_active_cols())
+
+
+def test_incremental_resolve_skips_presolve(pantry, constraints):
+    add_removable_foods(pantry)
+    food_optimizer = FoodOptimizer(
+        pantry=pantry,
+        constraints=constraints,
+        presolve=True,
+        incremental=True,
+        msg=False,
+    )
+    food_optimizer.optimize()
+    assert "presolve" in food_optimizer.results[-1].timings
+
+    fdc_id = pantry.get_all_fdc_ids()[5]
+    pantry.set_prices(
+        {fdc_id: pantry.get_food_by_fdc_id(fdc_id).price.price_per_100_g / 4}
+    )
+    food_optimizer.optimize()
+    result = food_optimizer.results[-1]
+    assert "presolve" not in result.timings
+    assert result.presolve_report is None
+    # The foods presolve left out are patched into the model
+    assert len(result.fdc_ids) == len(pantry.get_active_cols())
+
+    reference = FoodOptimizer(pantry=pantry, constraints=constraints, msg=False)
+    reference.optimize()
+    assert result.objective == pytest.approx(reference.results[-1].objective, rel=1e-6)
+
+
+def test_presolve_columns_reasons():
+    # Lower bound rows, then an upper bound row on which less is better
+    coefficient_matrix = np.array(
+        [
+            [2.0, 1.0, 2.0, 0.0, 3.0, 1.0],
+            [2.0, 1.0, 2.0, 0.0, 1.0, 1.0],
+            [1.0, 1.0, 1.0, 0.0, 1.0, 0.5],
+        ]
+    )
+    keep = np.array([False, False, False, False, False, True])
+    presolved = presolve_columns(
+        coefficient_matrix, ["lower_bound", "lower_bound", "upper_bound"], keep
+    )
+
+    assert presolved.kept.tolist() == [0, 4, 5]
+    assert presolved.reasons.tolist() == [
+        None,
+        "dominated",
+        "duplicate",
+        "empty",
+        None,
+        None,
+    ]
+    # Food 1 is beaten by foods 0 and 4 alike
+    assert presolved.kept_by[1] in (0, 4)
+    assert presolved.kept_by[2] == 0
@@ -0,0 +1,86 @@
+from dataclasses import replace
+import numpy as np
+import pytest
+from pyfoodopt import Constraints, FoodOptimizer
+
+
+def solve(pantry, constraints, **params):
+    food_optimizer = FoodOptimizer(
+        pantry=pantry, constraints=constraints, ranging=True, msg=False, **params
+    )
+    food_optimizer.optimize()
+    return food_optimizer
+
+
+def get_chosen(food_optimizer):
+    return set(food_optimizer.get_optimal_foods().fdc_id.tolist())
+
+
+def test_cost_ranging_keeps_diet(pantry, constraints):
+    food_optimizer = solve(pantry, constraints)
+    chosen = get_chosen(food_optimizer)
+    cost_ranging = food_optimizer.get_cost_ranging().set_index("fdc_id")
+
+    bought = cost_ranging[cost_ranging.cost > 0]
+    bought_fdc_id = bought.index[np.isfinite(bought.price_upper.to_numpy())][0]
+    left_out = cost_ranging[cost_ranging.cost == 0]
+    left_out_fdc_id = left_out.index[left_out.price_lower.to_numpy() > 0][0]
+
+    # Within its range a price change leaves the same foods in the diet
+    for fdc_id, price in [
+        (bought_fdc_id, bought.price_upper[bought_fdc_id] * 0.99),
+        (left_out_fdc_id, left_out.price_lower[left_out_fdc_id] * 1.01),
+    ]:
+        original_price = pantry.prices[pantry.fdc_id_to_col[fdc_id]]
+        pantry.set_prices({fdc_id: price})
+        assert get_chosen(solve(pantry, constraints)) == chosen
+        pantry.set_prices({fdc_id: original_price})
+
+    # Past its lower price a food left out enters the diet
+    pantry.set_prices({left_out_fdc_id: left_out.price_lower[left_out_fdc_id] * 0.9})
+    assert left_out_fdc_id in get_chosen(solve(pantry, constraints))
+
+
+def test_rhs_ranging_keeps_shadow_prices(pantry, constraints):
+    food_optimizer = solve(pantry, constraints)
+    rhs_ranging = food_optimizer.get_rhs_ranging()
+    row = int(np.argmax(np.abs(rhs_ranging.pi.to_numpy())))
+    value = rhs_ranging.constraint_value[row]
+    value_upper = rhs_ranging.value_upper[row]
+    new_value = (value + value_upper) / 2 if np.isfinite(value_upper) else value * 1.1
+
+    nutrient_nbrs, constraint_type, _ = food_optimizer.get_constraint_rows()[row]
+    moved = Constraints()
+    for nutrient_constraints in constraints.nutrient_constraints.values():
+        for nutrient_constraint in nutrient_constraints.values():
+            if (
+                nutrient_constraint.get_id() == tuple(nutrient_nbrs)
+                and nutrient_constraint.constraint_type == constraint_type
+            ):
+                nutrient_constraint = replace(
+                    nutrient_constraint, constraint_value=new_value
+                )
+            moved.add_nutrient_constraint(nutrient_constraint)
+
+    moved_ranging = solve(pantry, moved).get_rhs_ranging()
+    assert moved_ranging.constraint_value[row] == new_value
+    assert moved_ranging.pi.to_numpy() == pytest.approx(
+        rhs_ranging.pi.to_numpy(), rel=1e-6, abs=1e-9
+    )
+
+
+def test_cost_ranging_skips_deactivated_foods(pantry, constraints):
+    food_optimizer = solve(pantry, constraints, incremental=True)
+    deactivated = food_optimizer.get_optimal_foods().fdc_id.tolist()[:2] + [
+        pantry.get_all_fdc_ids()[-1]
+    ]
+    pantry.deactivate_foods(deactivated)
+    food_optimizer.optimize()
+    result = food_optimizer.results[-1]
+    # The patched model keeps the deactivated foods
+    assert set(deactivated) <= set(result.fdc_ids.tolist())
+
+    cost_ranging = food_optimizer.get_cost_ranging()
+    assert sorted(cost_ranging.fdc_id.tolist()) == sorted(
+        pantry.fdc_ids[pantry.get_active_cols()].tolist()
+    )
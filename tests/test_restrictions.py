@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from pyfoodopt import (
+    FOOD_RESTRICTION_NAMES,
+    get_restriction_mask,
+    pack_restrictions,
+    unpack_restrictions,
+)
+
+
+def get_restriction_table(foods):
+    return np.array(
+        [
+            [food["restrictions"][name] for name in FOOD_RESTRICTION_NAMES]
+            for food in foods.values()
+        ],
+        dtype=bool,
+    )
+
+
+def test_pack_round_trip(foods):
+    restrictions = get_restriction_table(foods)
+    restriction_bits = pack_restrictions(restrictions)
+    assert restriction_bits.dtype == np.uint16
+    assert np.array_equal(unpack_restrictions(restriction_bits), restrictions)
+
+
+@pytest.mark.parametrize(
+    "restriction_names",
+    [
+        [],
+        FOOD_RESTRICTION_NAMES[:1],
+        FOOD_RESTRICTION_NAMES[1:4],
+        FOOD_RESTRICTION_NAMES,
+    ],
+)
+def test_restriction_filter_matches_foods(pantry, foods, restriction_names):
+    restrictions = get_restriction_table(foods)
+    columns = [FOOD_RESTRICTION_NAMES.index(name) for name in restriction_names]
+    expected = restrictions[:, columns].all(axis=1)
+
+    allowed = pantry.get_restriction_filter(get_restriction_mask(restriction_names))
+    assert np.array_equal(allowed, expected)
+
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from search import FoodSearchIndex
+
+FOOD_NAMES = [
+    "Milk, whole",
+    "Buttermilk",
+    "Milk",
+    "Soy milk, unsweetened",
+    "Chocolate milkshake",
+    "Oat bran",
+    "Bread, oat",
+    "Peas and tea",
+    "Teas, herbal",
+]
+
+
+@pytest.fixture
+def search_index():
+    return FoodSearchIndex(FOOD_NAMES)
+
+
+@pytest.mark.parametrize("query", ["milk", "MILK ", "oat", "o", "at", "k,", "xyz"])
+def test_search_finds_every_substring(search_index, query):
+    expected = {
+        col
+        for col, name in enumerate(FOOD_NAMES)
+        if query.strip().lower() in name.lower()
+    }
+    assert set(search_index.search(query).tolist()) == expected
+
+
+def test_search_ranks_matches(search_index):
+    # Exact name, names starting with the query, names with a word starting
+    # with it, then the rest, shorter names first within each group
+    assert search_index.search("milk").tolist() == [2, 0, 4, 3, 1]
+
+
+def test_search_checks_trigrams_are_contiguous(search_index):
+    # "Peas and tea" has every trigram of "teas", but not in a row
+    assert search_index.search("teas").tolist() == [8]
+    assert search_index.search("milk, w").tolist() == [0]
+
+
+def test_empty_query_returns_every_food(search_index):
+    assert np.array_equal(search_index.search("  "), np.arange(len(FOOD_NAMES)))
+
+
+def test_pantry_search_index(pantry):
+    search_index = pantry.get_search_index()
+    assert pantry.get_search_index() is search_index
+    cols = search_index.search("chicken")
+    assert len(cols) > 0
+    assert all("chicken" in pantry.food_names[col].lower() for col in cols)
@@ -0,0 +1,87 @@
+from dataclasses import replace
+import numpy as np
+import pytest
+from pyfoodopt import Constraints, FoodOptimizer, get_constraint_index
+from records import NutrientConstraintRecord
+from sweep import ParameterSweep
+
+
+def get_sweep(pantry, constraints):
+    # Two chunks, so values after the first of each chunk are warm started
+    return ParameterSweep(
+        pantry=pantry, constraints=constraints, max_workers=2, n_chunks=2
+    )
+
+
+def get_cost(pantry, constraints):
+    food_optimizer = FoodOptimizer(pantry=pantry, constraints=constraints, msg=False)
+    food_optimizer.optimize()
+    return food_optimizer.results[-1].x.sum()
+
+
+def test_price_sweep_matches_single_solves(pantry, constraints):
+    fdc_id = pantry.get_all_fdc_ids()[0]
+    values = [0.05, 0.5, 1.0, 2.0, 4.0]
+    sweep_df = get_sweep(pantry, constraints).sweep_price(fdc_id, values)
+
+    assert sweep_df.value.tolist() == values
+    assert sweep_df.solved.all()
+    assert np.all(np.diff(sweep_df.cost) >= -1e-9)
+    for value, cost in zip(values, sweep_df.cost):
+        pantry.set_prices({fdc_id: value})
+        assert cost == pytest.approx(get_cost(pantry, constraints), rel=1e-6)
+
+
+def test_constraint_sweep_matches_single_solves(pantry, constraints):
+    nutrient_constraint = next(
+        nutrient_constraint
+        for nutrient_constraints in constraints.nutrient_constraints.values()
+        for nutrient_constraint in nutrient_constraints.values()
+        if nutrient_constraint.constraint_type == "lower_bound"
+    )
+    values = nutrient_constraint.constraint_value * np.array([0.5, 1.0, 1.5, 2.0])
+    sweep_df = get_sweep(pantry, constraints).sweep_constraint(
+        nutrient_constraint, values
+    )
+    constraint_rows = constraints.get_constraint_rows()
+    row_keys = [row[:2] for row in constraint_rows]
+    constraint_name = get_constraint_index(constraint_rows).constraint_name[
+        row_keys.index((nutrient_constraint.get_id(), "lower_bound"))
+    ]
+
+    for value, row in zip(values, sweep_df.itertuples()):
+        moved = Constraints()
+        for nutrient_constraints in constraints.nutrient_constraints.values():
+            for other in nutrient_constraints.values():
+                moved.add_nutrient_constraint(
+                    replace(other, constraint_value=value)
+                    if other is nutrient_constraint
+                    else other
+                )
+        assert row.cost == pytest.approx(get_cost(pantry, moved), rel=1e-6)
+        # A lower bound that raises the cost is binding
+        if row.cost > sweep_df.cost.min() + 1e-9:
+            assert constraint_name in row.binding_constraints
+    # The swept constraint is left as it was
+    assert (
+        constraints.nutrient_constraints[nutrient_constraint.get_id()]["lower_bound"]
+        is nutrient_constraint
+    )
+
+
+def test_sweep_rejects_unknown_parameters(pantry, constraints):
+    parameter_sweep = get_sweep(pantry, constraints)
+    fdc_id = pantry.get_all_fdc_ids()[0]
+    with pytest.raises(ValueError, match="not an active food"):
+        parameter_sweep.sweep_price(-1, [1.0])
+    with pytest.raises(ValueError, match="positive"):
+        parameter_sweep.sweep_price(fdc_id, [0.0, 1.0])
+    with pytest.raises(ValueError, match="No upper_bound constraint"):
+        parameter_sweep.sweep_constraint(
+            NutrientConstraintRecord(
+                constraint_type="upper_bound",
+                constraint_value=0.0,
+                nbr_to_coefficient={-1: 1},
+            ),
+            [1.0],
+        )
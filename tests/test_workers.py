@@ -0,0 +1,33 @@
+import numpy as np
+import pulp
+from solvers import LpSolution
+from workers import get_chunks, get_diet_row, is_solved
+
+
+def test_chunks_are_contiguous():
+    values = np.arange(7.0)
+    chunks = get_chunks(values, 3)
+    assert chunks == [[0.0, 1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]
+    assert get_chunks(values[:2], 4) == [[0.0], [1.0]]
+
+
+def test_solved_needs_optimal_status_and_no_slack():
+    def get_result(status, slack):
+        return LpSolution(
+            status=status,
+            x=np.array([0.0, 2.0]),
+            slack_up=np.array([slack, 0.0]),
+            slack_down=np.zeros(2),
+        )
+
+    assert is_solved(get_result(pulp.LpStatusOptimal, 0.0))
+    assert not is_solved(get_result(pulp.LpStatusOptimal, 0.5))
+    assert not is_solved(get_result(pulp.LpStatusNotSolved, 0.0))
+
+    row = get_diet_row(
+        get_result(pulp.LpStatusOptimal, 0.0), np.array([10, 11]), np.array([1.0, 4.0])
+    )
+    assert row["solved"] and row["status"] == "Optimal"
+    assert row["cost"] == 2.0
+    assert row["n_foods"] == 1
+    assert row["foods"] == {11: 50.0}